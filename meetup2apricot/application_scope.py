@@ -2,6 +2,9 @@
 needed by the application."""
 
 
+from .apricot_api import ApricotApi
+from .http_cassette import replay_directory
+from .meetup_api import MEETUP_API_URL
 from .scope_cache import ScopeCache
 from . import __version__
 from datetime import datetime
@@ -9,6 +12,11 @@ from pathlib import Path, PurePosixPath
 import logging
 
 APP_NAME = "meetup2apricot"
+APRICOT_TOKEN_URL = "https://oauth.wildapricot.org/auth/token"
+APRICOT_THROTTLE_CACHE_FILE_NAME = "apricot_throttle.pickle"
+DEAD_EVENT_CACHE_FILE_NAME = "dead_events.pickle"
+MEETUP_EVENTS_CACHE_FILE_NAME = "meetup_events.pickle"
+PHOTO_USAGE_FILE_NAME = "photo_usage.pickle"
 
 
 class ApplicationScope:
@@ -21,8 +29,16 @@ class ApplicationScope:
         self._args = args
         self._env_vars = env_vars
         self._apricot_api_cache = ScopeCache()
+        self._apricot_throttle_cache = ScopeCache()
+        self._dead_event_cache_cache = ScopeCache()
+        self._http_cassette_cache = ScopeCache()
+        self._http_transport_cache = ScopeCache()
         self._meetup_api_cache = ScopeCache()
+        self._meetup_events_cache_cache = ScopeCache()
+        self._photo_usage_cache = ScopeCache()
         self._reporter_cache = ScopeCache()
+        self._retrier_cache = ScopeCache()
+        self._sqlite_store_cache = ScopeCache()
 
     @property
     def app_name(self):
@@ -36,6 +52,10 @@ class ApplicationScope:
         """Return a cached Wild Apricot API or one provided by a provider."""
         return self._apricot_api_cache.get(apricot_api_provider)
 
+    @property
+    def apricot_api_url(self):
+        return self._env_vars.get("APRICOT_API_URL", ApricotApi.api_url)
+
     @property
     def apricot_api_key(self):
         return self._env_vars["APRICOT_API_KEY"]
@@ -60,10 +80,49 @@ class ApplicationScope:
     def apricot_photo_username(self):
         return self._env_vars["APRICOT_PHOTO_USERNAME"]
 
+    @property
+    def apricot_token_url(self):
+        return self._env_vars.get("APRICOT_TOKEN_URL", APRICOT_TOKEN_URL)
+
+    def apricot_throttle(self, apricot_throttle_provider):
+        """Return a cached Wild Apricot throttle or one provided by a
+        provider."""
+        return self._apricot_throttle_cache.get(apricot_throttle_provider)
+
+    @property
+    def apricot_throttle_cache_file(self):
+        return self.event_cache_file.parent / APRICOT_THROTTLE_CACHE_FILE_NAME
+
+    @property
+    def apricot_throttle_file(self):
+        throttle_file = self._args.apricot_throttle_file
+        return self.state_path(Path(throttle_file)) if throttle_file else None
+
+    @property
+    def async_mode(self):
+        return self._args.async_mode
+
+    @property
+    def clean_photos(self):
+        return self._args.clean_photos
+
     @property
     def codes_to_tags(self):
         return self._env_vars.json("CODES_TO_TAGS")
 
+    @property
+    def database(self):
+        database = self._args.database
+        return self.state_path(Path(database)) if database else None
+
+    def dead_event_cache(self, dead_event_cache_provider):
+        """Return a cached dead event cache or one provided by a provider."""
+        return self._dead_event_cache_cache.get(dead_event_cache_provider)
+
+    @property
+    def dead_event_cache_file(self):
+        return self.event_cache_file.parent / DEAD_EVENT_CACHE_FILE_NAME
+
     @property
     def debug(self):
         return self._args.debug
@@ -78,12 +137,21 @@ class ApplicationScope:
 
     @property
     def event_cache_file(self):
-        return Path(self._env_vars["EVENT_CACHE_FILE"])
+        return self.state_path(Path(self._env_vars["EVENT_CACHE_FILE"]))
 
     @property
     def event_restrictions(self):
         return self._env_vars.json("EVENT_RESTRICTIONS")
 
+    def http_cassette(self, http_cassette_provider):
+        """Return a cached web request cassette or one provided by a
+        provider."""
+        return self._http_cassette_cache.get(http_cassette_provider)
+
+    def http_transport(self, http_transport_provider):
+        """Return a cached web transport or one provided by a provider."""
+        return self._http_transport_cache.get(http_transport_provider)
+
     @property
     def latest_event_start_time(self):
         return datetime.fromisoformat(self._env_vars["LATEST_EVENT_START_TIME"])
@@ -100,9 +168,26 @@ class ApplicationScope:
         """Return a cached Meetup API or one provided by a provider."""
         return self._meetup_api_cache.get(meetup_api_provider)
 
+    @property
+    def meetup_api_url(self):
+        return self._env_vars.get("MEETUP_API_URL", MEETUP_API_URL)
+
+    def meetup_events_cache(self, meetup_events_cache_provider):
+        """Return a cached Meetup events cache or one provided by a
+        provider."""
+        return self._meetup_events_cache_cache.get(meetup_events_cache_provider)
+
+    @property
+    def meetup_events_cache_file(self):
+        return self.event_cache_file.parent / MEETUP_EVENTS_CACHE_FILE_NAME
+
     @property
     def meetup_events_wanted(self):
-        return self._env_vars["MEETUP_EVENTS_WANTED"]
+        return int(self._env_vars["MEETUP_EVENTS_WANTED"])
+
+    @property
+    def max_photos(self):
+        return self._args.max_photos
 
     @property
     def meetup_group_url_name(self):
@@ -110,11 +195,37 @@ class ApplicationScope:
 
     @property
     def photo_cache_file(self):
-        return Path(self._env_vars["PHOTO_CACHE_FILE"])
+        return self.state_path(Path(self._env_vars["PHOTO_CACHE_FILE"]))
 
     @property
     def photo_directory(self):
-        return Path(self._env_vars["PHOTO_DIRECTORY"])
+        return self.state_path(Path(self._env_vars["PHOTO_DIRECTORY"]))
+
+    @property
+    def photo_max_age(self):
+        return self._args.photo_max_age
+
+    def photo_usage(self, photo_usage_provider):
+        """Return cached photo usage or usage provided by a provider."""
+        return self._photo_usage_cache.get(photo_usage_provider)
+
+    @property
+    def photo_usage_file(self):
+        return self.photo_cache_file.parent / PHOTO_USAGE_FILE_NAME
+
+    @property
+    def record_cassette(self):
+        cassette = self._args.record_cassette
+        return Path(cassette) if cassette else None
+
+    @property
+    def replay_cassette(self):
+        cassette = self._args.replay_cassette
+        return Path(cassette) if cassette else None
+
+    @property
+    def replay_latency(self):
+        return self._args.replay_latency
 
     @property
     def report(self):
@@ -124,6 +235,10 @@ class ApplicationScope:
         """Return a cached reporter or one provided by a provider."""
         return self._reporter_cache.get(reporter_provider)
 
+    def retrier(self, retrier_provider):
+        """Return a cached retrier or one provided by a provider."""
+        return self._retrier_cache.get(retrier_provider)
+
     @property
     def show_meetup_ids(self):
         return self._args.show_meetup_ids
@@ -132,6 +247,24 @@ class ApplicationScope:
     def skip_meetup_ids(self):
         return self._args.skip_meetup_ids
 
+    def sqlite_store(self, sqlite_store_provider):
+        """Return a cached SQLite store or one provided by a provider."""
+        return self._sqlite_store_cache.get(sqlite_store_provider)
+
+    def state_path(self, path):
+        """Return the path of a file or directory written by a run. A replayed
+        run keeps it in a directory beside the cassette instead, creating the
+        directory if needed, so replays never change the real caches."""
+        if self.replay_cassette is None:
+            return path
+        directory = replay_directory(self.replay_cassette)
+        directory.mkdir(exist_ok=True)
+        return directory / path.name
+
+    @property
+    def stream_json(self):
+        return self._args.stream_json
+
     @property
     def transfer_meetup_ids(self):
         return self._args.transfer_meetup_ids
@@ -2,6 +2,7 @@
 
 from . import dryrun
 from .http_response_error import ApricotApiError
+from .retrier import NULL_RETRIER
 import logging
 
 
@@ -14,19 +15,33 @@ class ApricotApi:
     api_version = "v2.2"
     api_base_url = f"{api_url}/{api_version}"
 
-    def __init__(self, account_id, session, throttle, dryrun=False):
+    def __init__(
+        self,
+        account_id,
+        session,
+        throttle,
+        dryrun=False,
+        retrier=NULL_RETRIER,
+        api_url=None,
+    ):
         """Initialize with a Wild Appricot account ID, an OAuth2 session to the
-        Apricot server, a throttle to slow large numbers of requests, and a dry
-        run flag."""
+        Apricot server, a throttle to slow large numbers of requests, a dry
+        run flag, a retrier for failed requests, and an optional API base URL
+        replacing Wild Apricot's."""
+        if api_url:
+            self.api_url = api_url
+            self.api_base_url = f"{api_url}/{self.api_version}"
         self.account_id = account_id
         self.session = session
         self.throttle = throttle
         self.dryrun = dryrun
+        self.retrier = retrier
 
     def get_response(self, url, **payload):
         """Request a URL and return the response."""
-        self.throttle.throttle()
-        response = self.session.get(url, params=payload)
+        response = self.retrier.request(
+            self.throttle, self.session.get, url, params=payload
+        )
         ApricotApiError.check_response_status(response)
         return response
 
@@ -37,41 +52,48 @@ class ApricotApi:
 
     def delete(self, url, **payload):
         """Request deletion at a URL and return the response."""
-        self.throttle.throttle()
-        response = self.session.delete(url, params=payload)
+        response = self.retrier.request(
+            self.throttle, self.session.delete, url, params=payload
+        )
         ApricotApiError.check_response_status(response)
         return response
 
     def post(self, url, json=None, **payload):
         """Request posting at a URL and return the response."""
-        self.throttle.throttle()
-        response = self.session.post(url, json=json, data=payload)
+        response = self.retrier.request(
+            self.throttle, self.session.post, url, json=json, data=payload
+        )
         ApricotApiError.check_response_status(response)
         return response
 
     def put(self, url, **payload):
         """Request puting at a URL and return the response."""
-        self.throttle.throttle()
-        response = self.session.put(url, data=payload)
+        response = self.retrier.request(
+            self.throttle, self.session.put, url, data=payload
+        )
         ApricotApiError.check_response_status(response)
         return response
 
+    def account_url(self, *path_segments):
+        """Build a URL within the Wild Apricot account from any number of path
+        segments."""
+        path = "/".join(str(segment) for segment in path_segments)
+        return f"{self.api_base_url}/accounts/{self.account_id}/{path}"
+
     # Wild Apricot functions
 
     def get_event(self, event_id):
         """Get the JSON description of an event."""
-        url = f"{self.api_base_url}/accounts/{self.account_id}/events/{event_id}"
-        return self.get_json(url)
+        return self.get_json(self.account_url("events", event_id))
 
     def get_membership_levels(self):
         """Get the JSON list of membership levels."""
-        url = f"{self.api_base_url}/accounts/{self.account_id}/membershiplevels"
-        return self.get_json(url)
+        return self.get_json(self.account_url("membershiplevels"))
 
     @dryrun.method(value=12345)
     def add_event(self, event):
         """Insert an event into Wild Apricot."""
-        url = f"{self.api_base_url}/accounts/{self.account_id}/events"
+        url = self.account_url("events")
         return int(self.post(url, json=event).content)
 
     @dryrun.method(value=2468)
@@ -85,7 +107,7 @@ class ApricotApi:
     @dryrun.method(value=98765)
     def add_registration_type(self, registration_type):
         """Insert an event registration type into Wild Apricot."""
-        url = f"{self.api_base_url}/accounts/{self.account_id}/EventRegistrationTypes"
+        url = self.account_url("EventRegistrationTypes")
         return int(self.post(url, json=registration_type).content)
 
 
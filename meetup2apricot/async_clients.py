@@ -0,0 +1,150 @@
+"""Asyncio counterparts of the Meetup API, the Wild Apricot API, and the photo
+retriever and uploader. Requests runs each web request in a worker thread,
+while throttle and retry waits await on the event loop, holding no thread."""
+
+from . import dryrun
+from .http_response_error import ApricotApiError
+from .retrier import TRANSIENT_ERRORS
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+
+class AsyncRetrier:
+
+    """Throttles and sends HTTP requests in worker threads, retrying like a
+    retrier and sharing its retry budget. Awaits the throttle and the delays
+    before retries."""
+
+    def __init__(self, retrier):
+        """Initialize with a retrier that decides which responses to retry and
+        keeps the retry budget."""
+        self.retrier = retrier
+
+    async def request(self, throttle, send, *args, **kwargs):
+        """Await an asyncio throttle and send a request by calling a send
+        function with any arguments in a worker thread, retrying after
+        retriable failures. Close responses not returned to release their
+        connections. Tell the throttle about pauses before retries. Return the
+        final response or raise the final connection error or timeout."""
+        attempt = 1
+        while True:
+            await throttle.throttle()
+            try:
+                response = await asyncio.to_thread(send, *args, **kwargs)
+            except TRANSIENT_ERRORS as error:
+                delay = self.retrier.claim_error_retry(error, attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retrier.claim_retry(response, attempt)
+                if delay is None:
+                    return response
+                response.close()
+            await throttle.pause(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+class AsyncMeetupApi:
+
+    """Retrieves events from Meetup in worker threads, sharing the session,
+    URLs, and throttle of a Meetup API."""
+
+    def __init__(self, meetup_api, throttle, retrier):
+        """Initialize with a Meetup API, an asyncio throttle wrapping the API's
+        throttle, and an asyncio retrier."""
+        self.meetup_api = meetup_api
+        self.throttle = throttle
+        self.retrier = retrier
+
+    async def retrieve_event_json(self, meetup_id):
+        """Retrieve the JSON event by its Meetup ID. Return None if the event
+        is unavailable."""
+        meetup_api = self.meetup_api
+        url = meetup_api.build_url(meetup_api.group_url_name, "events", meetup_id)
+        response = await self.retrier.request(
+            self.throttle, meetup_api.session.get, url, params=meetup_api.event_params()
+        )
+        return meetup_api.event_json_from_response(response)
+
+
+class AsyncApricotApi:
+
+    """Inserts events and registration types into Wild Apricot in worker
+    threads, sharing the session and URLs of a Wild Apricot API."""
+
+    def __init__(self, apricot_api, throttle, retrier, dryrun=False):
+        """Initialize with a Wild Apricot API, an asyncio throttle wrapping the
+        API's throttle, an asyncio retrier, and a dry run flag."""
+        self.apricot_api = apricot_api
+        self.throttle = throttle
+        self.retrier = retrier
+        self.dryrun = dryrun
+
+    async def post(self, url, json=None, **payload):
+        """Request posting at a URL and return the response."""
+        response = await self.retrier.request(
+            self.throttle, self.apricot_api.session.post, url, json=json, data=payload
+        )
+        ApricotApiError.check_response_status(response)
+        return response
+
+    @dryrun.async_method(value=12345)
+    async def add_event(self, event):
+        """Insert an event into Wild Apricot."""
+        url = self.apricot_api.account_url("events")
+        return int((await self.post(url, json=event)).content)
+
+    @dryrun.async_method(value=98765)
+    async def add_registration_type(self, registration_type):
+        """Insert an event registration type into Wild Apricot."""
+        url = self.apricot_api.account_url("EventRegistrationTypes")
+        return int((await self.post(url, json=registration_type)).content)
+
+
+class AsyncPhotoRetriever:
+
+    """Retrieves photos from Meetup into local storage in worker threads."""
+
+    def __init__(self, photo_retriever):
+        """Initialize with a photo retriever."""
+        self.photo_retriever = photo_retriever
+
+    async def get(self, photo_url, proposed_photo_filename):
+        """Get the photo from the URL and store it with the proposed name.
+        Return the actual filename."""
+        return await asyncio.to_thread(
+            self.photo_retriever.get, photo_url, proposed_photo_filename
+        )
+
+
+class AsyncPhotoUploader:
+
+    """Uploads photos via WebDAV to Wild Apricot in worker threads."""
+
+    def __init__(self, photo_uploader):
+        """Initialize with a photo uploader."""
+        self.photo_uploader = photo_uploader
+
+    async def upload_photo(self, photo_file_name):
+        """Upload a named photo file to Wild Apricot. Return the path to the
+        photo at Wild Apricot."""
+        return await asyncio.to_thread(
+            self.photo_uploader.upload_photo, photo_file_name
+        )
+
+
+def run_with_workers(coroutine, max_workers):
+    """Run a coroutine in a new event loop whose worker threads number at most
+    some maximum. Return the coroutine's result."""
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=max_workers)
+        )
+        return await coroutine
+
+    return asyncio.run(run())
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
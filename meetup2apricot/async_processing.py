@@ -0,0 +1,233 @@
+"""Process Meetup events concurrently under asyncio: verify cached Meetup
+events, copy photos, and add Wild Apricot events and registration types, with
+many events in flight at once. Report and record events in their original
+order, so results match those of sequential processing."""
+
+from .async_clients import run_with_workers
+from .event_processor import EventProcessor
+from .http_response_error import PhotoRetrieveError, PhotoUploadError
+from .meetup2apricot import Meetup2Apricot
+from .meetup_event_retriever import MeetupEventRetriever
+from .meetup_to_apricot_event_adaptor import MeetupToApricotEventAdaptor
+from .photo_cache import PhotoCache
+from collections import namedtuple
+import asyncio
+
+TransferredEvent = namedtuple(
+    "TransferredEvent",
+    "apricot_event apricot_event_id registration_types registration_errors error",
+)
+
+
+class AsyncMeetupEventRetriever(MeetupEventRetriever):
+
+    """Retrieves events by ID from cache or Meetup API, prefetching them
+    concurrently with an asyncio Meetup API."""
+
+    def __init__(self, meetup_api, async_meetup_api, meetup_events, **kwargs):
+        """Initialize with a Meetup API interface, its asyncio counterpart, a
+        list of Meetup events, and the keyword arguments of a Meetup event
+        retriever."""
+        super().__init__(meetup_api, meetup_events, **kwargs)
+        self.async_meetup_api = async_meetup_api
+
+    def prefetch_events(self, meetup_ids):
+        """Retrieve events by Meetup ID from Meetup, concurrently, unless they
+        are already available."""
+        missing_ids = self.missing_event_ids(meetup_ids)
+        if not missing_ids:
+            return
+        events = run_with_workers(self.retrieve_events(missing_ids), self.max_workers)
+        self.events_by_id.update(zip(missing_ids, events))
+
+    async def retrieve_events(self, meetup_ids):
+        """Retrieve events by Meetup ID from Meetup concurrently. Return a
+        list of the events, with None for unavailable events."""
+        return await asyncio.gather(
+            *(self.retrieve_event_async(meetup_id) for meetup_id in meetup_ids)
+        )
+
+    async def retrieve_event_async(self, meetup_id):
+        """Retrieve a Meetup event by ID from Meetup. Return the event or None
+        if it is cancelled or unavailable."""
+        if self.dead_event_cache.is_dead(meetup_id):
+            return None
+        event_json = await self.async_meetup_api.retrieve_event_json(meetup_id)
+        return self.event_from_json(meetup_id, event_json)
+
+
+class AsyncPhotoCache(PhotoCache):
+
+    """Caches event featured photos for upload to Wild Apricot with an
+    asyncio photo retriever and uploader. Concurrent events sharing a photo
+    copy it once."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize with the arguments of a photo cache, given an asyncio
+        photo retriever and uploader."""
+        super().__init__(*args, **kwargs)
+        self.copies = {}
+
+    async def cache_photo(self, meetup_event):
+        """Cache a Meetup event's photo for copying to Wild Apricot and return
+        it's Wild Apricot path. Await a copy already in progress."""
+        photo_url = meetup_event.photo_url
+        if photo_url not in self.urls_to_paths:
+            copy = self.copies.get(photo_url)
+            if copy is None:
+                copy = asyncio.ensure_future(
+                    self.copy_meetup_photo_to_apricot(meetup_event)
+                )
+                self.copies[photo_url] = copy
+                copy.add_done_callback(lambda _: self.copies.pop(photo_url, None))
+            await copy
+        self.photo_usage.touch(photo_url)
+        return self.urls_to_paths[photo_url]
+
+    async def copy_meetup_photo_to_apricot(self, meetup_event):
+        """Copy a Meetup photo to Wild Apricot."""
+        proposed_photo_name = self.apricot_photo_file_name(meetup_event)
+        apricot_photo_name = await self.photo_retriever.get(
+            meetup_event.photo_url, proposed_photo_name
+        )
+        apricot_photo_path = await self.photo_uploader.upload_photo(apricot_photo_name)
+        self.urls_to_paths[meetup_event.photo_url] = apricot_photo_path
+        self.reporter.report_photo_name(apricot_photo_name)
+
+
+class AsyncEventProcessor(EventProcessor):
+
+    """Processes Meetup events into Wild Apricot events concurrently with an
+    asyncio Wild Apricot API and photo cache."""
+
+    def __init__(self, *args, max_in_flight=100, **kwargs):
+        """Initialize with the arguments of an event processor, given an
+        asyncio Wild Apricot API and photo cache, and the most events to
+        process at once."""
+        super().__init__(*args, **kwargs)
+        self.max_in_flight = max_in_flight
+
+    async def process_all(self, meetup_events):
+        """Process Meetup events concurrently. Report and record each event in
+        order once it and the events before it are transferred. After a
+        failure, start no more transfers, but let those started finish and
+        record the successful ones, as their Wild Apricot events exist. Then
+        raise the first error."""
+        new_events = []
+        new_ids = set()
+        for meetup_event in meetup_events:
+            if self.can_ignore_event(meetup_event):
+                continue
+            if meetup_event.meetup_id not in new_ids:
+                new_ids.add(meetup_event.meetup_id)
+                new_events.append(meetup_event)
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        failed = asyncio.Event()
+        transfers = [
+            asyncio.ensure_future(self.transfer(meetup_event, in_flight, failed))
+            for meetup_event in new_events
+        ]
+        first_error = None
+        try:
+            for meetup_event, transfer in zip(new_events, transfers):
+                try:
+                    transferred = await transfer
+                    if transferred is not None:
+                        self.record_transfer(meetup_event, transferred)
+                except Exception as err:
+                    failed.set()
+                    first_error = first_error or err
+        finally:
+            for transfer in transfers:
+                transfer.cancel()
+        if first_error:
+            raise first_error
+
+    async def transfer(self, meetup_event, in_flight, failed):
+        """Transfer a Meetup event once fewer than the most events are in
+        flight, unless a transfer has failed. Set the failed flag if this
+        transfer fails. Return the transferred event, or None if not
+        started."""
+        async with in_flight:
+            if failed.is_set():
+                return None
+            try:
+                transferred = await self.transfer_event(meetup_event)
+            except Exception:
+                failed.set()
+                raise
+            if any(transferred.registration_errors):
+                failed.set()
+            return transferred
+
+    async def transfer_event(self, meetup_event):
+        """Copy a Meetup event's photo and add its Wild Apricot event and,
+        concurrently, its registration types. Return the transferred event
+        with the error adding each registration type, or None."""
+        try:
+            photo_path = await self.photo_cache.cache_photo(meetup_event)
+        except (PhotoRetrieveError, PhotoUploadError) as err:
+            return TransferredEvent(None, None, [], [], err)
+        event_tags = self.get_event_tags(meetup_event)
+        apricot_event = MeetupToApricotEventAdaptor(
+            meetup_event, photo_path, event_tags
+        )
+        apricot_event_id = await self.apricot_api.add_event(apricot_event.for_json())
+        reg_types = self.gather_registration_types(meetup_event, apricot_event_id)
+        results = await asyncio.gather(
+            *(
+                self.apricot_api.add_registration_type(reg_type.for_json())
+                for reg_type in reg_types
+            ),
+            return_exceptions=True,
+        )
+        errors = [
+            result if isinstance(result, Exception) else None for result in results
+        ]
+        return TransferredEvent(
+            apricot_event, apricot_event_id, reg_types, errors, None
+        )
+
+    def record_transfer(self, meetup_event, transferred):
+        """Report and record a transferred Meetup event, or count and log it
+        as skipped. Raise an error grouping the event's registration type
+        errors, if any, after recording the event."""
+        if transferred.error:
+            self.skip_event(meetup_event, transferred.error)
+            return
+        apricot_event_id = transferred.apricot_event_id
+        self.report_apricot_event(
+            meetup_event, transferred.apricot_event, apricot_event_id
+        )
+        try:
+            self.report_registration_types(
+                meetup_event,
+                apricot_event_id,
+                transferred.registration_types,
+                transferred.registration_errors,
+            )
+        finally:
+            self.record_event(meetup_event, apricot_event_id)
+            self.reporter.report()
+
+
+class AsyncMeetup2Apricot(Meetup2Apricot):
+
+    """Downloads Meetup events into Wild Apricot, processing events
+    concurrently under asyncio."""
+
+    def __init__(self, *args, max_workers, **kwargs):
+        """Initialize with the arguments of a Meetup to Wild Apricot processor
+        and the most worker threads sending web requests."""
+        super().__init__(*args, **kwargs)
+        self.max_workers = max_workers
+
+    def add_apricot_events(self, event_processor):
+        """Use an asyncio event processor to add Meetup events to Wild
+        Apricot."""
+        run_with_workers(
+            event_processor.process_all(self.meetup_events), self.max_workers
+        )
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
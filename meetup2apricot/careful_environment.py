@@ -31,6 +31,11 @@ class CarefulEnvironment(collections.abc.Mapping):
         """Return the length of thw wrapped environment."""
         return len(self._env_vars)
 
+    def get(self, key, default=None):
+        """Return the environment variable value with the named key or a
+        default if it is missing."""
+        return self._env_vars.get(key, default)
+
     def json(self, key):
         """Return the deserialized JSON value from the environment variable
         named key.  If the data being deserialized is not a valid JSON
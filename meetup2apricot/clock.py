@@ -0,0 +1,41 @@
+"""Clocks that tell time and sleep, either really or virtually."""
+
+import time
+
+
+class SystemClock:
+
+    """Tells the system time and sleeps in real time."""
+
+    def time(self):
+        """Return the current time in seconds since the epoch."""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Sleep for some seconds."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+
+    """Tells a virtual time that advances only by sleeping, which returns
+    immediately."""
+
+    def __init__(self, start_time=0):
+        """Initialize with a start time in seconds since the epoch."""
+        self.now = start_time
+
+    def time(self):
+        """Return the virtual time."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Advance the virtual time by some seconds."""
+        if seconds > 0:
+            self.now += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
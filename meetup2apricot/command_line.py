@@ -1,7 +1,21 @@
 """Command line options."""
 
+from .http_cassette import RECORDED_LATENCY
 import argparse
 
+
+def latency(value):
+    """Convert a latency argument, either "recorded" or a number of seconds."""
+    if value == RECORDED_LATENCY:
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"must be {RECORDED_LATENCY} or a number of seconds: {value}"
+        ) from None
+
+
 parser = argparse.ArgumentParser(description="Download Meetup events into Wild Apricot")
 
 parser.add_argument(
@@ -70,6 +84,76 @@ parser.add_argument(
     "-w", "--warnings", action="store_true", help="Log warnings to standard error"
 )
 
+parser.add_argument(
+    "--apricot-throttle-file",
+    metavar="PATH",
+    help="Share the Wild Apricot API rate limit with other processes "
+    "through this state file",
+)
+
+parser.add_argument(
+    "--stream-json",
+    action="store_true",
+    help="Parse Meetup events one at a time as they download",
+)
+
+parser.add_argument(
+    "--async",
+    action="store_true",
+    dest="async_mode",
+    help="Process many events at once with asyncio",
+)
+
+parser.add_argument(
+    "--database",
+    metavar="PATH",
+    help="Keep known events and photo paths in this SQLite database instead "
+    "of the cache files",
+)
+
+parser.add_argument(
+    "--max-photos",
+    type=int,
+    metavar="COUNT",
+    help="Keep at most this many of the most recently used photos cached "
+    "(default: no limit)",
+)
+
+parser.add_argument(
+    "--photo-max-age",
+    type=int,
+    metavar="DAYS",
+    help="Forget cached photos unused for this many days (default: never)",
+)
+
+parser.add_argument(
+    "--clean-photos",
+    action="store_true",
+    help="Delete the local files of photos forgotten by the photo cache",
+)
+
+cassette_group = parser.add_mutually_exclusive_group()
+
+cassette_group.add_argument(
+    "--record-cassette",
+    metavar="PATH",
+    help="Record all web requests and responses to this cassette file",
+)
+
+cassette_group.add_argument(
+    "--replay-cassette",
+    metavar="PATH",
+    help="Replay web responses from this cassette file instead of the network",
+)
+
+parser.add_argument(
+    "--replay-latency",
+    type=latency,
+    metavar="LATENCY",
+    help="Delay each replayed response by the recorded latency (recorded) "
+    "or by a number of seconds",
+)
+
 
 def parse_args(args=None):
     return parser.parse_args(args)
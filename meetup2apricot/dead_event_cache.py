@@ -0,0 +1,112 @@
+"""Remember Meetup event IDs that Meetup reports as forbidden, missing, or gone,
+so later runs need not request them again."""
+
+from . import dryrun
+from .clock import SYSTEM_CLOCK
+import logging
+import pickle
+import threading
+
+
+class DeadEventCache:
+
+    """Caches the Meetup IDs of dead events with the times they were found
+    dead. Forgets them after a time to live, in case they return. Counts cache
+    hits and misses."""
+
+    logger = logging.getLogger("DeadEventCache")
+
+    def __init__(self, cache_path, time_to_live, dryrun=False, clock=SYSTEM_CLOCK):
+        """Initialize with a path to the cache file, a time to live (seconds),
+        a dry run flag, and an optional clock."""
+        self.cache_path = cache_path
+        self.time_to_live = time_to_live
+        self.dryrun = dryrun
+        self.clock = clock
+        self.dead_times = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Load the unexpired dead event IDs from the cache file, if any."""
+        if not self.cache_path.exists():
+            return
+        try:
+            with self.cache_path.open("rb") as f:
+                dead_times = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as err:
+            self.logger.warning("Cannot load dead event cache: %s", err)
+            return
+        self.dead_times = {
+            meetup_id: dead_time
+            for (meetup_id, dead_time) in dead_times.items()
+            if not self.is_expired(dead_time)
+        }
+
+    def is_dead(self, meetup_id):
+        """Return true if an event with a Meetup ID was recently found dead;
+        false otherwise. Count the hit or miss."""
+        with self.lock:
+            dead_time = self.dead_times.get(meetup_id)
+            if dead_time is None or self.is_expired(dead_time):
+                self.misses += 1
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, meetup_id):
+        """Record that an event with a Meetup ID was found dead now."""
+        with self.lock:
+            self.dead_times[meetup_id] = self.clock.time()
+
+    def is_expired(self, dead_time):
+        """Return true if a time an event was found dead is older than the
+        time to live; false otherwise."""
+        return self.clock.time() - dead_time > self.time_to_live
+
+    def log_statistics(self):
+        """Log the cache hits and misses."""
+        self.logger.info(
+            "dead_events=%d hits=%d misses=%d",
+            len(self.dead_times),
+            self.hits,
+            self.misses,
+        )
+
+    @dryrun.method()
+    def persist(self):
+        """Persist the dead event IDs to the cache file."""
+        with self.cache_path.open("wb") as f:
+            pickle.dump(self.dead_times, f)
+
+
+class NullDeadEventCache:
+
+    """Remembers no dead events."""
+
+    def is_dead(self, meetup_id):
+        """Return false, as no events are remembered."""
+        return False
+
+    def add(self, meetup_id):
+        """Remember nothing."""
+
+    def log_statistics(self):
+        """Log nothing."""
+
+    def persist(self):
+        """Persist nothing."""
+
+
+NULL_DEAD_EVENT_CACHE = NullDeadEventCache()
+
+
+def load_dead_event_cache(cache_path, time_to_live, dryrun=False):
+    """Return a dead event cache loaded from a cache file."""
+    dead_event_cache = DeadEventCache(cache_path, time_to_live, dryrun=dryrun)
+    dead_event_cache.load()
+    return dead_event_cache
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
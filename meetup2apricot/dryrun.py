@@ -61,6 +61,30 @@ def method(value=None, *, flag_name="dryrun"):
     return decorator
 
 
+def async_method(value=None, *, flag_name="dryrun"):
+    """Return a coroutine method decorator to skip a coroutine function in dry
+    run mode, returning the value, if the named flag is true."""
+
+    def decorator(method):
+        """Decorate a coroutine method with a wrapper that gates operation
+        with a named flag."""
+
+        async def wrapper(obj, *args, **kwargs):
+            """Wrap a coroutine function, skipping it in dry run mode it the
+            named flag is true and returning the value. The function runs
+            normally if the flag is false."""
+            dry_run = getattr(obj, flag_name, False)
+            if dry_run:
+                log_method_call(method, obj, *args, **kwargs)
+                return value
+            else:
+                return await method(obj, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 def log_method_call(method, obj, *args, **kwargs):
     """Log a method call by an object with some arguments."""
     arg_text = ", ".join((f"{arg!r}" for arg in args))
@@ -0,0 +1,272 @@
+"""Generate a synthetic corpus of realistic Meetup event JSON for scale
+testing, reproducible from a seed."""
+
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import string
+import sys
+
+DEFAULT_ACCOUNTING_CODES = (
+    "3D",
+    "AC",
+    "AV",
+    "BL",
+    "CC",
+    "CS",
+    "EL",
+    "GO",
+    "LC",
+    "MW",
+    "MX",
+    "SL",
+    "SO",
+    "TS",
+    "WW",
+)
+
+TOPICS = (
+    "Laser Cutter Basics",
+    "Intro to 3D Printing",
+    "Woodshop Safety",
+    "Arduino Workshop",
+    "Blacksmithing Fundamentals",
+    "Mending Monday",
+    "CNC Router Sign-off",
+    "Soldering 101",
+    "Open Shop Night",
+    "Green Orientation",
+    "Resin Casting",
+    "Metal Lathe Checkout",
+    "Video Editing with OBS",
+    "Leatherworking",
+    "Composite Layup",
+)
+
+MEMBERS_ONLY_SUFFIXES = (" (Members Only)", " - members only", " [Members-Only]")
+
+VENUES = (
+    {
+        "name": "Nova Labs",
+        "address_1": "1916 Isaac Newton Square W",
+        "city": "Reston",
+        "state": "VA",
+        "zip": "20190",
+    },
+    {
+        "name": "Nova Labs Annex",
+        "address_1": "1930 Isaac Newton Square W",
+        "city": "Reston",
+        "state": "VA",
+        "zip": "20190",
+    },
+    {"name": "Online event"},
+)
+
+FEE_AMOUNTS = (5.0, 10.0, 20.0, 35.0, 50.0, 75.0, 120.0)
+RSVP_LIMITS = (4, 6, 8, 10, 12, 16, 20, 30)
+DURATIONS_MINUTES = (60, 90, 120, 180, 240)
+
+WORDS = (
+    "bring safety glasses closed toed shoes project materials provided "
+    "members guests tools shop class hands on learn build make design "
+    "refund policy please arrive early instructor will cover basics of "
+    "machine operation and maintenance questions welcome"
+).split()
+
+MEETUP_ID_LENGTH = 13
+MEETUP_LINK = "https://www.meetup.com/{group}/events/{meetup_id}/"
+PHOTO_URL = "https://secure.meetupstatic.com/photos/event/{path}/highres_{id}.jpeg"
+
+
+class EventCorpusGenerator:
+
+    """Generates realistic Meetup JSON events for a group, varying accounting
+    codes, members only titles, fees, RSVP limits, venues, photos, and
+    description sizes. The same seed and start time generate the same
+    events."""
+
+    def __init__(
+        self,
+        start_time,
+        seed=None,
+        accounting_codes=DEFAULT_ACCOUNTING_CODES,
+        group_url_name="NOVA-Makers",
+        events_per_day=6,
+        max_description_size=4000,
+    ):
+        """Initialize with a start time for the first event, a random seed,
+        accounting codes to prefix event names, a Meetup group URL name, the
+        average number of events per day, and the largest description size
+        (characters)."""
+        self.start_time = start_time
+        self.random = random.Random(seed)
+        self.accounting_codes = list(accounting_codes)
+        self.group_url_name = group_url_name
+        self.events_per_day = events_per_day
+        self.max_description_size = max_description_size
+
+    def events(self, count):
+        """Yield a number of JSON events in start time order."""
+        start_time = self.start_time
+        photo_pool_size = max(1, count // 5)
+        for _ in range(count):
+            start_time = self.next_start_time(start_time)
+            yield self.event(start_time, photo_pool_size)
+
+    def next_start_time(self, start_time):
+        """Return a start time after a previous start time, rounded to a
+        quarter hour, keeping the average number of events per day."""
+        gap = timedelta(days=self.random.expovariate(self.events_per_day))
+        next_time = start_time + gap
+        return next_time.replace(
+            minute=next_time.minute // 15 * 15, second=0, microsecond=0
+        )
+
+    def event(self, start_time, photo_pool_size):
+        """Return a JSON event starting at a time, with a photo chosen from a
+        pool of some size, as events in a series share photos."""
+        rng = self.random
+        meetup_id = "".join(rng.choices(string.ascii_lowercase, k=MEETUP_ID_LENGTH))
+        start_ms = int(start_time.timestamp() * 1000)
+        updated_ms = start_ms - rng.randrange(60 * 24 * 60 * 60 * 1000)
+        event = {
+            "id": meetup_id,
+            "name": self.name(),
+            "description": self.description(),
+            "duration": rng.choice(DURATIONS_MINUTES) * 60 * 1000,
+            "link": MEETUP_LINK.format(group=self.group_url_name, meetup_id=meetup_id),
+            "status": "cancelled" if rng.random() < 0.03 else "upcoming",
+            "time": start_ms,
+            "updated": updated_ms,
+            "venue": dict(rng.choice(VENUES)),
+        }
+        if rng.random() < 0.4:
+            event["fee"] = {
+                "amount": rng.choice(FEE_AMOUNTS),
+                "currency": "USD",
+                "required": True,
+            }
+        if rng.random() < 0.6:
+            event["rsvp_limit"] = rng.choice(RSVP_LIMITS)
+        if rng.random() < 0.7:
+            event["featured_photo"] = {
+                "highres_link": self.photo_url(rng.randrange(photo_pool_size))
+            }
+        if rng.random() < 0.05:
+            event["featured"] = True
+        if rng.random() < 0.3:
+            event["how_to_find_us"] = "Enter through the side door."
+        return event
+
+    def name(self):
+        """Return an event name with zero to two accounting code prefixes,
+        sometimes for members only."""
+        rng = self.random
+        code_count = rng.choices([0, 1, 2], weights=[1, 7, 2])[0]
+        code_count = min(code_count, len(self.accounting_codes))
+        codes = rng.sample(self.accounting_codes, code_count)
+        prefix = "_".join(codes) + ": " if codes else ""
+        suffix = rng.choice(MEMBERS_ONLY_SUFFIXES) if rng.random() < 0.1 else ""
+        return f"{prefix}{rng.choice(TOPICS)}{suffix}"
+
+    def description(self):
+        """Return an HTML description of paragraphs with a size skewed toward
+        short descriptions, up to the largest description size."""
+        rng = self.random
+        size = min(self.max_description_size, int(rng.lognormvariate(6, 1)))
+        paragraphs = []
+        length = 0
+        while length < size:
+            words = rng.choices(WORDS, k=rng.randint(8, 40))
+            paragraph = "<p>" + " ".join(words).capitalize() + ".</p>"
+            paragraphs.append(paragraph)
+            length += len(paragraph)
+        return " ".join(paragraphs)[: self.max_description_size]
+
+    @staticmethod
+    def photo_url(photo_id):
+        """Return a Meetup photo URL for a photo ID."""
+        photo_id += 400000000
+        path = "/".join(f"{photo_id:x}"[-4:])
+        return PHOTO_URL.format(path=path, id=photo_id)
+
+
+def write_json_array(events, output):
+    """Write JSON events to an output stream as a JSON array, one event per
+    line, without holding them all in memory. Return the number written."""
+    count = 0
+    output.write("[")
+    for event in events:
+        output.write(",\n" if count else "\n")
+        output.write(json.dumps(event, separators=(",", ":")))
+        count += 1
+    output.write("\n]\n")
+    return count
+
+
+def accounting_codes_argument(codes_to_tags):
+    """Return the accounting codes in a JSON object mapping codes to tags,
+    such as the CODES_TO_TAGS environment variable."""
+    try:
+        return tuple(json.loads(codes_to_tags))
+    except json.JSONDecodeError as err:
+        raise argparse.ArgumentTypeError(f"Invalid JSON codes to tags: {err}")
+
+
+parser = argparse.ArgumentParser(
+    description="Generate a synthetic corpus of Meetup events as a JSON array"
+)
+parser.add_argument(
+    "-c", "--count", type=int, default=10000, help="Number of events to generate"
+)
+parser.add_argument("--seed", type=int, help="Random seed for a reproducible corpus")
+parser.add_argument(
+    "--start",
+    type=datetime.fromisoformat,
+    help="Start time before the first event, ISO 8601 (default: today)",
+)
+parser.add_argument(
+    "--codes-to-tags",
+    type=accounting_codes_argument,
+    default=DEFAULT_ACCOUNTING_CODES,
+    help="JSON object mapping accounting codes to tags, such as $CODES_TO_TAGS",
+)
+parser.add_argument(
+    "--group", default="NOVA-Makers", help="Meetup group URL name for event links"
+)
+parser.add_argument(
+    "--events-per-day", type=float, default=6, help="Average events per day"
+)
+parser.add_argument(
+    "-o", "--output", type=argparse.FileType("w"), help="Output file (default: stdout)"
+)
+
+
+def main(args=None, output=None):
+    """Generate a corpus described by command line arguments to an output
+    stream."""
+    options = parser.parse_args(args)
+    start_time = options.start or datetime.now().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    generator = EventCorpusGenerator(
+        start_time=start_time.astimezone(),
+        seed=options.seed,
+        accounting_codes=options.codes_to_tags,
+        group_url_name=options.group,
+        events_per_day=options.events_per_day,
+    )
+    events = generator.events(options.count)
+    if options.output:
+        with options.output:
+            write_json_array(events, options.output)
+    else:
+        write_json_array(events, output or sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -18,11 +18,24 @@ class EventMappingUpdater:
         """Update a mapping of Meetup IDs to Wild Apricot event IDs and start
         times. Remove outdated events. Verify and correct Meetup IDs. Return
         the updated mapping."""
+        self.prefetch_events(event_mapping)
         cleansed_events = self.clean_event_mapping(event_mapping)
         skipped_events = self.skipped_event_ids_and_times()
         cleansed_events.update(skipped_events)
         return cleansed_events
 
+    def prefetch_events(self, event_mapping):
+        """Retrieve all the Meetup events needed to update an event mapping in
+        one batch: timely mapped events and skipped events."""
+        timely_meetup_ids = [
+            meetup_id
+            for (meetup_id, apricot_event_data) in event_mapping.items()
+            if self.is_timely(apricot_event_data)
+        ]
+        self.meetup_event_retriever.prefetch_events(
+            timely_meetup_ids + list(self.skip_meetup_ids)
+        )
+
     def clean_event_mapping(self, event_mapping):
         """Clean a an event mapping.  Remove outdated events. Verify and
         correct Meetup IDs. Return the cleansed mapping."""
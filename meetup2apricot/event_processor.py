@@ -3,9 +3,11 @@ downloading Meetup photos for manual uploading to Wild Apricot, and by tracking
 events and photos already seen."""
 
 from . import dryrun
+from .exceptions import RegistrationTypesError
 from .http_response_error import PhotoRetrieveError, PhotoUploadError
 from .meetup_to_apricot_event_adaptor import MeetupToApricotEventAdaptor
-import pickle
+from .journal import load_journaled_mapping
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 
@@ -23,47 +25,55 @@ class EventProcessor:
         photo_cache,
         event_registration_type_maker,
         apricot_api,
-        cache_path,
         event_tagger,
         reporter,
         dryrun=False,
     ):
         """Initialize with the earliest and latest event start times, a
-        dictionary of previously processed known events (indexed by Meetup
-        event ID), a photo cache, an event registration type maker, a Wild
-        Apricot API interface, a path to the cache file; an event tagger, a
-        reporter, and a dry run flag."""
+        journaled mapping of previously processed known events (indexed by
+        Meetup event ID), a photo cache, an event registration type maker, a
+        Wild Apricot API interface, an event tagger, a reporter, and a dry run
+        flag."""
         self.earliest_start_time = earliest_start_time
         self.latest_start_time = latest_start_time
         self.known_events = known_events
         self.photo_cache = photo_cache
         self.event_registration_type_maker = event_registration_type_maker
         self.apricot_api = apricot_api
-        self.cache_path = cache_path
         self.event_tagger = event_tagger
         self.reporter = reporter
         self.dryrun = dryrun
+        self.skipped_count = 0
 
     def process(self, meetup_event):
-        """Process a meetup event."""
+        """Process a meetup event. Record and report the Wild Apricot event
+        once added, even if adding its registration types fails, so later runs
+        don't add it again."""
         if self.can_ignore_event(meetup_event):
             return
         try:
             photo_path = self.copy_photo(meetup_event)
         except (PhotoRetrieveError, PhotoUploadError) as err:
-            self.logger.warning(
-                "skipping %s: %s at %s\n%s",
-                meetup_event.meetup_id,
-                meetup_event.name,
-                f"{meetup_event.start_time:%Y-%m-%d %H:%M}",
-                err,
-            )
+            self.skip_event(meetup_event, err)
             return
         event_tags = self.get_event_tags(meetup_event)
         apricot_event_id = self.add_apricot_event(meetup_event, photo_path, event_tags)
-        self.add_event_registration_types(meetup_event, apricot_event_id)
-        self.record_event(meetup_event, apricot_event_id)
-        self.reporter.report()
+        try:
+            self.add_event_registration_types(meetup_event, apricot_event_id)
+        finally:
+            self.record_event(meetup_event, apricot_event_id)
+            self.reporter.report()
+
+    def skip_event(self, meetup_event, err):
+        """Count and log a Meetup event skipped because of an error."""
+        self.skipped_count += 1
+        self.logger.warning(
+            "skipping %s: %s at %s\n%s",
+            meetup_event.meetup_id,
+            meetup_event.name,
+            f"{meetup_event.start_time:%Y-%m-%d %H:%M}",
+            err,
+        )
 
     def can_ignore_event(self, meetup_event):
         """Return true if a Meetup event can be ignored; false otherwise."""
@@ -90,6 +100,12 @@ class EventProcessor:
         )
         apricot_event_json = apricot_event.for_json()
         apricot_event_id = self.apricot_api.add_event(apricot_event_json)
+        self.report_apricot_event(meetup_event, apricot_event, apricot_event_id)
+        return apricot_event_id
+
+    def report_apricot_event(self, meetup_event, apricot_event, apricot_event_id):
+        """Report and log a Wild Apricot event added with an ID for a Meetup
+        event."""
         self.reporter.report_event(apricot_event)
         self.logger.info(
             "add_apricot_event: meetup_id=%s apricot_id=%d title=%r start_time=%s",
@@ -98,16 +114,41 @@ class EventProcessor:
             meetup_event.name,
             meetup_event.start_time,
         )
-        return apricot_event_id
 
     def add_event_registration_types(self, meetup_event, apricot_event_id):
         """Add event registration types for a Wild Apricot event based on a
-        Meetup event."""
+        Meetup event. The registration types are independent, so add them
+        concurrently, as the Wild Apricot throttle allows."""
         reg_types = self.gather_registration_types(meetup_event, apricot_event_id)
-        for reg_type in reg_types:
-            self.apricot_api.add_registration_type(reg_type.for_json())
+        with ThreadPoolExecutor(max_workers=len(reg_types)) as executor:
+            additions = [
+                executor.submit(
+                    self.apricot_api.add_registration_type, reg_type.for_json()
+                )
+                for reg_type in reg_types
+            ]
+        errors = [addition.exception() for addition in additions]
+        self.report_registration_types(
+            meetup_event, apricot_event_id, reg_types, errors
+        )
+
+    def report_registration_types(
+        self, meetup_event, apricot_event_id, reg_types, errors
+    ):
+        """Report and log the registration types added for a Wild Apricot
+        event, given the error adding each, or None. Raise an error grouping
+        the errors for the event if any registration type failed."""
+        failures = []
+        for reg_type, err in zip(reg_types, errors):
+            if err:
+                failures.append((reg_type, err))
+                continue
             self.reporter.report_registration_type(reg_type)
             self.log_add_event_registration_type(apricot_event_id, reg_type)
+        if failures:
+            raise RegistrationTypesError(
+                meetup_event.meetup_id, apricot_event_id, failures, len(reg_types)
+            )
 
     def gather_registration_types(self, meetup_event, apricot_event_id):
         """Gather event registration types for a Wild Apricot event based on a
@@ -135,7 +176,8 @@ class EventProcessor:
         )
 
     def record_event(self, meetup_event, apricot_event_id):
-        """Record the known event to ignore in the future."""
+        """Record the known event to ignore in the future. The known events
+        journal the record at once."""
         self.known_events[meetup_event.meetup_id] = {
             "wild_apricot_event": apricot_event_id,
             "start_time": meetup_event.start_time,
@@ -143,19 +185,15 @@ class EventProcessor:
 
     @dryrun.method()
     def persist(self):
-        """Persist cache to a file."""
-        with self.cache_path.open("wb") as f:
-            pickle.dump(self.known_events, f)
-
-
-def load_cached_event_mapping(cache_path):
-    """Return a mapping of Meetup event IDs to Wild Apricot event details,
-    either loaded from a cache file or initialized to a default."""
-    if cache_path.exists():
-        with cache_path.open("rb") as f:
-            return pickle.load(f)
-    else:
-        return {}
+        """Persist the known events to the cache file and its journal."""
+        self.known_events.persist()
+
+
+def load_cached_event_mapping(cache_path, dryrun=False):
+    """Return a journaled mapping of Meetup event IDs to Wild Apricot event
+    details, either loaded from a cache file and its journal or initialized
+    to a default."""
+    return load_journaled_mapping(cache_path, {}, dryrun=dryrun)
 
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -26,6 +26,25 @@ class NoRestrictionsMatchError(Exception):
     """Raised when no event restrictions match event data."""
 
 
+class RegistrationTypesError(Exception):
+
+    """Raised when registration types for a Wild Apricot event could not be
+    added, grouping the errors for the event."""
+
+    def __init__(self, meetup_id, apricot_event_id, failures, count):
+        """Initialize with the Meetup event ID, the Wild Apricot event ID, a
+        list of failed registration types paired with their errors, and the
+        count of registration types for the event."""
+        self.meetup_id = meetup_id
+        self.apricot_event_id = apricot_event_id
+        self.failures = failures
+        errors = "; ".join(f"{reg_type.name}: {err}" for reg_type, err in failures)
+        super().__init__(
+            f"{len(failures)} of {count} registration types failed for Wild "
+            f"Apricot event {apricot_event_id} (Meetup event {meetup_id}): {errors}"
+        )
+
+
 class UnknownMemberLevelName(Exception):
     """Raised when an unknown member level name is requested."""
 
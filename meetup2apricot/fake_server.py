@@ -0,0 +1,652 @@
+"""Stand in for Meetup, Wild Apricot, and Wild Apricot's WebDAV photo server
+with one local web server, so whole runs can be load tested without contacting
+the real services."""
+
+from .clock import SYSTEM_CLOCK
+from .event_corpus import EventCorpusGenerator
+from collections import Counter, namedtuple
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import PurePosixPath
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import parse_http_list, parse_keqv_list
+import argparse
+import hashlib
+import json
+import random
+import re
+import secrets
+import struct
+import sys
+import threading
+import zlib
+
+MEETUP_PREFIX = "/meetup"
+APRICOT_PREFIX = "/apricot"
+OAUTH_PREFIX = "/oauth"
+PHOTO_PREFIX = "/photos"
+COUNTS_PATH = "/counts"
+
+DIGEST_REALM = "meetup2apricot-fake-webdav"
+
+MEMBERSHIP_LEVEL_NAMES = (
+    "Associate",
+    "Associate (legacy-billing)",
+    "Innovation Center",
+    "Key",
+    "Key (family)",
+    "Key (family-minor-16-17)",
+    "Key (legacy-billing)",
+    "Membership Application",
+    "Volunteer Staff",
+)
+
+FakeServiceSettings = namedtuple(
+    "FakeServiceSettings",
+    "latency error_rate meetup_rate apricot_rate time_span "
+    "photo_username photo_password seed",
+    defaults=(0.0, 0.0, 30, 100, 10.0, "photos", "photos", None),
+)
+
+
+def tiny_png():
+    """Return the bytes of a one pixel PNG image."""
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"\x00\xff"))
+        + chunk(b"IEND", b"")
+    )
+
+
+def window_time_ms(window_time):
+    """Return milliseconds since the epoch for a Meetup start time window
+    boundary, an ISO 8601 local time."""
+    return int(datetime.fromisoformat(window_time).timestamp() * 1000)
+
+
+class RateLimitWindow:
+
+    """Counts requests in fixed windows of time, allowing a number of requests
+    per window, and describes the limit in X-RateLimit headers."""
+
+    def __init__(self, rate, time_span, clock=SYSTEM_CLOCK):
+        """Initialize with a number of requests allowed per time span
+        (seconds) and an optional clock."""
+        self.rate = rate
+        self.time_span = time_span
+        self.clock = clock
+        self.window_start = clock.time()
+        self.count = 0
+
+    def admit(self):
+        """Count a request. Return true if it is within the rate limit; false
+        otherwise."""
+        now = self.clock.time()
+        if now - self.window_start >= self.time_span:
+            self.window_start = now
+            self.count = 0
+        self.count += 1
+        return self.count <= self.rate
+
+    def headers(self):
+        """Return a dictionary of X-RateLimit headers describing the current
+        window."""
+        reset = self.window_start + self.time_span - self.clock.time()
+        return {
+            "X-RateLimit-Limit": str(self.rate),
+            "X-RateLimit-Remaining": str(max(0, self.rate - self.count)),
+            "X-RateLimit-Reset": str(max(1, round(reset))),
+        }
+
+
+class FakeServices:
+
+    """Holds the state of the fake Meetup, Wild Apricot, and WebDAV services:
+    Meetup events, Wild Apricot events and registration types, issued tokens,
+    uploaded photos, rate limit windows, and counts of requests received."""
+
+    def __init__(self, settings, clock=SYSTEM_CLOCK):
+        """Initialize with fake service settings and an optional clock."""
+        self.settings = settings
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.random = random.Random(settings.seed)
+        self.meetup_events = []
+        self.meetup_events_by_id = {}
+        self.apricot_events = {}
+        self.registration_types = {}
+        self.uploaded_photos = {}
+        self.tokens = set()
+        self.next_id = 1000
+        self.nonce = secrets.token_hex(16)
+        self.counts = Counter()
+        self.rate_limits = {
+            MEETUP_PREFIX: RateLimitWindow(
+                settings.meetup_rate, settings.time_span, clock
+            ),
+            APRICOT_PREFIX: RateLimitWindow(
+                settings.apricot_rate, settings.time_span, clock
+            ),
+        }
+
+    def load_meetup_events(self, meetup_events, photo_base_url):
+        """Serve a list of JSON Meetup events, sorted by start time, with their
+        photos served from a base URL."""
+        for event in meetup_events:
+            photo = event.get("featured_photo")
+            if photo and "highres_link" in photo:
+                photo_name = PurePosixPath(urlsplit(photo["highres_link"]).path).name
+                photo["highres_link"] = f"{photo_base_url}/{photo_name}"
+        self.meetup_events = sorted(meetup_events, key=lambda event: event["time"])
+        self.meetup_events_by_id = {event["id"]: event for event in meetup_events}
+
+    def count(self, name):
+        """Count a request or outcome by name."""
+        with self.lock:
+            self.counts[name] += 1
+
+    def counts_json(self):
+        """Return a dictionary of the counts of requests received."""
+        with self.lock:
+            return dict(sorted(self.counts.items()))
+
+    def inject_error(self):
+        """Return true if a request should fail at the configured error rate;
+        false otherwise."""
+        with self.lock:
+            return self.random.random() < self.settings.error_rate
+
+    def admit(self, service_prefix):
+        """Count a request to a rate limited service. Return a pair: true if
+        the request is within the rate limit, and the X-RateLimit headers to
+        send."""
+        with self.lock:
+            window = self.rate_limits[service_prefix]
+            return window.admit(), window.headers()
+
+    def new_id(self):
+        """Return a new Wild Apricot ID."""
+        with self.lock:
+            self.next_id += 1
+            return self.next_id
+
+    def issue_token(self):
+        """Issue and return a new OAuth access token."""
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.tokens.add(token)
+        return token
+
+    def is_authorized(self, authorization):
+        """Return true if an Authorization header carries an issued bearer
+        token; false otherwise."""
+        scheme, _, token = (authorization or "").partition(" ")
+        with self.lock:
+            return scheme == "Bearer" and token in self.tokens
+
+    def select_meetup_events(self, query):
+        """Return the Meetup events selected by the no_earlier_than and
+        no_later_than parameters of a parsed query string."""
+        events = self.meetup_events
+        if "no_earlier_than" in query:
+            earliest = window_time_ms(query["no_earlier_than"][0])
+            events = [event for event in events if event["time"] >= earliest]
+        if "no_later_than" in query:
+            latest = window_time_ms(query["no_later_than"][0])
+            events = [event for event in events if event["time"] <= latest]
+        return events
+
+    def digest_response(self, method, fields):
+        """Return the expected digest authentication response for a request
+        method and the fields of its Authorization header."""
+
+        def md5(text):
+            return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+        settings = self.settings
+        ha1 = md5(f"{settings.photo_username}:{DIGEST_REALM}:{settings.photo_password}")
+        ha2 = md5(f"{method}:{fields.get('uri', '')}")
+        if fields.get("qop"):
+            return md5(
+                f"{ha1}:{self.nonce}:{fields.get('nc')}:{fields.get('cnonce')}:"
+                f"{fields.get('qop')}:{ha2}"
+            )
+        return md5(f"{ha1}:{self.nonce}:{ha2}")
+
+    def is_digest_authorized(self, method, authorization):
+        """Return true if a request method's Authorization header carries
+        valid digest credentials; false otherwise."""
+        scheme, _, credentials = (authorization or "").partition(" ")
+        if scheme != "Digest":
+            return False
+        fields = parse_keqv_list(parse_http_list(credentials))
+        return (
+            fields.get("username") == self.settings.photo_username
+            and fields.get("nonce") == self.nonce
+            and fields.get("response") == self.digest_response(method, fields)
+        )
+
+    def digest_challenge(self):
+        """Return a WWW-Authenticate header value challenging a client for
+        digest credentials."""
+        return f'Digest realm="{DIGEST_REALM}", nonce="{self.nonce}", qop="auth"'
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+
+    """Answers requests for the fake services, routing them by method and
+    path."""
+
+    protocol_version = "HTTP/1.1"
+
+    routes = [
+        ("GET", rf"{COUNTS_PATH}", "counts", "get_counts"),
+        ("GET", rf"{MEETUP_PREFIX}/status", "meetup status", "get_meetup_status"),
+        (
+            "GET",
+            rf"{MEETUP_PREFIX}/[^/]+/events",
+            "meetup events",
+            "get_meetup_events",
+        ),
+        (
+            "GET",
+            rf"{MEETUP_PREFIX}/[^/]+/events/(?P<meetup_id>[^/]+)",
+            "meetup event",
+            "get_meetup_event",
+        ),
+        ("GET", rf"{PHOTO_PREFIX}/[^/]+", "meetup photo", "get_photo"),
+        ("POST", rf"{OAUTH_PREFIX}/auth/token", "apricot token", "post_token"),
+        (
+            "GET",
+            rf"{APRICOT_PREFIX}/v2\.2/accounts/[^/]+/membershiplevels",
+            "apricot membership levels",
+            "get_membership_levels",
+        ),
+        (
+            "GET",
+            rf"{APRICOT_PREFIX}/v2\.2/accounts/[^/]+/events/(?P<event_id>\d+)",
+            "apricot event",
+            "get_apricot_event",
+        ),
+        (
+            "POST",
+            rf"{APRICOT_PREFIX}/v2\.2/accounts/[^/]+/events",
+            "apricot add event",
+            "post_apricot_event",
+        ),
+        (
+            "POST",
+            rf"{APRICOT_PREFIX}/v2\.2/accounts/[^/]+/EventRegistrationTypes",
+            "apricot add registration type",
+            "post_registration_type",
+        ),
+        (
+            "POST",
+            rf"{APRICOT_PREFIX}/v2\.2/rpc/[^/]+/CloneEvent",
+            "apricot clone event",
+            "post_clone_event",
+        ),
+        ("PUT", r"/.+", "webdav put", "put_photo"),
+    ]
+
+    @property
+    def services(self):
+        """Return the fake services of the server."""
+        return self.server.services
+
+    def do_GET(self):
+        """Answer a GET request."""
+        self.route("GET")
+
+    def do_POST(self):
+        """Answer a POST request."""
+        self.route("POST")
+
+    def do_PUT(self):
+        """Answer a PUT request."""
+        self.route("PUT")
+
+    def route(self, method):
+        """Read the request body and answer a request with the route matching
+        its method and path, after the configured latency. Inject errors and
+        enforce rate limits first."""
+        split_url = urlsplit(self.path)
+        self.query = parse_qs(split_url.query)
+        length = int(self.headers.get("Content-Length", 0))
+        self.body = self.rfile.read(length) if length else b""
+        self.services.clock.sleep(self.services.settings.latency)
+        for route_method, pattern, name, handler_name in self.routes:
+            match = re.fullmatch(pattern, split_url.path)
+            if route_method == method and match:
+                self.services.count(name)
+                if name != "counts" and self.services.inject_error():
+                    self.services.count("injected errors")
+                    self.send_body(
+                        HTTPStatus.SERVICE_UNAVAILABLE, b"", {"Retry-After": "1"}
+                    )
+                    return
+                getattr(self, handler_name)(**match.groupdict())
+                return
+        self.services.count("unknown")
+        self.send_body(HTTPStatus.NOT_FOUND, b"")
+
+    def send_body(self, status, body, headers=None):
+        """Send a response with a status, a body of bytes, and a dictionary of
+        headers."""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, value, headers=None):
+        """Send a response with a status, a JSON encoded value, and a
+        dictionary of headers."""
+        headers = dict(headers or {})
+        headers["Content-Type"] = "application/json;charset=utf-8"
+        self.send_body(status, json.dumps(value).encode("utf-8"), headers)
+
+    def admit(self, service_prefix):
+        """Enforce the rate limit of a service, answering with an error if the
+        request exceeds it. Return the X-RateLimit headers to send if the
+        request is admitted; None otherwise."""
+        admitted, headers = self.services.admit(service_prefix)
+        if admitted:
+            return headers
+        self.services.count("rate limited")
+        headers["Retry-After"] = headers["X-RateLimit-Reset"]
+        self.send_body(HTTPStatus.TOO_MANY_REQUESTS, b"", headers)
+        return None
+
+    def authorize(self):
+        """Check the bearer token and rate limit of a Wild Apricot API request,
+        answering with an error if either fails. Return true if the request
+        may proceed; false otherwise."""
+        if not self.services.is_authorized(self.headers.get("Authorization")):
+            self.services.count("unauthorized")
+            self.send_body(HTTPStatus.UNAUTHORIZED, b"")
+            return False
+        return self.admit(APRICOT_PREFIX) is not None
+
+    # Counts
+
+    def get_counts(self):
+        """Answer with the counts of requests received."""
+        self.send_json(HTTPStatus.OK, self.services.counts_json())
+
+    # Meetup
+
+    def get_meetup_status(self):
+        """Answer a Meetup status request with the rate limit."""
+        headers = self.admit(MEETUP_PREFIX)
+        if headers is not None:
+            self.send_json(HTTPStatus.OK, {"status": "ok"}, headers)
+
+    def get_meetup_events(self):
+        """Answer with a page of Meetup events, linking to the next page, or
+        report the page is not modified if its ETag matches."""
+        headers = self.admit(MEETUP_PREFIX)
+        if headers is None:
+            return
+        events = self.services.select_meetup_events(self.query)
+        page_size = int(self.query.get("page", ["200"])[0])
+        offset = int(self.query.get("offset", ["0"])[0])
+        page = events[offset : offset + page_size]
+        if offset + page_size < len(events):
+            query = {key: values[0] for (key, values) in self.query.items()}
+            query["offset"] = offset + page_size
+            path = urlsplit(self.path).path
+            next_url = f"{self.server.base_url}{path}?{urlencode(query)}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        body = json.dumps(page).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers["ETag"] = etag
+        if self.headers.get("If-None-Match") == etag:
+            self.services.count("meetup events not modified")
+            self.send_body(HTTPStatus.NOT_MODIFIED, b"", headers)
+            return
+        headers["Content-Type"] = "application/json;charset=utf-8"
+        self.send_body(HTTPStatus.OK, body, headers)
+
+    def get_meetup_event(self, meetup_id):
+        """Answer with a Meetup event or report it is not found."""
+        headers = self.admit(MEETUP_PREFIX)
+        if headers is None:
+            return
+        event = self.services.meetup_events_by_id.get(meetup_id)
+        if event is None:
+            self.send_json(HTTPStatus.NOT_FOUND, {"errors": []}, headers)
+        else:
+            self.send_json(HTTPStatus.OK, event, headers)
+
+    def get_photo(self):
+        """Answer with a photo."""
+        self.send_body(HTTPStatus.OK, tiny_png(), {"Content-Type": "image/png"})
+
+    # Wild Apricot
+
+    def post_token(self):
+        """Answer with a new OAuth access token."""
+        token = {
+            "access_token": self.services.issue_token(),
+            "token_type": "Bearer",
+            "expires_in": 1800,
+        }
+        self.send_json(HTTPStatus.OK, token)
+
+    def get_membership_levels(self):
+        """Answer with the membership levels."""
+        if not self.authorize():
+            return
+        levels = [
+            {"Id": index, "Url": f"{self.server.base_url}/levels/{index}", "Name": name}
+            for (index, name) in enumerate(MEMBERSHIP_LEVEL_NAMES, start=1)
+        ]
+        self.send_json(HTTPStatus.OK, levels)
+
+    def get_apricot_event(self, event_id):
+        """Answer with a Wild Apricot event or report it is not found."""
+        if not self.authorize():
+            return
+        event = self.services.apricot_events.get(int(event_id))
+        if event is None:
+            self.send_body(HTTPStatus.NOT_FOUND, b"")
+        else:
+            self.send_json(HTTPStatus.OK, event)
+
+    def post_apricot_event(self):
+        """Add a Wild Apricot event and answer with its ID."""
+        if not self.authorize():
+            return
+        event_id = self.services.new_id()
+        event = json.loads(self.body)
+        event["Id"] = event_id
+        self.services.apricot_events[event_id] = event
+        self.send_json(HTTPStatus.OK, event_id)
+
+    def post_registration_type(self):
+        """Add a Wild Apricot event registration type and answer with its
+        ID."""
+        if not self.authorize():
+            return
+        registration_type_id = self.services.new_id()
+        self.services.registration_types[registration_type_id] = json.loads(self.body)
+        self.send_json(HTTPStatus.OK, registration_type_id)
+
+    def post_clone_event(self):
+        """Clone a Wild Apricot event and answer with the new event's ID."""
+        if not self.authorize():
+            return
+        request = json.loads(self.body)
+        original = self.services.apricot_events.get(request["EventId"])
+        if original is None:
+            self.send_body(HTTPStatus.NOT_FOUND, b"")
+            return
+        event_id = self.services.new_id()
+        event = dict(original, Id=event_id)
+        event["Name"] = request.get("TitlePrefix", "") + original.get("Name", "")
+        self.services.apricot_events[event_id] = event
+        self.send_json(HTTPStatus.OK, event_id)
+
+    # WebDAV
+
+    def put_photo(self):
+        """Store an uploaded photo, challenging the client for digest
+        credentials first."""
+        authorization = self.headers.get("Authorization")
+        if not self.services.is_digest_authorized("PUT", authorization):
+            self.services.count("webdav challenges")
+            self.send_body(
+                HTTPStatus.UNAUTHORIZED,
+                b"",
+                {"WWW-Authenticate": self.services.digest_challenge()},
+            )
+            return
+        self.services.uploaded_photos[urlsplit(self.path).path] = len(self.body)
+        self.send_body(HTTPStatus.CREATED, b"")
+
+    def log_message(self, format, *args):
+        """Log nothing, as the counts summarize the requests."""
+
+
+class FakeServer(ThreadingHTTPServer):
+
+    """Serves the fake services, answering requests in threads."""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, services):
+        """Initialize with a (host, port) address and fake services."""
+        super().__init__(server_address, FakeServiceHandler)
+        self.services = services
+
+    @property
+    def base_url(self):
+        """Return the base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self):
+        """Return a dictionary of the environment variables directing
+        meetup2apricot to the fake services."""
+        return {
+            "MEETUP_API_URL": f"{self.base_url}{MEETUP_PREFIX}",
+            "APRICOT_API_URL": f"{self.base_url}{APRICOT_PREFIX}",
+            "APRICOT_TOKEN_URL": f"{self.base_url}{OAUTH_PREFIX}/auth/token",
+            "APRICOT_PHOTO_BASE_URL": self.base_url,
+            "APRICOT_PHOTO_USERNAME": self.services.settings.photo_username,
+            "APRICOT_PHOTO_PASSWORD": self.services.settings.photo_password,
+            "OAUTHLIB_INSECURE_TRANSPORT": "1",
+        }
+
+
+def make_fake_server(host, port, settings, meetup_events, clock=SYSTEM_CLOCK):
+    """Make a fake server listening on a host and port with fake service
+    settings, serving a list of JSON Meetup events and their photos."""
+    server = FakeServer((host, port), FakeServices(settings, clock))
+    server.services.load_meetup_events(
+        meetup_events, f"{server.base_url}{PHOTO_PREFIX}"
+    )
+    return server
+
+
+def generate_meetup_events(count, seed, clock=SYSTEM_CLOCK):
+    """Return a list of a number of synthetic JSON Meetup events starting now,
+    generated from a random seed."""
+    start_time = datetime.fromtimestamp(clock.time()).astimezone()
+    return list(EventCorpusGenerator(start_time, seed=seed).events(count))
+
+
+def load_meetup_events(events_file):
+    """Return a list of JSON Meetup events loaded from an open file."""
+    with events_file:
+        return json.load(events_file)
+
+
+parser = argparse.ArgumentParser(
+    description="Serve fake Meetup, Wild Apricot, and WebDAV services locally"
+)
+parser.add_argument("--host", default="127.0.0.1", help="Host address to serve")
+parser.add_argument(
+    "-p", "--port", type=int, default=8080, help="Port to serve (default: %(default)s)"
+)
+events_group = parser.add_mutually_exclusive_group()
+events_group.add_argument(
+    "-e", "--events", type=int, default=50, help="Number of synthetic Meetup events"
+)
+events_group.add_argument(
+    "--events-file",
+    type=argparse.FileType("r"),
+    help="JSON Meetup events file, such as one from meetup2apricot.event_corpus",
+)
+parser.add_argument(
+    "--latency", type=float, default=0.0, help="Response latency (seconds)"
+)
+parser.add_argument(
+    "--error-rate",
+    type=float,
+    default=0.0,
+    help="Fraction of requests answered with 503 Service Unavailable",
+)
+parser.add_argument(
+    "--meetup-rate", type=int, default=30, help="Meetup requests per time span"
+)
+parser.add_argument(
+    "--apricot-rate",
+    type=int,
+    default=100,
+    help="Wild Apricot requests per time span",
+)
+parser.add_argument(
+    "-s", "--time-span", type=float, default=10, help="Rate limit time span (seconds)"
+)
+parser.add_argument(
+    "--seed", type=int, help="Seed for synthetic events and injected errors"
+)
+
+
+def main(args=None, output=None):
+    """Serve the fake services described by command line arguments until
+    interrupted, then report the counts of requests received to an output
+    stream."""
+    output = output or sys.stdout
+    options = parser.parse_args(args)
+    settings = FakeServiceSettings(
+        latency=options.latency,
+        error_rate=options.error_rate,
+        meetup_rate=options.meetup_rate,
+        apricot_rate=options.apricot_rate,
+        time_span=options.time_span,
+        seed=options.seed,
+    )
+    if options.events_file:
+        meetup_events = load_meetup_events(options.events_file)
+    else:
+        meetup_events = generate_meetup_events(options.events, options.seed)
+    server = make_fake_server(options.host, options.port, settings, meetup_events)
+    for key, value in server.environment().items():
+        output.write(f"export {key}='{value}'\n")
+    output.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    for name, count in server.services.counts_json().items():
+        output.write(f"{name}: {count:d}\n")
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,272 @@
+"""Record web requests and responses to a cassette file and replay them later,
+so whole runs can be repeated offline."""
+
+from .clock import SYSTEM_CLOCK
+from collections import defaultdict, deque
+from datetime import timedelta
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import base64
+import gzip
+import json
+import logging
+import threading
+
+RECORDED_LATENCY = "recorded"
+REPLAY_DIRECTORY_SUFFIX = ".replay"
+REDACTED = "REDACTED"
+SECRET_FIELDS = frozenset(
+    ("access_token", "refresh_token", "id_token", "client_secret", "password")
+)
+SECRET_PARAMETERS = SECRET_FIELDS | {"key", "sig", "signature"}
+SECRET_HEADERS = frozenset(("authorization", "proxy-authorization", "set-cookie"))
+
+
+class CassetteError(ConnectionError):
+
+    """Raised when a cassette has no recorded response for a request."""
+
+
+def open_cassette_file(path, mode):
+    """Open a cassette file at a path in a text mode, compressed with gzip if
+    the file name ends with .gz."""
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def replay_directory(cassette_path):
+    """Return the directory beside a cassette file where replayed runs keep
+    their cache files and photos."""
+    return cassette_path.with_name(cassette_path.name + REPLAY_DIRECTORY_SUFFIX)
+
+
+def interaction_key(method, url):
+    """Return the key matching a request method and URL, with secrets redacted,
+    with its recorded interactions."""
+    return f"{method} {redact_url(url)}"
+
+
+def redact_url(url):
+    """Return a URL with the values of secret query parameters redacted."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(name.lower() in SECRET_PARAMETERS for name, _ in query):
+        return url
+    query = [
+        (name, REDACTED if name.lower() in SECRET_PARAMETERS else value)
+        for name, value in query
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def redact_headers(headers):
+    """Return a dictionary of response headers with authorization data and
+    cookies redacted."""
+    return {
+        name: REDACTED if name.lower() in SECRET_HEADERS else value
+        for name, value in headers.items()
+    }
+
+
+def redact_body(body):
+    """Return a response body with the values of token and password fields
+    redacted if it is a JSON document holding any; otherwise unchanged."""
+    try:
+        document = json.loads(body)
+    except ValueError:
+        return body
+    redacted = redact_json(document)
+    if redacted == document:
+        return body
+    return json.dumps(redacted).encode("utf-8")
+
+
+def redact_json(document):
+    """Return a JSON document with the values of token and password fields
+    redacted at any depth."""
+    if isinstance(document, dict):
+        return {
+            name: REDACTED if name.lower() in SECRET_FIELDS else redact_json(value)
+            for name, value in document.items()
+        }
+    if isinstance(document, list):
+        return [redact_json(value) for value in document]
+    return document
+
+
+class RecordingAdapter(BaseAdapter):
+
+    """Sends requests through another adapter, typically a pooled one, and
+    records each request and response in a cassette. Recording reads each
+    response body whole, so streamed responses arrive all at once while
+    recording."""
+
+    def __init__(self, cassette, adapter):
+        """Initialize with a cassette to record to and an adapter to send
+        requests through."""
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, *args, **kwargs):
+        """Send a request, record the response, and return it. The response
+        names this adapter as its connection, so requests resent by
+        authentication handlers are recorded too."""
+        start_time = self.cassette.clock.time()
+        response = self.adapter.send(request, *args, **kwargs)
+        elapsed = self.cassette.clock.time() - start_time
+        self.cassette.record(request, response, elapsed)
+        response.connection = self
+        return response
+
+    def close(self):
+        """Close the adapter sending requests."""
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+
+    """Answers requests with responses replayed from a cassette."""
+
+    def __init__(self, cassette):
+        """Initialize with a cassette to replay from."""
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        """Return the next recorded response to a request."""
+        interaction = self.cassette.replay(request)
+        response = Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = interaction["url"]
+        response.elapsed = timedelta(seconds=interaction["elapsed"])
+        response._content = base64.b64decode(interaction["body"])
+        response._content_consumed = True
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        """Release nothing, as replays use no connections."""
+
+
+class HttpCassette:
+
+    """Records web requests and responses made through mounted sessions to a
+    cassette file, with secrets redacted, or replays them from the file, with
+    optional latency."""
+
+    logger = logging.getLogger("HttpCassette")
+
+    def __init__(self, path, recording, latency=None, clock=SYSTEM_CLOCK):
+        """Initialize with a path to the cassette file, a flag to record (or
+        replay), the replay latency (seconds, "recorded" for the recorded
+        latency, or None for none), and an optional clock."""
+        self.path = path
+        self.recording = recording
+        self.latency = latency
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.interactions = defaultdict(deque)
+        self.replay_count = 0
+
+    def start(self):
+        """Start recording to an empty cassette file or load the recorded
+        interactions to replay."""
+        if self.recording:
+            with open_cassette_file(self.path, "w"):
+                pass
+            self.logger.info("Recording web requests to %s", self.path)
+            return
+        with open_cassette_file(self.path, "r") as f:
+            for line in f:
+                interaction = json.loads(line)
+                key = interaction_key(interaction["method"], interaction["url"])
+                self.interactions[key].append(interaction)
+        self.logger.info("Replaying web requests from %s", self.path)
+
+    def mount(self, session):
+        """Mount a recording or replaying adapter on a Requests session. A
+        recording adapter sends requests through the adapter already mounted,
+        keeping its pooled connections and default timeout. Return the
+        session."""
+        for prefix in ("https://", "http://"):
+            if self.recording:
+                adapter = RecordingAdapter(self, session.get_adapter(prefix))
+            else:
+                adapter = ReplayAdapter(self)
+            session.mount(prefix, adapter)
+        return session
+
+    def record(self, request, response, elapsed):
+        """Record a request and its response, received after some elapsed
+        seconds, to the cassette file. Redact tokens, passwords, and
+        authorization data first."""
+        body = redact_body(response.content)
+        interaction = {
+            "method": request.method,
+            "url": redact_url(request.url),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": redact_headers(response.headers),
+            "body": base64.b64encode(body).decode("ascii"),
+            "elapsed": elapsed,
+        }
+        with self.lock:
+            with open_cassette_file(self.path, "a") as f:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def replay(self, request):
+        """Return the next recorded interaction for a request after waiting
+        for the replay latency. Raise an error if none remains."""
+        key = interaction_key(request.method, request.url)
+        with self.lock:
+            try:
+                interaction = self.interactions[key].popleft()
+            except IndexError:
+                raise CassetteError(f"No recorded response for {key}") from None
+            self.replay_count += 1
+        self.clock.sleep(self.replay_latency(interaction))
+        return interaction
+
+    def replay_latency(self, interaction):
+        """Return the seconds to wait before replaying an interaction."""
+        if self.latency == RECORDED_LATENCY:
+            return interaction["elapsed"]
+        return self.latency or 0
+
+
+class NullCassette:
+
+    """Leaves sessions to use the network."""
+
+    def mount(self, session):
+        """Return a session unchanged."""
+        return session
+
+
+NULL_CASSETTE = NullCassette()
+
+
+def make_http_cassette(record_path=None, replay_path=None, latency=None):
+    """Make a started cassette recording to a record path or replaying from a
+    replay path with a latency, or a null cassette given neither path."""
+    if record_path:
+        cassette = HttpCassette(record_path, recording=True)
+    elif replay_path:
+        cassette = HttpCassette(replay_path, recording=False, latency=latency)
+    else:
+        return NULL_CASSETTE
+    cassette.start()
+    return cassette
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,87 @@
+"""Share pooled keep-alive connections among all web sessions, with default
+timeouts and connection reuse counts."""
+
+from requests.adapters import HTTPAdapter
+import logging
+
+DEFAULT_TIMEOUT = (10, 60)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+
+    """Sends requests over pooled keep-alive connections, one pool per host,
+    applying a default timeout to requests sent without one."""
+
+    def __init__(self, pool_connections, pool_maxsize, timeout):
+        """Initialize with the number of host pools to keep, the connections
+        to keep in each pool, and a default (connect, read) timeout
+        (seconds)."""
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.timeout = timeout
+
+    def send(self, request, timeout=None, **kwargs):
+        """Send a request with a timeout, by default the default timeout."""
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+    def connection_counts(self):
+        """Return a pair counting the connections opened and the requests sent
+        by the host pools kept."""
+        pools = self.poolmanager.pools
+        pools = [pools.get(key) for key in pools.keys()]
+        pools = [pool for pool in pools if pool is not None]
+        return (
+            sum(pool.num_connections for pool in pools),
+            sum(pool.num_requests for pool in pools),
+        )
+
+
+class HttpTransport:
+
+    """Mounts one pooled adapter on every web session, so sessions share
+    keep-alive connections to each host."""
+
+    logger = logging.getLogger("HttpTransport")
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=DEFAULT_TIMEOUT):
+        """Initialize with the number of hosts to keep pools for, the
+        connections to keep per host, sized for the most concurrent workers,
+        and a default (connect, read) timeout (seconds)."""
+        self.adapter = PooledHTTPAdapter(pool_connections, pool_maxsize, timeout)
+
+    def mount(self, session):
+        """Mount the pooled adapter on a Requests session. Return the
+        session."""
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def log_statistics(self):
+        """Log the connections opened, the requests sent, and the requests
+        that reused a kept-alive connection."""
+        connections, requests = self.adapter.connection_counts()
+        self.logger.info(
+            "connections=%d requests=%d reused=%d",
+            connections,
+            requests,
+            requests - connections,
+        )
+
+
+class NullTransport:
+
+    """Leaves sessions with their own connections."""
+
+    def mount(self, session):
+        """Return a session unchanged."""
+        return session
+
+    def log_statistics(self):
+        """Log nothing."""
+
+
+NULL_TRANSPORT = NullTransport()
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -1,7 +1,10 @@
 """Loads initial data from caches and Meetup to prepare for event conversino."""
 
 from .meetup_event import MeetupEvent
+from .meetup_events_cache import NULL_MEETUP_EVENTS_CACHE
+from .photo_usage import NULL_PHOTO_USAGE
 from .scope_cache import ScopeCache
+import logging
 
 
 class InitialDataScope:
@@ -34,28 +37,42 @@ class InitialDataLoader:
     """Loads cached event and photo data. Downloads upcoming Meetup events.
     Runs the Meetup to Wild Apricot event conversion."""
 
+    logger = logging.getLogger("InitialDataLoader")
+
     def __init__(
         self,
         meetup_api,
-        apricot_api,
+        apricot_api_provider,
         transfer_meetup_ids,
         event_mapping_provider,
         photo_urls_provider,
         enter_initial_data_scope,
+        meetup_events_cache=NULL_MEETUP_EVENTS_CACHE,
+        photo_usage=NULL_PHOTO_USAGE,
     ):
-        """Initialize with Meetup and Wild Apricot APIs, a list of Meetup IDs
-        of events to transfer, and functions to provide cached event and photo
-        data and to enter the initial data scope."""
+        """Initialize with a Meetup API, a function to provide a Wild Apricot
+        API, a list of Meetup IDs of events to transfer, functions to provide
+        cached event and photo data and to enter the initial data scope, a
+        cache of the last Meetup event list, and the photo usage that prunes
+        unused photos."""
         self.meetup_api = meetup_api
-        self.apricot_api = apricot_api
+        self.apricot_api_provider = apricot_api_provider
         self.transfer_meetup_ids = frozenset(transfer_meetup_ids)
         self.event_mapping_provider = event_mapping_provider
         self.photo_urls_provider = photo_urls_provider
         self.enter_initial_data_scope = enter_initial_data_scope
+        self.meetup_events_cache = meetup_events_cache
+        self.photo_usage = photo_usage
 
     def run(self):
-        """Run the Meetup to Wild Apricot conversion."""
+        """Run the Meetup to Wild Apricot conversion, unless the Meetup events
+        are unchanged since the last complete run. Prune unused photos even
+        then."""
         upcoming_meetup_events = self.retreive_upcoming_meetup_events()
+        if self.meetup_events_cache.unchanged:
+            self.logger.info("No changes to convert since the last run")
+            self.prune_photos()
+            return
         transfer_meetup_events = self.select_events_to_transfer(upcoming_meetup_events)
         membership_levels = self.retrieve_membership_levels()
         event_mapping = self.event_mapping_provider()
@@ -68,10 +85,22 @@ class InitialDataLoader:
             event_mapping,
         )
 
+    def prune_photos(self):
+        """Prune unused photos from the cached photo data and persist it, as
+        no photo cache does so without events to convert."""
+        photo_urls_to_paths = self.photo_urls_provider()
+        self.photo_usage.prune(photo_urls_to_paths)
+        photo_urls_to_paths.persist()
+        self.photo_usage.persist()
+
     def retreive_upcoming_meetup_events(self):
         """Return a list of upcoming Meetup events to convert."""
-        json_events = self.meetup_api.retrieve_events_json()
-        return [MeetupEvent(event) for event in json_events]
+        return list(self.iterate_upcoming_meetup_events())
+
+    def iterate_upcoming_meetup_events(self):
+        """Yield upcoming Meetup events page by page as Meetup provides them."""
+        for event_json in self.meetup_api.iterate_events_json():
+            yield MeetupEvent(event_json)
 
     def select_events_to_transfer(self, upcoming_meetup_events):
         """Return a list of Meetup events to transfer to Wild Apricot."""
@@ -86,7 +115,7 @@ class InitialDataLoader:
 
     def retrieve_membership_levels(self):
         """Return a list of Wild Apricot membership levels."""
-        return self.apricot_api.get_membership_levels()
+        return self.apricot_api_provider().get_membership_levels()
 
     def convert_events(
         self,
@@ -1,4 +1,18 @@
 from .apricot_api import ApricotApi
+from .async_clients import (
+    AsyncApricotApi,
+    AsyncMeetupApi,
+    AsyncPhotoRetriever,
+    AsyncPhotoUploader,
+    AsyncRetrier,
+)
+from .async_processing import (
+    AsyncEventProcessor,
+    AsyncMeetup2Apricot,
+    AsyncMeetupEventRetriever,
+    AsyncPhotoCache,
+)
+from .dead_event_cache import load_dead_event_cache
 from .event_mapping_updater import EventMappingUpdater
 from .event_processor import EventProcessor, load_cached_event_mapping
 from .event_restriction_loader import EventRestrictionLoader
@@ -9,9 +23,12 @@ from .exceptions import (
     InvalidRestrictionPattern,
     JsonConversionError,
     MissingEnvVarError,
+    RegistrationTypesError,
     UnknownMemberLevelName,
 )
+from .http_cassette import make_http_cassette
 from .http_response_error import HttpResponseError
+from .http_transport import DEFAULT_TIMEOUT, HttpTransport
 from .initial_data_loader import InitialDataLoader
 from .logging_application import LoggingApplication
 from .logging_context import LoggingContext
@@ -19,18 +36,36 @@ from .logging_setup_manager import LoggingSetupManager
 from .meetup2apricot import Meetup2Apricot
 from .meetup_api import MeetupApi
 from .meetup_event_retriever import MeetupEventRetriever
+from .meetup_events_cache import NULL_MEETUP_EVENTS_CACHE, load_meetup_events_cache
 from .member_level_manager import make_member_level_manager
 from .oauth2_session_starter import Oauth2SessionStarter, Oauth2SessionStarterError
 from .photo_cache import PhotoCache, load_cached_photo_urls
 from .photo_retriever import make_photo_retriever, make_session
 from .photo_uploader import PhotoUploader, make_photo_uploader_session
+from .photo_usage import PhotoUsage, load_cached_photo_last_used
 from .reporter import make_reporter, EventReport, Reporter
-from .throttle import Throttle, OpenThrottle
+from .retrier import Retrier
+from .shared_throttle import SharedThrottle
+from .sqlite_store import (
+    SqliteEventMapping,
+    SqlitePhotoMapping,
+    SqlitePhotoUsageMapping,
+    load_sqlite_store,
+)
+from .throttle import (
+    AsyncThrottle,
+    LazyThrottle,
+    OpenThrottle,
+    ThreadSafeThrottle,
+    TokenBucketThrottle,
+    make_persistent_throttle,
+)
 from requests_toolbelt import user_agent
 from sys import stdout
 
-
-APRICOT_TOKEN_URL = "https://oauth.wildapricot.org/auth/token"
+MEETUP_WORKERS = 4
+ASYNC_WORKERS = 16
+ASYNC_MAX_IN_FLIGHT = 100
 
 
 def inject_logging_application(application_scope):
@@ -70,6 +105,7 @@ def inject_no_trace_exceptions():
         JsonConversionError,
         MissingEnvVarError,
         Oauth2SessionStarterError,
+        RegistrationTypesError,
         UnknownMemberLevelName,
     )
 
@@ -89,11 +125,13 @@ def inject_initial_data_loader(application_scope):
     """Inject an initial data loader configured by an application scope."""
     return InitialDataLoader(
         meetup_api=inject_meetup_api(application_scope),
-        apricot_api=inject_apricot_api(application_scope),
+        apricot_api_provider=lambda: inject_apricot_api(application_scope),
         transfer_meetup_ids=application_scope.transfer_meetup_ids,
         event_mapping_provider=inject_event_mapping_provider(application_scope),
         photo_urls_provider=inject_photo_urls_provider(application_scope),
         enter_initial_data_scope=inject_enter_initial_data_scope(application_scope),
+        meetup_events_cache=inject_meetup_events_cache(application_scope),
+        photo_usage=inject_photo_usage(application_scope),
     )
 
 
@@ -102,7 +140,14 @@ def inject_event_mapping_provider(application_scope):
     event mappings."""
 
     def get():
-        return load_cached_event_mapping(application_scope.event_cache_file)
+        if application_scope.database:
+            return SqliteEventMapping(
+                inject_sqlite_store(application_scope),
+                earliest_start_time=application_scope.earliest_event_start_time,
+            )
+        return load_cached_event_mapping(
+            application_scope.event_cache_file, dryrun=application_scope.dryrun
+        )
 
     return get
 
@@ -112,16 +157,39 @@ def inject_photo_urls_provider(application_scope):
     cached mappings of Meetup photo URLs to Wild Apricot photo paths."""
 
     def get():
-        return load_cached_photo_urls(application_scope.photo_cache_file)
+        if application_scope.database:
+            return SqlitePhotoMapping(inject_sqlite_store(application_scope))
+        return load_cached_photo_urls(
+            application_scope.photo_cache_file, dryrun=application_scope.dryrun
+        )
 
     return get
 
 
+def inject_sqlite_store(application_scope):
+    """Return a SQLite store of known events and photo paths configured by an
+    application scope. A new store is filled from the cache files."""
+    return application_scope.sqlite_store(
+        lambda: load_sqlite_store(
+            path=application_scope.database,
+            event_mapping_provider=lambda: load_cached_event_mapping(
+                application_scope.event_cache_file, dryrun=True
+            ),
+            photo_paths_provider=lambda: load_cached_photo_urls(
+                application_scope.photo_cache_file, dryrun=True
+            ),
+            dryrun=application_scope.dryrun,
+        )
+    )
+
+
 def inject_enter_initial_data_scope(application_scope):
     """Return a function configured by an application scope that provides a
     processor configured by an application scope and an initial data scope."""
 
     def enter(initial_data_scope):
+        if application_scope.async_mode:
+            return inject_async_meetup2apricot(application_scope, initial_data_scope)
         return inject_meetup2apricot(application_scope, initial_data_scope)
 
     return enter
@@ -138,9 +206,36 @@ def inject_meetup2apricot(application_scope, initial_data_scope):
         event_mapping_updater=inject_event_mapping_updater(
             application_scope, initial_data_scope
         ),
+        apricot_throttle=inject_apricot_throttle(application_scope),
+        dead_event_cache=inject_dead_event_cache(application_scope),
+        meetup_events_cache=inject_meetup_events_cache(application_scope),
+        http_transport=inject_http_transport(application_scope),
+        event_processor_provider=inject_event_processor_provider(
+            application_scope, initial_data_scope
+        ),
+    )
+
+
+def inject_async_meetup2apricot(application_scope, initial_data_scope):
+    """Return a Meetup to Wild Apricot processor that processes events
+    concurrently under asyncio, configured by application and initial data
+    scopes."""
+    return AsyncMeetup2Apricot(
+        meetup_events=initial_data_scope.transfer_meetup_events,
+        initial_event_mapping=initial_data_scope.meetup_to_apricot_event_mapping,
+        photo_cache=inject_photo_cache(application_scope, initial_data_scope),
+        reporter=inject_reporter(application_scope),
+        event_mapping_updater=inject_event_mapping_updater(
+            application_scope, initial_data_scope
+        ),
+        apricot_throttle=inject_apricot_throttle(application_scope),
+        dead_event_cache=inject_dead_event_cache(application_scope),
+        meetup_events_cache=inject_meetup_events_cache(application_scope),
+        http_transport=inject_http_transport(application_scope),
         event_processor_provider=inject_event_processor_provider(
             application_scope, initial_data_scope
         ),
+        max_workers=ASYNC_WORKERS,
     )
 
 
@@ -159,6 +254,52 @@ def inject_meetup_api_provider(application_scope):
             throttle=inject_meetup_throttle(application_scope),
             group_url_name=application_scope.meetup_group_url_name,
             events_wanted=application_scope.meetup_events_wanted,
+            retrier=inject_retrier(application_scope),
+            events_cache=inject_meetup_events_cache(application_scope),
+            earliest_start_time=application_scope.earliest_event_start_time,
+            latest_start_time=application_scope.latest_event_start_time,
+            stream_json=application_scope.stream_json,
+            api_url=application_scope.meetup_api_url,
+        )
+
+    return get
+
+
+def inject_async_meetup_api(application_scope):
+    """Return an asyncio Meetup API configured by an application scope. It
+    shares the Meetup API's session and throttle."""
+    meetup_api = inject_meetup_api(application_scope)
+    return AsyncMeetupApi(
+        meetup_api=meetup_api,
+        throttle=AsyncThrottle(meetup_api.throttle),
+        retrier=inject_async_retrier(application_scope),
+    )
+
+
+def inject_meetup_events_cache(application_scope):
+    """Return a cache of the last Meetup event list configured by an
+    application scope."""
+    return application_scope.meetup_events_cache(
+        inject_meetup_events_cache_provider(application_scope)
+    )
+
+
+def inject_meetup_events_cache_provider(application_scope):
+    """Return a function that provides a cache of the last Meetup event list
+    configured by an application scope. Runs that transfer or skip selected
+    events cache nothing, as they must always run. The cache is valid only for
+    the same range of event start times."""
+
+    def get():
+        if application_scope.transfer_meetup_ids or application_scope.skip_meetup_ids:
+            return NULL_MEETUP_EVENTS_CACHE
+        return load_meetup_events_cache(
+            cache_path=application_scope.meetup_events_cache_file,
+            settings=(
+                application_scope.earliest_event_start_time,
+                application_scope.latest_event_start_time,
+            ),
+            dryrun=application_scope.dryrun,
         )
 
     return get
@@ -166,8 +307,16 @@ def inject_meetup_api_provider(application_scope):
 
 def inject_meetup_throttle(application_scope):
     """Return a throttle for Meetup API access configured by an application
-    scope."""
-    return inject_meetup_api_for_status(application_scope).make_meetup_api_throttle()
+    scope. The throttle is shared by concurrent workers retrieving events. It
+    requests the Meetup API status only when a second request needs
+    throttling."""
+    return ThreadSafeThrottle(
+        LazyThrottle(
+            lambda: inject_meetup_api_for_status(
+                application_scope
+            ).make_meetup_api_throttle()
+        )
+    )
 
 
 def inject_meetup_api_for_status(application_scope):
@@ -178,6 +327,9 @@ def inject_meetup_api_for_status(application_scope):
         throttle=OpenThrottle(),
         group_url_name=application_scope.meetup_group_url_name,
         events_wanted=application_scope.meetup_events_wanted,
+        retrier=inject_retrier(application_scope),
+        requests_in_flight=inject_worker_count(application_scope),
+        api_url=application_scope.meetup_api_url,
     )
 
 
@@ -186,6 +338,21 @@ def inject_event_processor_provider(application_scope, initial_data_scope):
     event mapping and by application and initial data scopes."""
 
     def get(event_mapping):
+        if application_scope.async_mode:
+            return AsyncEventProcessor(
+                earliest_start_time=application_scope.earliest_event_start_time,
+                latest_start_time=application_scope.latest_event_start_time,
+                known_events=event_mapping,
+                photo_cache=inject_photo_cache(application_scope, initial_data_scope),
+                event_registration_type_maker=inject_event_registration_type_maker(
+                    application_scope, initial_data_scope
+                ),
+                apricot_api=inject_async_apricot_api(application_scope),
+                event_tagger=inject_event_tagger(application_scope),
+                reporter=inject_reporter(application_scope),
+                dryrun=application_scope.dryrun,
+                max_in_flight=ASYNC_MAX_IN_FLIGHT,
+            )
         return EventProcessor(
             earliest_start_time=application_scope.earliest_event_start_time,
             latest_start_time=application_scope.latest_event_start_time,
@@ -195,7 +362,6 @@ def inject_event_processor_provider(application_scope, initial_data_scope):
                 application_scope, initial_data_scope
             ),
             apricot_api=inject_apricot_api(application_scope),
-            cache_path=application_scope.event_cache_file,
             event_tagger=inject_event_tagger(application_scope),
             reporter=inject_reporter(application_scope),
             dryrun=application_scope.dryrun,
@@ -216,25 +382,83 @@ def inject_photo_cache_provider(application_scope, initial_data_scope):
     and initial data scopes."""
 
     def get():
+        if application_scope.async_mode:
+            return AsyncPhotoCache(
+                apricot_directory=application_scope.apricot_photo_directory,
+                urls_to_paths=initial_data_scope.photo_urls_to_paths,
+                photo_retriever=AsyncPhotoRetriever(
+                    inject_photo_retriever(application_scope)
+                ),
+                photo_uploader=AsyncPhotoUploader(
+                    inject_photo_uploader(application_scope)
+                ),
+                reporter=inject_reporter(application_scope),
+                dryrun=application_scope.dryrun,
+                photo_usage=inject_photo_usage(application_scope),
+            )
         return PhotoCache(
             apricot_directory=application_scope.apricot_photo_directory,
             urls_to_paths=initial_data_scope.photo_urls_to_paths,
             photo_retriever=inject_photo_retriever(application_scope),
             photo_uploader=inject_photo_uploader(application_scope),
-            cache_path=application_scope.photo_cache_file,
             reporter=inject_reporter(application_scope),
             dryrun=application_scope.dryrun,
+            photo_usage=inject_photo_usage(application_scope),
         )
 
     return get
 
 
+def inject_photo_usage(application_scope):
+    """Return the usage of cached photos configured by an application scope."""
+    return application_scope.photo_usage(inject_photo_usage_provider(application_scope))
+
+
+def inject_photo_usage_provider(application_scope):
+    """Return a function that provides the usage of cached photos configured
+    by an application scope. Photos unused for the maximum age or beyond the
+    most photos, when set, are pruned, optionally deleting their local
+    files."""
+
+    def get():
+        photo_directory = (
+            application_scope.photo_directory
+            if application_scope.clean_photos
+            else None
+        )
+        time_to_live = (
+            None
+            if application_scope.photo_max_age is None
+            else application_scope.photo_max_age * 24 * 60 * 60
+        )
+        return PhotoUsage(
+            last_used=inject_photo_last_used(application_scope),
+            time_to_live=time_to_live,
+            max_photos=application_scope.max_photos,
+            photo_directory=photo_directory,
+            dryrun=application_scope.dryrun,
+        )
+
+    return get
+
+
+def inject_photo_last_used(application_scope):
+    """Return a mapping of cached photo URLs to the times they were last used
+    configured by an application scope."""
+    if application_scope.database:
+        return SqlitePhotoUsageMapping(inject_sqlite_store(application_scope))
+    return load_cached_photo_last_used(
+        application_scope.photo_usage_file, dryrun=application_scope.dryrun
+    )
+
+
 def inject_photo_retriever(application_scope):
     """Return a photo retriever configured by an application scope."""
     return make_photo_retriever(
         local_directory=application_scope.photo_directory,
         session=inject_http_session(application_scope),
         dryrun=application_scope.dryrun,
+        retrier=inject_retrier(application_scope),
     )
 
 
@@ -246,6 +470,7 @@ def inject_photo_uploader(application_scope):
         apricot_directory=application_scope.apricot_photo_directory,
         session=inject_photo_uploader_session(application_scope),
         dryrun=application_scope.dryrun,
+        retrier=inject_retrier(application_scope),
     )
 
 
@@ -264,12 +489,45 @@ def inject_event_mapping_updater(application_scope, initial_data_scope):
 def inject_meetup_event_retriever(application_scope, initial_data_scope):
     """Return a Meetup event retriever configured by application and initial
     data scopes."""
+    if application_scope.async_mode:
+        return AsyncMeetupEventRetriever(
+            meetup_api=inject_meetup_api(application_scope),
+            async_meetup_api=inject_async_meetup_api(application_scope),
+            meetup_events=initial_data_scope.upcoming_meetup_events,
+            max_workers=ASYNC_WORKERS,
+            dead_event_cache=inject_dead_event_cache(application_scope),
+        )
     return MeetupEventRetriever(
         meetup_api=inject_meetup_api(application_scope),
         meetup_events=initial_data_scope.upcoming_meetup_events,
+        max_workers=MEETUP_WORKERS,
+        dead_event_cache=inject_dead_event_cache(application_scope),
     )
 
 
+def inject_dead_event_cache(application_scope):
+    """Return a cache of dead Meetup events configured by an application
+    scope."""
+    return application_scope.dead_event_cache(
+        inject_dead_event_cache_provider(application_scope)
+    )
+
+
+def inject_dead_event_cache_provider(application_scope):
+    """Return a function that provides a cache of dead Meetup events
+    configured by an application scope. Dead events are remembered for 7
+    days."""
+
+    def get():
+        return load_dead_event_cache(
+            cache_path=application_scope.dead_event_cache_file,
+            time_to_live=7 * 24 * 60 * 60,
+            dryrun=application_scope.dryrun,
+        )
+
+    return get
+
+
 def inject_event_registration_type_maker(application_scope, initial_data_scope):
     """Return an event registration type maker configured by application and
     initial data scopes."""
@@ -298,17 +556,56 @@ def inject_member_level_manager(initial_data_scope):
 
 def inject_http_session(application_scope):
     """Return a Requests HTTP session configured by an application scope."""
-    return make_session(inject_user_agent(application_scope))
+    session = make_session(inject_user_agent(application_scope))
+    return inject_http_cassette(application_scope).mount(
+        inject_http_transport(application_scope).mount(session)
+    )
 
 
 def inject_photo_uploader_session(application_scope):
     """Return a Requests HTTP session for photo uploading configured by an
     application scope."""
-    return make_photo_uploader_session(
+    session = make_photo_uploader_session(
         username=application_scope.apricot_photo_username,
         password=application_scope.apricot_photo_password,
         user_agent=inject_user_agent(application_scope),
     )
+    return inject_http_cassette(application_scope).mount(
+        inject_http_transport(application_scope).mount(session)
+    )
+
+
+def inject_http_transport(application_scope):
+    """Return a transport sharing pooled keep-alive connections among all web
+    sessions configured by an application scope. Each host's pool keeps a
+    connection for every concurrent worker and the main thread. Requests time
+    out after the default transport timeout."""
+    workers = inject_worker_count(application_scope)
+    return application_scope.http_transport(
+        lambda: HttpTransport(
+            pool_connections=10,
+            pool_maxsize=workers + 1,
+            timeout=DEFAULT_TIMEOUT,
+        )
+    )
+
+
+def inject_worker_count(application_scope):
+    """Return the most concurrent workers sending web requests, configured by
+    an application scope."""
+    return ASYNC_WORKERS if application_scope.async_mode else MEETUP_WORKERS
+
+
+def inject_http_cassette(application_scope):
+    """Return a cassette that records or replays web requests, or leaves them
+    to the network, configured by an application scope."""
+    return application_scope.http_cassette(
+        lambda: make_http_cassette(
+            record_path=application_scope.record_cassette,
+            replay_path=application_scope.replay_cassette,
+            latency=application_scope.replay_latency,
+        )
+    )
 
 
 def inject_apricot_api(application_scope):
@@ -318,19 +615,34 @@ def inject_apricot_api(application_scope):
 
 def inject_apricot_api_provider(application_scope):
     """Return function that provides a Wild Apricot API configured by an
-    application scope."""
+    application scope. The throttle is shared by workers adding registration
+    types concurrently."""
 
     def get():
         return ApricotApi(
             account_id=application_scope.apricot_account_number,
             session=inject_apricot_oauth_session(application_scope),
-            throttle=inject_apricot_throttle(application_scope),
+            throttle=ThreadSafeThrottle(inject_apricot_throttle(application_scope)),
             dryrun=application_scope.dryrun,
+            retrier=inject_retrier(application_scope),
+            api_url=application_scope.apricot_api_url,
         )
 
     return get
 
 
+def inject_async_apricot_api(application_scope):
+    """Return an asyncio Wild Apricot API configured by an application scope.
+    It shares the Wild Apricot API's session and throttle."""
+    apricot_api = inject_apricot_api(application_scope)
+    return AsyncApricotApi(
+        apricot_api=apricot_api,
+        throttle=AsyncThrottle(apricot_api.throttle),
+        retrier=inject_async_retrier(application_scope),
+        dryrun=application_scope.dryrun,
+    )
+
+
 def inject_apricot_oauth_session(application_scope):
     """Return an OAuth session for Wild Apricot configured by an application
     scope."""
@@ -343,9 +655,11 @@ def inject_apricot_oauth_session_starter(application_scope):
     return Oauth2SessionStarter(
         client_id="APIKEY",
         client_secret=application_scope.apricot_api_key,
-        token_url=APRICOT_TOKEN_URL,
+        token_url=application_scope.apricot_token_url,
         user_agent=inject_user_agent(application_scope),
         scope="auto",
+        cassette=inject_http_cassette(application_scope),
+        transport=inject_http_transport(application_scope),
     )
 
 
@@ -358,7 +672,45 @@ def inject_user_agent(application_scope):
 def inject_apricot_throttle(application_scope):
     """Return a throttle for Wild Apricot web requests configured by an
     application scope."""
-    return Throttle(rate=100, time_span=60)
+    return application_scope.apricot_throttle(
+        inject_apricot_throttle_provider(application_scope)
+    )
+
+
+def inject_apricot_throttle_provider(application_scope):
+    """Return function that provides a throttle for Wild Apricot web requests
+    configured by an application scope. The throttle allows bursts of 10
+    requests, but no more than 100 requests in any 60 seconds, including
+    requests from recent runs and, given a shared throttle file, from other
+    processes."""
+
+    def get():
+        if application_scope.apricot_throttle_file:
+            return SharedThrottle(
+                state_path=application_scope.apricot_throttle_file,
+                rate=91,
+                time_span=60,
+                burst=10,
+            )
+        return make_persistent_throttle(
+            throttle=TokenBucketThrottle(rate=91, time_span=60, burst=10),
+            cache_path=application_scope.apricot_throttle_cache_file,
+            dryrun=application_scope.dryrun,
+        )
+
+    return get
+
+
+def inject_retrier(application_scope):
+    """Return a retrier for failed web requests configured by an application
+    scope. All web requests share a budget of 20 retries per run."""
+    return application_scope.retrier(lambda: Retrier(retry_budget=20))
+
+
+def inject_async_retrier(application_scope):
+    """Return an asyncio retrier for failed web requests, sharing the retry
+    budget of the retrier configured by an application scope."""
+    return AsyncRetrier(inject_retrier(application_scope))
 
 
 def inject_event_tagger(application_scope):
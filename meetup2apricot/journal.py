@@ -0,0 +1,180 @@
+"""Record each change to a cached mapping in an append-only journal as it
+happens, so changes survive a crash without rewriting the whole cache."""
+
+from . import dryrun
+from collections.abc import MutableMapping
+import logging
+import os
+import pickle
+
+JOURNAL_SUFFIX = ".journal"
+DEFAULT_BATCH_SIZE = 10
+
+
+class ReplaceableMapping(MutableMapping):
+
+    """A mutable mapping whose contents can be replaced by another mapping's,
+    changing only the differences."""
+
+    def replace(self, mapping):
+        """Replace the contents with those of another mapping, changing only
+        the differences. Return this mapping."""
+        for key in [key for key in self if key not in mapping]:
+            del self[key]
+        for key, value in mapping.items():
+            if key not in self or self[key] != value:
+                self[key] = value
+        return self
+
+
+class JournaledMapping(ReplaceableMapping):
+
+    """A mapping kept in a pickled snapshot file and an append-only journal of
+    changes beside it. Each change is appended to the journal and flushed at
+    once, and the journal is synced to disk in batches. Loading replays the
+    journal over the snapshot. Persisting folds the journal into a new
+    snapshot once it holds as many entries as the mapping, so each change
+    costs constant time on average."""
+
+    logger = logging.getLogger("JournaledMapping")
+
+    def __init__(
+        self, snapshot_path, data=None, batch_size=DEFAULT_BATCH_SIZE, dryrun=False
+    ):
+        """Initialize with a path to the snapshot file, optional initial data,
+        the number of journal entries to sync together, and a dry run
+        flag."""
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path.with_name(snapshot_path.name + JOURNAL_SUFFIX)
+        self.data = dict(data or {})
+        self.batch_size = batch_size
+        self.dryrun = dryrun
+        self.journal_file = None
+        self.entry_count = 0
+        self.unsynced_count = 0
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.append(("set", key, value))
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.append(("delete", key))
+
+    def load(self):
+        """Load the snapshot file, if any, and replay the journal over it.
+        Drop a partial entry left at the end of the journal by a crash."""
+        if self.snapshot_path.exists():
+            with self.snapshot_path.open("rb") as f:
+                self.data = pickle.load(f)
+        if not self.journal_path.exists():
+            return
+        journal_size = self.journal_path.stat().st_size
+        with self.journal_path.open("rb") as f:
+            while f.tell() < journal_size:
+                good_size = f.tell()
+                try:
+                    entry = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError) as err:
+                    self.logger.warning(
+                        "Dropping partial journal entry in %s: %s",
+                        self.journal_path,
+                        err,
+                    )
+                    self.truncate_journal(good_size)
+                    break
+                self.replay(entry)
+                self.entry_count += 1
+
+    def replay(self, entry):
+        """Apply a journal entry to the data."""
+        operation, key, *value = entry
+        if operation == "set":
+            self.data[key] = value[0]
+        else:
+            self.data.pop(key, None)
+
+    @dryrun.method()
+    def append(self, entry):
+        """Append an entry to the journal and flush it. Sync the journal once
+        a batch of entries is unsynced."""
+        if self.journal_file is None:
+            self.journal_file = self.journal_path.open("ab")
+        pickle.dump(entry, self.journal_file)
+        self.journal_file.flush()
+        self.entry_count += 1
+        self.unsynced_count += 1
+        if self.unsynced_count >= self.batch_size:
+            self.sync()
+
+    def sync(self):
+        """Sync journal entries to disk."""
+        if self.journal_file is not None and self.unsynced_count:
+            os.fsync(self.journal_file.fileno())
+        self.unsynced_count = 0
+
+    @dryrun.method()
+    def persist(self):
+        """Sync the journal and compact it if it holds as many entries as the
+        mapping."""
+        self.sync()
+        if self.entry_count and self.entry_count >= len(self.data):
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a new snapshot file and remove the journal.
+        Replaying a journal left by a crash before its removal is harmless, as
+        the new snapshot already holds its changes."""
+        temp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with temp_path.open("wb") as f:
+            pickle.dump(self.data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self.close()
+        self.journal_path.unlink(missing_ok=True)
+        self.logger.info(
+            "compacted %d journal entries into %s",
+            self.entry_count,
+            self.snapshot_path,
+        )
+        self.entry_count = 0
+
+    @dryrun.method()
+    def truncate_journal(self, size):
+        """Truncate the journal file to a size."""
+        with self.journal_path.open("r+b") as f:
+            f.truncate(size)
+
+    def close(self):
+        """Sync and close the journal file."""
+        if self.journal_file is not None:
+            self.sync()
+            self.journal_file.close()
+            self.journal_file = None
+
+
+def load_journaled_mapping(
+    snapshot_path, default, batch_size=DEFAULT_BATCH_SIZE, dryrun=False
+):
+    """Return a journaled mapping loaded from a snapshot file and its journal,
+    or initialized to a copy of a default mapping, with the number of journal
+    entries to sync together and a dry run flag."""
+    mapping = JournaledMapping(snapshot_path, default, batch_size, dryrun=dryrun)
+    mapping.load()
+    return mapping
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,106 @@
+"""Parse a JSON array incrementally from a stream of byte chunks, yielding
+each element as soon as it is complete."""
+
+import codecs
+import json
+import re
+
+WHITESPACE = " \t\n\r"
+STRUCTURE_PATTERN = re.compile(r'["\[\]{},]')
+STRING_PATTERN = re.compile(r'["\\]')
+
+
+class JsonStreamError(ValueError):
+
+    """Raised when a stream does not contain a JSON array."""
+
+
+def iter_json_array(chunks, encoding="utf-8"):
+    """Yield the elements of a JSON array read from an iterable of byte chunks
+    in some encoding. Keep only the unparsed text in memory."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    chunk_iterator = iter(chunks)
+    buffer = ""
+    exhausted = False
+
+    def read_more():
+        """Append the next chunk to the buffer. Return false if the stream is
+        exhausted; true otherwise."""
+        nonlocal buffer, exhausted
+        for chunk in chunk_iterator:
+            text = text_decoder.decode(chunk)
+            if text:
+                buffer += text
+                return True
+        buffer += text_decoder.decode(b"", final=True)
+        exhausted = True
+        return False
+
+    def next_token(position):
+        """Return the position of the next non-whitespace character at or
+        after a position in the buffer, reading more as needed, or None if
+        the stream ends first."""
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                return position
+            if exhausted or not read_more():
+                return None
+
+    def scan_element(position):
+        """Read ahead until the buffer holds the whole element starting at a
+        position: until a comma or closing bracket outside any string and
+        nested value. Scan each character once, so elements spanning many
+        chunks are decoded once, not once per chunk."""
+        depth = 0
+        in_string = False
+        while True:
+            pattern = STRING_PATTERN if in_string else STRUCTURE_PATTERN
+            match = pattern.search(buffer, position)
+            if match is None:
+                position = max(position, len(buffer))
+                if exhausted or not read_more():
+                    return
+                continue
+            char = match.group()
+            position = match.end()
+            if char == "\\":
+                # Skip the escaped character, even if it is in the next chunk.
+                position += 1
+            elif char == '"':
+                in_string = not in_string
+            elif char in "[{":
+                depth += 1
+            elif depth > 0 and char in "]}":
+                depth -= 1
+            elif depth == 0:
+                return
+
+    position = next_token(0)
+    if position is None or buffer[position] != "[":
+        raise JsonStreamError("Expected a JSON array")
+    position = next_token(position + 1)
+    if position is not None and buffer[position] == "]":
+        return
+    while position is not None:
+        scan_element(position)
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as err:
+            raise JsonStreamError("Incomplete JSON array element") from err
+        yield element
+        buffer = buffer[end:]
+        position = next_token(0)
+        if position is None:
+            break
+        if buffer[position] == "]":
+            return
+        if buffer[position] != ",":
+            raise JsonStreamError("Expected , or ] in JSON array")
+        position = next_token(position + 1)
+    raise JsonStreamError("Incomplete JSON array")
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -12,33 +12,56 @@ class Meetup2Apricot:
         photo_cache,
         reporter,
         event_mapping_updater,
+        apricot_throttle,
+        dead_event_cache,
+        meetup_events_cache,
+        http_transport,
         event_processor_provider,
     ):
         """Initialize with a list of Meetup events to add to Wild Apricot,
         an initial mapping of Meetup IDs to Wild Apricot IDs, a photo cache,
-        a progress reporter, an event mapping updater, and an event processor
-        provider."""
+        a progress reporter, an event mapping updater, a Wild Apricot API
+        throttle, a cache of dead Meetup events, a cache of the Meetup event
+        list, a web transport, and an event processor provider."""
         self.meetup_events = meetup_events
         self.initial_event_mapping = initial_event_mapping
         self.photo_cache = photo_cache
         self.reporter = reporter
         self.event_mapping_updater = event_mapping_updater
+        self.apricot_throttle = apricot_throttle
+        self.dead_event_cache = dead_event_cache
+        self.meetup_events_cache = meetup_events_cache
+        self.http_transport = http_transport
         self.event_processor_provider = event_processor_provider
 
     def run(self):
-        """Run the Meetup to Wild Apricot conversion."""
-        event_processor = self.setup_event_processor()
-        self.add_apricot_events(event_processor)
-        self.reporter.report_downloads()
-        event_processor.persist()
-        self.photo_cache.persist()
+        """Run the Meetup to Wild Apricot conversion. Cache the Meetup event
+        list only if every event was processed, so an unchanged list can skip
+        later runs. Persist the Wild Apricot throttle and log connection reuse
+        even if the conversion fails."""
+        try:
+            event_processor = self.setup_event_processor()
+            self.add_apricot_events(event_processor)
+            self.reporter.report_downloads()
+            event_processor.persist()
+            self.photo_cache.persist()
+            self.dead_event_cache.persist()
+            self.dead_event_cache.log_statistics()
+            if not event_processor.skipped_count:
+                self.meetup_events_cache.persist()
+        finally:
+            self.apricot_throttle.persist()
+            self.http_transport.log_statistics()
 
     def setup_event_processor(self):
-        """Setup an event processor."""
+        """Setup an event processor with the updated event mapping. Journal
+        the updates to the initial event mapping."""
         event_mapping = self.event_mapping_updater.update_event_mapping(
             self.initial_event_mapping
         )
-        return self.event_processor_provider(event_mapping)
+        return self.event_processor_provider(
+            self.initial_event_mapping.replace(event_mapping)
+        )
 
     def add_apricot_events(self, event_processor):
         """Use an event processor to add Meetup events to Wild Apricot."""
@@ -1,8 +1,20 @@
 """Access Meetup API to download events."""
 
 from .http_response_error import MeetupApiError
-from .throttle import make_throttle
+from .meetup_event import EVENT_FIELDS
+from .meetup_events_cache import NULL_MEETUP_EVENTS_CACHE
+from .retrier import NULL_RETRIER
+from .throttle import AdaptiveThrottle, make_throttle
+from .json_stream import iter_json_array
+from datetime import timedelta
+from functools import partial
 from http import HTTPStatus
+from itertools import islice
+
+MEETUP_API_URL = "https://api.meetup.com"
+MAX_PAGE_SIZE = 200
+START_TIME_WINDOW_MARGIN = timedelta(days=1)
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class MeetupApi:
@@ -11,38 +23,127 @@ class MeetupApi:
 
     api_utilization_ratio = 2 / 3
 
-    def __init__(self, session, throttle, group_url_name, events_wanted):
+    def __init__(
+        self,
+        session,
+        throttle,
+        group_url_name,
+        events_wanted,
+        retrier=NULL_RETRIER,
+        events_cache=NULL_MEETUP_EVENTS_CACHE,
+        earliest_start_time=None,
+        latest_start_time=None,
+        stream_json=False,
+        requests_in_flight=1,
+        api_url=MEETUP_API_URL,
+    ):
         """Initialize with a Requests session, a throttle, a Meetup group URL
-        name, and the number of events wanted from Meetup."""
+        name, the number of events wanted from Meetup, a retrier for failed
+        requests, a cache of the last event list retrieved, optional earliest
+        and latest event start times, a flag to parse event lists as they
+        stream in, the most requests sent at once, and the Meetup API base
+        URL."""
         self.session = session
         self.throttle = throttle
         self.group_url_name = group_url_name
         self.events_wanted = events_wanted
+        self.retrier = retrier
+        self.events_cache = events_cache
+        self.earliest_start_time = earliest_start_time
+        self.latest_start_time = latest_start_time
+        self.stream_json = stream_json
+        self.requests_in_flight = requests_in_flight
+        self.api_url = api_url
 
     def retrieve_status(self):
         """Retrieve the status of the Meetup API."""
-        self.throttle.throttle()
         url = self.build_url("status")
-        response = self.session.get(url)
+        response = self.retrier.request(self.throttle, self.session.get, url)
         MeetupApiError.check_response_status(response)
         return response
 
     def retrieve_events_json(self, *path_segments, **kwargs):
         """Retrieve the JSON event list, adding path segments to the URL and
         keyword arguments to the usual request parameters."""
-        self.throttle.throttle()
         url = self.build_url(self.group_url_name, "events", *path_segments)
         params = self.request_params()
         params.update(kwargs)
-        response = self.session.get(url, params=params)
+        response = self.retrier.request(
+            self.throttle, self.session.get, url, params=params
+        )
+        self.adapt_throttle(response)
         MeetupApiError.check_response_status(response)
         return response.json()
 
+    def iterate_events_json(self):
+        """Yield JSON events page by page, following the links to later pages
+        Meetup provides, until yielding the number of events wanted. Ask for
+        the first page only if it changed since it was cached, yielding
+        nothing and noting the list is unchanged otherwise."""
+        url = self.build_url(self.group_url_name, "events")
+        response = self.retrieve_events_page(
+            url,
+            params=self.request_params(),
+            headers=self.events_cache.conditional_headers(),
+        )
+        if self.events_cache.is_not_modified(response):
+            response.close()
+            self.events_cache.note_unchanged()
+            return
+        events_left = self.events_wanted
+        for event_json in self.parse_events_page(response, events_left):
+            events_left -= 1
+            yield event_json
+        next_url = self.next_page_url(response)
+        self.events_cache.update(response, complete=next_url is None)
+        while next_url and events_left > 0:
+            response = self.retrieve_events_page(next_url)
+            for event_json in self.parse_events_page(response, events_left):
+                events_left -= 1
+                yield event_json
+            next_url = self.next_page_url(response)
+
+    def parse_events_page(self, response, events_wanted):
+        """Yield up to a number of JSON events wanted from a response, parsing
+        them one at a time as they arrive when streaming. Close the
+        response when done."""
+        if self.stream_json:
+            events = iter_json_array(response.iter_content(STREAM_CHUNK_SIZE))
+        else:
+            events = iter(response.json())
+        try:
+            yield from islice(events, events_wanted)
+        finally:
+            response.close()
+
+    def retrieve_events_page(self, url, **kwargs):
+        """Retrieve a page of events from a URL, passing keyword arguments to
+        the request. Return the response."""
+        if self.stream_json:
+            kwargs["stream"] = True
+        response = self.retrier.request(self.throttle, self.session.get, url, **kwargs)
+        self.adapt_throttle(response)
+        MeetupApiError.check_response_status(response)
+        return response
+
+    @staticmethod
+    def next_page_url(response):
+        """Return the URL of the next page of results linked from a response or
+        None if there are no more pages."""
+        return response.links.get("next", {}).get("url")
+
     def retrieve_event_json(self, meetup_id):
         """Retrieve the JSON event by its Meetup ID."""
-        self.throttle.throttle()
         url = self.build_url(self.group_url_name, "events", meetup_id)
-        response = self.session.get(url)
+        response = self.retrier.request(
+            self.throttle, self.session.get, url, params=self.event_params()
+        )
+        return self.event_json_from_response(response)
+
+    def event_json_from_response(self, response):
+        """Adapt the throttle to a response to a single event request. Return
+        the JSON event or None if the event is unavailable."""
+        self.adapt_throttle(response)
         if response.status_code in [
             HTTPStatus.FORBIDDEN,
             HTTPStatus.NOT_FOUND,
@@ -55,21 +156,69 @@ class MeetupApi:
     def build_url(self, *path_segments):
         """Build a Meetup API URL from any number of path segments."""
         path = "/".join(path_segments)
-        return f"https://api.meetup.com/{path}"
+        return f"{self.api_url}/{path}"
 
     def request_params(self):
-        """Return a dictionary of request parameters."""
+        """Return a dictionary of request parameters for event lists. Ask
+        Meetup for events within the start time window, if any."""
+        params = {
+            "page": min(self.events_wanted, MAX_PAGE_SIZE),
+            "scroll": "recent_past",
+        }
+        params.update(self.event_params())
+        if self.earliest_start_time:
+            params["no_earlier_than"] = self.format_window_time(
+                self.earliest_start_time - START_TIME_WINDOW_MARGIN
+            )
+        if self.latest_start_time:
+            params["no_later_than"] = self.format_window_time(
+                self.latest_start_time + START_TIME_WINDOW_MARGIN
+            )
+        return params
+
+    @staticmethod
+    def event_params():
+        """Return a dictionary of request parameters for events, asking Meetup
+        for the optional featured fields and for only the fields read from
+        events."""
         return {
-            "page": self.events_wanted,
             "fields": "featured,featured_photo",
-            "scroll": "recent_past",
+            "only": ",".join(EVENT_FIELDS),
         }
 
+    @staticmethod
+    def format_window_time(window_time):
+        """Format a start time window boundary as Meetup expects: ISO 8601
+        local time without an offset. Meetup interprets the time in the
+        group's timezone, so keep the time in its configured offset, normally
+        the group's, rather than the host's timezone. The window's margin
+        covers an offset that differs from the group's, such as across a
+        daylight saving time change."""
+        return f"{window_time:%Y-%m-%dT%H:%M:%S}.000"
+
     def make_throttle(self, requests_response):
-        """Make a throttle based on a Meetup API Request response."""
+        """Make a throttle based on a Meetup API Request response. The throttle
+        starts at the usual utilization ratio and adapts to the rate limits
+        reported with each later response, holding a reserve of requests for
+        those already in flight."""
         rate = int(requests_response.headers["X-RateLimit-Limit"])
         time_span = int(requests_response.headers["X-RateLimit-Reset"])
-        return make_throttle(rate, time_span, self.api_utilization_ratio, "Meetup API")
+        return make_throttle(
+            rate,
+            time_span,
+            self.api_utilization_ratio,
+            "Meetup API",
+            throttle_class=partial(AdaptiveThrottle, reserve=self.requests_in_flight),
+        )
+
+    def adapt_throttle(self, requests_response):
+        """Adapt the throttle to the remaining requests and reset time reported
+        in a Meetup API Request response, if any."""
+        headers = requests_response.headers
+        if "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = int(headers["X-RateLimit-Reset"])
+            self.throttle.adapt(remaining, reset)
 
     def make_meetup_api_throttle(self):
         """Make a Meetup status request and return a throttle configured with
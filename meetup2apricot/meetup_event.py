@@ -26,6 +26,23 @@ VENUE_CITY_KEY = "city"
 VENUE_STATE_KEY = "state"
 VENUE_ZIPCODE_KEY = "zip"
 
+# Top level Meetup event JSON fields read, the only fields requested from Meetup
+EVENT_FIELDS = (
+    DESCRIPTION_KEY,
+    DURATION_KEY,
+    FEATURED_KEY,
+    FEATURED_PHOTO_KEY,
+    FEE_KEY,
+    FIND_US_KEY,
+    LINK_KEY,
+    MEETUP_ID_KEY,
+    NAME_KEY,
+    RSVP_LIMIT_KEY,
+    START_TIME_KEY,
+    STATUS_KEY,
+    VENUE_KEY,
+)
+
 # Default event length
 THREE_HOURS_MSEC = 3 * 60 * 60 * 1000
 DEFAULT_DURATION = THREE_HOURS_MSEC
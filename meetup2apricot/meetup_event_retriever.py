@@ -1,16 +1,28 @@
 """Retrieves Meetup events by ID."""
 
+from .dead_event_cache import NULL_DEAD_EVENT_CACHE
 from .meetup_event import MeetupEvent
+from concurrent.futures import ThreadPoolExecutor
 
 
 class MeetupEventRetriever:
 
     """Retrieves events by ID from cache or Meetup API."""
 
-    def __init__(self, meetup_api, meetup_events):
-        """Initialize with a Meetup API interface and a list of Meetup events."""
+    def __init__(
+        self,
+        meetup_api,
+        meetup_events,
+        max_workers=1,
+        dead_event_cache=NULL_DEAD_EVENT_CACHE,
+    ):
+        """Initialize with a Meetup API interface, a list of Meetup events, the
+        maximum number of concurrent workers retrieving events, and a cache of
+        dead events."""
         self.meetup_api = meetup_api
         self.events_by_id = {event.meetup_id: event for event in meetup_events}
+        self.max_workers = max_workers
+        self.dead_event_cache = dead_event_cache
 
     def get_event(self, meetup_id):
         """Return a Meetup event with the event ID or None if no current event
@@ -19,11 +31,42 @@ class MeetupEventRetriever:
             self.events_by_id[meetup_id] = self.retrieve_event(meetup_id)
         return self.events_by_id[meetup_id]
 
+    def prefetch_events(self, meetup_ids):
+        """Retrieve events by Meetup ID from Meetup, concurrently, unless they
+        are already available. Meetup's API retrieves one event per request, so
+        each worker retrieves one event at a time."""
+        missing_ids = self.missing_event_ids(meetup_ids)
+        if not missing_ids:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            events = executor.map(self.retrieve_event, missing_ids)
+            self.events_by_id.update(zip(missing_ids, events))
+
+    def missing_event_ids(self, meetup_ids):
+        """Return a list of the unique Meetup IDs, in order, for events not
+        already available."""
+        return list(
+            dict.fromkeys(
+                meetup_id
+                for meetup_id in meetup_ids
+                if meetup_id not in self.events_by_id
+            )
+        )
+
     def retrieve_event(self, meetup_id):
         """Retrieve a Meetup event by ID from Meetup. Return the event or None
-        if it is cancelled or unavailable."""
+        if it is cancelled or unavailable. Skip events recently found dead and
+        remember newly dead events."""
+        if self.dead_event_cache.is_dead(meetup_id):
+            return None
         event_json = self.meetup_api.retrieve_event_json(meetup_id)
+        return self.event_from_json(meetup_id, event_json)
+
+    def event_from_json(self, meetup_id, event_json):
+        """Return a Meetup event with an ID from its JSON or None if it is
+        cancelled or unavailable. Remember newly dead events."""
         if not event_json:
+            self.dead_event_cache.add(meetup_id)
             return None
         event = MeetupEvent(event_json)
         if event.status == "cancelled":
@@ -0,0 +1,129 @@
+"""Cache the validators Meetup sent with the last Meetup event list, so later
+requests can ask Meetup for the list only if it changed."""
+
+from . import dryrun
+from http import HTTPStatus
+import logging
+import pickle
+
+
+class MeetupEventsCache:
+
+    """Caches the ETag and Last-Modified validators of the Meetup event list,
+    but not the events, which are not needed once Meetup reports the list is
+    not modified. Provides conditional request headers and notes when the list
+    is unchanged."""
+
+    logger = logging.getLogger("MeetupEventsCache")
+
+    def __init__(self, cache_path, settings, dryrun=False):
+        """Initialize with a path to the cache file, settings that must match
+        the cached settings to use the cache, and a dry run flag."""
+        self.cache_path = cache_path
+        self.settings = settings
+        self.dryrun = dryrun
+        self.etag = None
+        self.last_modified = None
+        self.unchanged = False
+
+    def load(self):
+        """Load the cached validators from the cache file, if any, provided
+        they were cached with the same settings."""
+        if not self.cache_path.exists():
+            return
+        try:
+            with self.cache_path.open("rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as err:
+            self.logger.warning("Cannot load Meetup events cache: %s", err)
+            return
+        if cached.get("settings") != self.settings:
+            self.logger.info("Settings changed since Meetup events were cached")
+            return
+        self.etag = cached.get("etag")
+        self.last_modified = cached.get("last_modified")
+
+    def is_cached(self):
+        """Return true if validators are cached; false otherwise."""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self):
+        """Return a dictionary of request headers asking Meetup for the event
+        list only if it changed since it was cached."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def is_not_modified(self, response):
+        """Return true if a response reports the event list is unchanged since
+        it was cached; false otherwise."""
+        return response.status_code == HTTPStatus.NOT_MODIFIED and self.is_cached()
+
+    def note_unchanged(self):
+        """Note that the event list is unchanged since it was cached."""
+        self.logger.info("Meetup events unchanged since they were cached")
+        self.unchanged = True
+
+    def update(self, response, complete):
+        """Update the cache with the validators from a response to a request
+        for the event list. Forget the validators unless the response holds
+        the complete list, rather than the first of several pages."""
+        if complete:
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+        else:
+            self.etag = None
+            self.last_modified = None
+
+    @dryrun.method()
+    def persist(self):
+        """Persist the cached validators to the cache file or remove the cache
+        file if nothing is cached."""
+        if not self.is_cached():
+            if self.cache_path.exists():
+                self.cache_path.unlink()
+            return
+        cached = {
+            "settings": self.settings,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+        with self.cache_path.open("wb") as f:
+            pickle.dump(cached, f)
+
+
+class NullMeetupEventsCache:
+
+    """Caches nothing, so every request for Meetup events is unconditional."""
+
+    unchanged = False
+
+    def conditional_headers(self):
+        """Return no conditional request headers."""
+        return {}
+
+    def is_not_modified(self, response):
+        """Return false, as nothing is cached."""
+        return False
+
+    def update(self, response, complete):
+        """Cache nothing."""
+
+    def persist(self):
+        """Persist nothing."""
+
+
+NULL_MEETUP_EVENTS_CACHE = NullMeetupEventsCache()
+
+
+def load_meetup_events_cache(cache_path, settings, dryrun=False):
+    """Return a Meetup events cache loaded from a cache file."""
+    meetup_events_cache = MeetupEventsCache(cache_path, settings, dryrun=dryrun)
+    meetup_events_cache.load()
+    return meetup_events_cache
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -1,5 +1,7 @@
 """Starts an OAuth2 session."""
 
+from .http_cassette import NULL_CASSETTE
+from .http_transport import NULL_TRANSPORT
 from oauthlib.oauth2 import BackendApplicationClient, OAuth2Error
 from requests_oauthlib import OAuth2Session
 
@@ -14,15 +16,26 @@ class Oauth2SessionStarter(object):
     """Creates and authorizes an OAuth2 web session."""
 
     def __init__(
-        self, client_id, client_secret, token_url, user_agent=None, scope=None
+        self,
+        client_id,
+        client_secret,
+        token_url,
+        user_agent=None,
+        scope=None,
+        cassette=NULL_CASSETTE,
+        transport=NULL_TRANSPORT,
     ):
         """Initialize with a client ID and secret, the URL for obtaining a
-        token, an optional user agent, and an optional scope of access."""
+        token, an optional user agent, an optional scope of access, an
+        optional cassette to record or replay web requests, and an optional
+        transport sharing pooled connections."""
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_url = token_url
         self.scope = scope
         self.user_agent = user_agent
+        self.cassette = cassette
+        self.transport = transport
 
     def start_session(self):
         """Start an authorized OAuth2 web session."""
@@ -34,7 +47,8 @@ class Oauth2SessionStarter(object):
     def create_session(self):
         """Create an OAuth2 session."""
         client = BackendApplicationClient(client_id=self.client_id, scope=self.scope)
-        return OAuth2Session(client=client)
+        session = self.transport.mount(OAuth2Session(client=client))
+        return self.cassette.mount(session)
 
     def authorize_session(self, session):
         """Authorize an OAuth2 session."""
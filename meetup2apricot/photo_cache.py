@@ -1,8 +1,9 @@
 """Cache featured photos from Meetup events."""
 
 from . import dryrun
+from .journal import load_journaled_mapping
+from .photo_usage import NULL_PHOTO_USAGE
 import re
-import pickle
 from urllib.parse import urlparse
 from pathlib import PurePosixPath
 
@@ -17,27 +18,28 @@ class PhotoCache:
         urls_to_paths,
         photo_retriever,
         photo_uploader,
-        cache_path,
         reporter,
         dryrun=False,
+        photo_usage=NULL_PHOTO_USAGE,
     ):
-        """Initialize a Wild Apricot directory path, an initial mapping of
-        Meetup photo URLs to Wild Apricot photo paths, a photo retriever, a
-        photo uploader, a path to the cache file, a reporter, and a dry run
-        flag."""
+        """Initialize a Wild Apricot directory path, an initial journaled
+        mapping of Meetup photo URLs to Wild Apricot photo paths, a photo
+        retriever, a photo uploader, a reporter, a dry run flag, and the photo
+        usage that records photo use and prunes unused photos."""
         self.apricot_directory = apricot_directory
         self.urls_to_paths = urls_to_paths
         self.photo_retriever = photo_retriever
         self.photo_uploader = photo_uploader
-        self.cache_path = cache_path
         self.reporter = reporter
         self.dryrun = dryrun
+        self.photo_usage = photo_usage
 
     def cache_photo(self, meetup_event):
         """Cache a Meetup event's photo for copying to Wild Apricot and return
         it's Wild Apricot path."""
         if meetup_event.photo_url not in self.urls_to_paths:
             self.copy_meetup_photo_to_apricot(meetup_event)
+        self.photo_usage.touch(meetup_event.photo_url)
         return self.urls_to_paths[meetup_event.photo_url]
 
     def copy_meetup_photo_to_apricot(self, meetup_event):
@@ -58,9 +60,11 @@ class PhotoCache:
 
     @dryrun.method()
     def persist(self):
-        """Persist cache to a file."""
-        with self.cache_path.open("wb") as f:
-            pickle.dump(self.urls_to_paths, f)
+        """Prune unused photos, then persist the photo mapping to the cache
+        file and its journal and the photo usage."""
+        self.photo_usage.prune(self.urls_to_paths)
+        self.urls_to_paths.persist()
+        self.photo_usage.persist()
 
     @staticmethod
     def apricot_photo_name(name, date):
@@ -71,14 +75,11 @@ class PhotoCache:
         return f"{shorter_name}{date:%Y-%m-%d}"
 
 
-def load_cached_photo_urls(cache_path):
-    """Return a mapping of Meetup photo URLs to Wild Apricot photo paths,
-    either loaded from a cache file or initialized to a default."""
-    if cache_path.exists():
-        with cache_path.open("rb") as f:
-            return pickle.load(f)
-    else:
-        return {None: None}
+def load_cached_photo_urls(cache_path, dryrun=False):
+    """Return a journaled mapping of Meetup photo URLs to Wild Apricot photo
+    paths, either loaded from a cache file and its journal or initialized to a
+    default."""
+    return load_journaled_mapping(cache_path, {None: None}, dryrun=dryrun)
 
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -2,6 +2,8 @@
 
 from . import dryrun
 from .http_response_error import PhotoRetrieveError
+from .retrier import NULL_RETRIER
+from .throttle import OpenThrottle
 import requests
 import imghdr
 import logging
@@ -13,12 +15,13 @@ class PhotoRetriever:
 
     logger = logging.getLogger("PhotoRetriever")
 
-    def __init__(self, local_directory, session, dryrun=False):
+    def __init__(self, local_directory, session, dryrun=False, retrier=NULL_RETRIER):
         """Initialize with a local directory path for storing photos, a
-        requests session, and a dry run flag."""
+        requests session, a dry run flag, and a retrier for failed requests."""
         self.local_directory = local_directory
         self.session = session
         self.dryrun = dryrun
+        self.retrier = retrier
 
     @dryrun.method(value="photo.png")
     def get(self, photo_url, proposed_photo_filename):
@@ -34,7 +37,7 @@ class PhotoRetriever:
 
     def retrieve_photo(self, photo_url, photo_path):
         """Retrieve a photo from a URL and save it to a path."""
-        response = self.session.get(photo_url)
+        response = self.retrier.request(OpenThrottle(), self.session.get, photo_url)
         PhotoRetrieveError.check_response_status(response)
         try:
             with photo_path.open("wb") as photo_file:
@@ -59,10 +62,11 @@ class PhotoRetriever:
             self.local_directory.mkdir()
 
 
-def make_photo_retriever(local_directory, session, dryrun=False):
+def make_photo_retriever(local_directory, session, dryrun=False, retrier=NULL_RETRIER):
     """Make a photo retriever with a confirmed local directory path for
-    storing photos, a requests session, and a dry run flag."""
-    retriever = PhotoRetriever(local_directory, session, dryrun)
+    storing photos, a requests session, a dry run flag, and a retrier for
+    failed requests."""
+    retriever = PhotoRetriever(local_directory, session, dryrun, retrier)
     retriever.assure_local_directory()
     return retriever
 
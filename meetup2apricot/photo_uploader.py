@@ -2,6 +2,8 @@
 
 from . import dryrun
 from .http_response_error import PhotoUploadError
+from .retrier import NULL_RETRIER
+from .throttle import OpenThrottle
 import logging
 from pathlib import PurePosixPath
 from requests import Session
@@ -22,15 +24,17 @@ class PhotoUploader:
         apricot_directory,
         session,
         dryrun=False,
+        retrier=NULL_RETRIER,
     ):
         """Initialize with a local directory path for storing photos, a Wild
-        Apricot base URL, a Wild Apricot directory, a requests session, and a
-        dry run flag."""
+        Apricot base URL, a Wild Apricot directory, a requests session, a dry
+        run flag, and a retrier for failed requests."""
         self.local_directory = local_directory
         self.apricot_base_url = apricot_base_url
         self.apricot_directory = apricot_directory
         self.session = session
         self.dryrun = dryrun
+        self.retrier = retrier
 
     @dryrun.method(value=PurePosixPath("/sample/path/to/photo.png"))
     def upload_photo(self, photo_file_name):
@@ -45,11 +49,19 @@ class PhotoUploader:
             photo_file = open(local_photo_path, "rb")
         except OSError as err:
             raise PhotoUploadError(f"Cannot open photo file: {err}")
-        response = self.session.put(url, data=photo_file, headers=headers)
+        response = self.retrier.request(
+            OpenThrottle(), self.put_photo_file, url, photo_file, headers
+        )
         PhotoUploadError.check_response_status(response)
         self.logger.info("upload_photo: apricot_photo_path=%s", apricot_photo_path)
         return apricot_photo_path
 
+    def put_photo_file(self, url, photo_file, headers):
+        """Put an open photo file from its beginning to a URL with some
+        headers. Return the response."""
+        photo_file.seek(0)
+        return self.session.put(url, data=photo_file, headers=headers)
+
 
 def make_photo_uploader_session(username, password, user_agent):
     """Make an HTTP session with a username, password, and user agent for
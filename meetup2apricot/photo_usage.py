@@ -0,0 +1,148 @@
+"""Remember when each cached Meetup photo was last used, so the photo cache and
+the local photo directory can forget photos no longer needed."""
+
+from . import dryrun
+from .clock import SYSTEM_CLOCK
+from .journal import load_journaled_mapping
+from pathlib import PurePosixPath
+import logging
+
+TOUCH_INTERVAL = 24 * 60 * 60
+
+
+class PhotoUsage:
+
+    """Records the times cached Meetup photos were last used in a mapping of
+    Meetup photo URLs to times, to the nearest day so repeated use costs no
+    writes. Prunes photos unused for longer than a time to live and the least
+    recently used photos beyond a maximum count, either limit optional, from a
+    mapping of Meetup photo URLs to Wild Apricot photo paths. Optionally
+    deletes the local files of the photos pruned."""
+
+    logger = logging.getLogger("PhotoUsage")
+
+    def __init__(
+        self,
+        last_used,
+        time_to_live,
+        max_photos,
+        photo_directory=None,
+        dryrun=False,
+        clock=SYSTEM_CLOCK,
+    ):
+        """Initialize with a mapping of Meetup photo URLs to the times they
+        were last used (seconds since the epoch), a time to live (seconds) and
+        the most photos to keep, either None for no limit, an optional local
+        photo directory to delete pruned photos from, a dry run flag, and an
+        optional clock."""
+        self.last_used = last_used
+        self.time_to_live = time_to_live
+        self.max_photos = max_photos
+        self.photo_directory = photo_directory
+        self.dryrun = dryrun
+        self.clock = clock
+
+    def touch(self, photo_url):
+        """Record that a cached photo URL was used now, unless it was already
+        used within the touch interval."""
+        if photo_url is None:
+            return
+        now = self.clock.time()
+        if now - self.last_used.get(photo_url, float("-inf")) >= TOUCH_INTERVAL:
+            self.last_used[photo_url] = now
+
+    def prune(self, urls_to_paths):
+        """Prune unused photos from a mapping of Meetup photo URLs to Wild
+        Apricot photo paths and delete their local files, if wanted."""
+        evicted_paths = self.evict(urls_to_paths)
+        if self.photo_directory is not None:
+            self.delete_local_photos(evicted_paths, urls_to_paths)
+
+    def evict(self, urls_to_paths):
+        """Delete photos unused for longer than the time to live and the least
+        recently used photos beyond the maximum count from a mapping of Meetup
+        photo URLs to Wild Apricot photo paths. Photos cached before their use
+        was recorded count as used now. Return the Wild Apricot paths of the
+        photos deleted."""
+        now = self.clock.time()
+        for photo_url in urls_to_paths:
+            if photo_url is not None and photo_url not in self.last_used:
+                self.last_used[photo_url] = now
+        for photo_url in [url for url in self.last_used if url not in urls_to_paths]:
+            del self.last_used[photo_url]
+        most_recent = sorted(self.last_used.items(), key=lambda item: -item[1])
+        evicted = [
+            photo_url
+            for index, (photo_url, last_used) in enumerate(most_recent)
+            if self.is_beyond_limits(index, now - last_used)
+        ]
+        evicted_paths = []
+        for photo_url in evicted:
+            evicted_paths.append(urls_to_paths[photo_url])
+            del self.last_used[photo_url]
+            del urls_to_paths[photo_url]
+        self.logger.info(
+            "photos=%d evicted=%d", len(most_recent) - len(evicted), len(evicted)
+        )
+        return evicted_paths
+
+    def is_beyond_limits(self, index, unused_time):
+        """Return true if a photo, at an index among the most recently used
+        photos and unused for some seconds, is beyond the limits set; false
+        otherwise."""
+        if self.max_photos is not None and index >= self.max_photos:
+            return True
+        return self.time_to_live is not None and unused_time > self.time_to_live
+
+    @dryrun.method()
+    def delete_local_photos(self, apricot_paths, urls_to_paths):
+        """Delete the local files of photos with some Wild Apricot paths from
+        the local photo directory, except files still named by a mapping of
+        Meetup photo URLs to Wild Apricot photo paths."""
+        cached_names = {
+            PurePosixPath(apricot_path).name
+            for apricot_path in urls_to_paths.values()
+            if apricot_path is not None
+        }
+        deleted_count = 0
+        for apricot_path in apricot_paths:
+            name = PurePosixPath(apricot_path).name
+            if name in cached_names:
+                continue
+            photo_path = self.photo_directory / name
+            if photo_path.is_file():
+                photo_path.unlink()
+                deleted_count += 1
+        self.logger.info(
+            "deleted %d pruned photos from %s", deleted_count, self.photo_directory
+        )
+
+    def persist(self):
+        """Persist the last used times."""
+        self.last_used.persist()
+
+
+class NullPhotoUsage:
+
+    """Records no photo use and prunes no photos."""
+
+    def touch(self, photo_url):
+        """Record nothing."""
+
+    def prune(self, urls_to_paths):
+        """Prune nothing."""
+
+    def persist(self):
+        """Persist nothing."""
+
+
+NULL_PHOTO_USAGE = NullPhotoUsage()
+
+
+def load_cached_photo_last_used(cache_path, dryrun=False):
+    """Return a journaled mapping of Meetup photo URLs to the times they were
+    last used, either loaded from a cache file and its journal or empty."""
+    return load_journaled_mapping(cache_path, {}, dryrun=dryrun)
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
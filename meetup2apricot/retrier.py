@@ -0,0 +1,197 @@
+"""Retry HTTP requests that fail from rate limiting, transient server errors,
+or lost connections."""
+
+from .clock import SYSTEM_CLOCK
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+import logging
+import random
+import requests
+import threading
+
+ALWAYS_RETRIABLE_STATUSES = frozenset(
+    [HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE]
+)
+IDEMPOTENT_RETRIABLE_STATUSES = frozenset(
+    [
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    ]
+)
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+class Retrier:
+
+    """Throttles and sends HTTP requests, retrying those that fail from rate
+    limiting, transient server errors, or, for idempotent requests, connection
+    errors and timeouts. Honors Retry-After headers and
+    otherwise backs off exponentially with jitter. Limits the retries for each
+    request and for the whole run."""
+
+    logger = logging.getLogger("Retrier")
+
+    def __init__(
+        self,
+        retry_budget,
+        max_attempts=5,
+        base_delay=1,
+        max_delay=60,
+        max_retry_after=300,
+        clock=SYSTEM_CLOCK,
+    ):
+        """Initialize with a budget of retries for all requests, a maximum
+        number of attempts per request, a base and maximum backoff delay
+        (seconds), the longest Retry-After delay worth waiting for (seconds),
+        and an optional clock."""
+        self.retries_left = retry_budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.clock = clock
+        self.lock = threading.Lock()
+
+    def request(self, throttle, send, *args, **kwargs):
+        """Throttle a request and send it by calling a send function with any
+        arguments, retrying after retriable failures. Close responses not
+        returned to release their connections. Tell the throttle about pauses
+        before retries. Return the final response or raise the final
+        connection error or timeout. Concurrent threads may share a retrier and
+        its budget."""
+        attempt = 1
+        while True:
+            throttle.throttle()
+            try:
+                response = send(*args, **kwargs)
+            except TRANSIENT_ERRORS as error:
+                delay = self.claim_error_retry(error, attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self.claim_retry(response, attempt)
+                if delay is None:
+                    return response
+                response.close()
+            throttle.pause(delay)
+            self.clock.sleep(delay)
+            attempt += 1
+
+    def claim_retry(self, response, attempt):
+        """Return the seconds to wait before retrying a request after a
+        numbered attempt produced a response, spending a retry from the budget
+        and logging the retry, or None if the request should not be
+        retried."""
+        with self.lock:
+            delay = self.retry_delay(response, attempt)
+            if delay is None:
+                return None
+            self.retries_left -= 1
+        self.log_retry(delay, f"HTTP status {response.status_code}", attempt)
+        return delay
+
+    def claim_error_retry(self, error, attempt):
+        """Return the seconds to wait before retrying a request after a
+        numbered attempt raised a connection error or timeout, spending a retry
+        from the budget and logging the retry, or None if the request should
+        not be retried."""
+        with self.lock:
+            delay = self.error_retry_delay(error, attempt)
+            if delay is None:
+                return None
+            self.retries_left -= 1
+        self.log_retry(delay, type(error).__name__, attempt)
+        return delay
+
+    def log_retry(self, delay, reason, attempt):
+        """Log a retry after a delay (seconds) for a reason."""
+        self.logger.warning(
+            "Retrying in %.1f seconds: %s attempt=%d retries_left=%d",
+            delay,
+            reason,
+            attempt,
+            self.retries_left,
+        )
+
+    def retry_delay(self, response, attempt):
+        """Return the seconds to wait before retrying a request after a
+        numbered attempt produced a response or None if the request should not
+        be retried."""
+        if not self.is_retriable(response):
+            return None
+        if attempt >= self.max_attempts or self.retries_left <= 0:
+            return None
+        retry_after = parse_retry_after(response)
+        if retry_after is None:
+            return self.backoff_delay(attempt)
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after
+
+    def error_retry_delay(self, error, attempt):
+        """Return the seconds to wait before retrying a request after a
+        numbered attempt raised a connection error or timeout or None if the
+        request should not be retried. Only idempotent requests are retried,
+        since the server may have acted on the first attempt."""
+        if getattr(error.request, "method", None) not in IDEMPOTENT_METHODS:
+            return None
+        if attempt >= self.max_attempts or self.retries_left <= 0:
+            return None
+        return self.backoff_delay(attempt)
+
+    def backoff_delay(self, attempt):
+        """Return a jittered exponential backoff delay after a numbered
+        attempt: between half and all of the exponential delay."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @staticmethod
+    def is_retriable(response):
+        """Return true if a response's status may succeed later; false
+        otherwise. Server errors are retriable only for idempotent requests,
+        which cause no harm if repeated."""
+        if response.status_code in ALWAYS_RETRIABLE_STATUSES:
+            return True
+        if response.status_code in IDEMPOTENT_RETRIABLE_STATUSES:
+            return response.request.method in IDEMPOTENT_METHODS
+        return False
+
+
+class NullRetrier:
+
+    """Throttles and sends HTTP requests without retrying."""
+
+    def request(self, throttle, send, *args, **kwargs):
+        """Throttle a request and send it by calling a send function with any
+        arguments. Return the response."""
+        throttle.throttle()
+        return send(*args, **kwargs)
+
+
+NULL_RETRIER = NullRetrier()
+
+
+def parse_retry_after(response):
+    """Return the seconds to wait given by a response's Retry-After header,
+    either a number of seconds or an HTTP date, or None if the header is
+    missing or invalid."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_time = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_time - datetime.now(timezone.utc)).total_seconds())
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
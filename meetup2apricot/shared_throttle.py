@@ -0,0 +1,123 @@
+"""A throttle shared by all processes on a host through a locked state file.
+The file lock needs the POSIX fcntl module, which is imported only when a
+shared throttle is used, so other platforms can import this module."""
+
+from .clock import SYSTEM_CLOCK
+import os
+
+
+class SharedThrottle:
+
+    """Throttles activity at some rate per some time span across all processes
+    on a host sharing a state file. Like a token bucket throttle, it stores
+    only the theoretical arrival time of the next event, here in the state
+    file under an exclusive lock. Each event reserves the next available time
+    before waiting, so processes are served first come, first served, and a
+    process never holds more than one reservation."""
+
+    def __init__(self, state_path, rate, time_span, burst=1, clock=SYSTEM_CLOCK):
+        """Initialize with a state file path, a rate (integer number of
+        events), a time span (seconds), a burst (integer number of events
+        allowed at once), and an optional clock."""
+        self.clock = clock
+        self.state_path = state_path
+        self.time_span = time_span
+        self.rate = rate
+        self.burst = burst
+        self.emission_interval = time_span / rate
+        self.tolerance = (burst - 1) * self.emission_interval
+
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready for another
+        event."""
+        with self.locked_state() as state:
+            return state.arrival_time - self.tolerance
+
+    def is_ready(self, current_time=None):
+        """Check whether the throttle is ready for another event at the current
+        time."""
+        now = current_time or self.clock.time()
+        return now >= self.next_ready_time()
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        now = current_time or self.clock.time()
+        with self.locked_state() as state:
+            state.arrival_time = max(state.arrival_time, now) + self.emission_interval
+
+    def reserve(self, current_time=None):
+        """Reserve the next available event time at or after the current time
+        and return it."""
+        now = current_time or self.clock.time()
+        with self.locked_state() as state:
+            event_time = max(now, state.arrival_time - self.tolerance)
+            state.arrival_time = (
+                max(state.arrival_time, event_time) + self.emission_interval
+            )
+        return event_time
+
+    def throttle(self, current_time=None):
+        """Throttle an event, reserving the next available event time and
+        waiting until then."""
+        now = current_time or self.clock.time()
+        event_time = self.reserve(now)
+        if event_time > now:
+            self.clock.sleep(event_time - now)
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Ignore a server's report of remaining events and seconds until its
+        rate limit resets."""
+        pass
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events in all processes for some seconds from the
+        current time."""
+        now = current_time or self.clock.time()
+        resume_time = now + seconds
+        with self.locked_state() as state:
+            state.arrival_time = max(state.arrival_time, resume_time + self.tolerance)
+
+    def persist(self):
+        """Ignore a request to persist the throttle's state, which the state
+        file always holds."""
+        pass
+
+    def locked_state(self):
+        """Return a context manager holding the state file under an exclusive
+        lock."""
+        return SharedThrottleState(self.state_path)
+
+
+class SharedThrottleState:
+
+    """Holds a shared throttle's arrival time, read from a state file locked
+    while the context is open and written back when it closes."""
+
+    def __init__(self, state_path):
+        """Initialize with a state file path."""
+        self.state_path = state_path
+        self.arrival_time = 0
+
+    def __enter__(self):
+        """Lock the state file and read the arrival time."""
+        import fcntl
+
+        self.fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o664)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        text = os.read(self.fd, 64).decode("ascii").strip()
+        self.arrival_time = float(text) if text else 0
+        self.initial_arrival_time = self.arrival_time
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write any changed arrival time and unlock the state file."""
+        try:
+            if exc_type is None and self.arrival_time != self.initial_arrival_time:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                os.ftruncate(self.fd, 0)
+                os.write(self.fd, f"{self.arrival_time!r}\n".encode("ascii"))
+        finally:
+            os.close(self.fd)
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,354 @@
+"""Keep known events and photo paths in a SQLite database with indexed tables,
+so runs look up, add, and prune entries with SQL instead of loading the whole
+history."""
+
+from . import dryrun
+from .journal import ReplaceableMapping
+from datetime import datetime
+from pathlib import PurePosixPath
+import logging
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS known_events (
+    meetup_id TEXT PRIMARY KEY,
+    apricot_event_id INTEGER,
+    start_time TEXT NOT NULL,
+    start_timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS known_events_start
+    ON known_events (start_timestamp);
+CREATE TABLE IF NOT EXISTS photo_paths (
+    photo_url TEXT PRIMARY KEY,
+    apricot_path TEXT,
+    last_used REAL
+);
+"""
+
+
+class SqliteStore:
+
+    """Holds a connection to a SQLite database of known events and photo
+    paths. Writes are committed at once, but in a dry run they are never
+    committed."""
+
+    logger = logging.getLogger("SqliteStore")
+
+    def __init__(self, path, dryrun=False):
+        """Initialize with a path to the database file and a dry run flag."""
+        self.path = path
+        self.dryrun = dryrun
+        self.connection = None
+        self.is_new = False
+
+    def open(self):
+        """Open the database, creating its tables if needed. Write ahead
+        logging syncs to disk at checkpoints rather than every commit. A dry
+        run without a database uses an empty database in memory."""
+        self.is_new = not self.path.exists()
+        if self.dryrun and self.is_new:
+            self.connection = sqlite3.connect(":memory:")
+        else:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.add_missing_columns()
+
+    def add_missing_columns(self):
+        """Add the photo last used column to a database made without it."""
+        columns = [row[1] for row in self.execute("PRAGMA table_info(photo_paths)")]
+        if "last_used" not in columns:
+            self.execute("ALTER TABLE photo_paths ADD COLUMN last_used REAL")
+
+    def execute(self, sql, parameters=()):
+        """Execute a SQL statement with parameters. Return a cursor."""
+        return self.connection.execute(sql, parameters)
+
+    @dryrun.method()
+    def commit(self):
+        """Commit changes to the database."""
+        self.connection.commit()
+
+    def migrate(self, event_mapping, photo_paths):
+        """Fill the database from mappings of known events and photo paths,
+        such as those loaded from pickle cache files."""
+        SqliteEventMapping(self).insert_all(event_mapping)
+        SqlitePhotoMapping(self).insert_all(photo_paths)
+        self.commit()
+        self.logger.info(
+            "migrated %d known events and %d photo paths to %s",
+            len(event_mapping),
+            len(photo_paths),
+            self.path,
+        )
+
+    def close(self):
+        """Close the database, discarding uncommitted changes."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class SqliteMapping(ReplaceableMapping):
+
+    """A mapping kept in a table of a SQLite store, committing each change at
+    once. Subclasses name the table, its key column, and its value columns,
+    and convert between values and rows."""
+
+    table = None
+    key_column = None
+    value_columns = ()
+
+    def __init__(self, store):
+        """Initialize with a SQLite store."""
+        self.store = store
+
+    def __getitem__(self, key):
+        row = self.store.execute(
+            f"SELECT {', '.join(self.value_columns)} FROM {self.table} "
+            f"WHERE {self.key_column} = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self.value_from_row(row)
+
+    def __contains__(self, key):
+        row = self.store.execute(
+            f"SELECT 1 FROM {self.table} WHERE {self.key_column} = ?",
+            (key,),
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        cursor = self.store.execute(f"SELECT {self.key_column} FROM {self.table}")
+        return (key for (key,) in cursor.fetchall())
+
+    def __len__(self):
+        return self.store.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __setitem__(self, key, value):
+        self.store.execute(self.insert_sql(), (key,) + self.value_to_row(value))
+        self.store.commit()
+
+    def __delitem__(self, key):
+        cursor = self.store.execute(
+            f"DELETE FROM {self.table} WHERE {self.key_column} = ?",
+            (key,),
+        )
+        if not cursor.rowcount:
+            raise KeyError(key)
+        self.store.commit()
+
+    def insert_all(self, mapping):
+        """Insert the items of another mapping, except any with the key None,
+        in one statement without committing."""
+        rows = [
+            (key,) + self.value_to_row(value)
+            for key, value in mapping.items()
+            if key is not None
+        ]
+        self.store.connection.executemany(self.insert_sql(), rows)
+
+    def insert_sql(self):
+        """Return the SQL statement to insert or replace a row."""
+        columns = (self.key_column,) + self.value_columns
+        placeholders = ", ".join("?" * len(columns))
+        return (
+            f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+            f"VALUES ({placeholders})"
+        )
+
+    def persist(self):
+        """Commit any changes."""
+        self.store.commit()
+
+
+class SqliteEventMapping(SqliteMapping):
+
+    """A mapping of Meetup event IDs to Wild Apricot event details, kept in
+    the known events table of a SQLite store. Given an earliest start time,
+    the mapping holds only events starting then or later, and persisting
+    prunes earlier events from the table."""
+
+    table = "known_events"
+    key_column = "meetup_id"
+    value_columns = ("apricot_event_id", "start_time", "start_timestamp")
+
+    def __init__(self, store, earliest_start_time=None):
+        """Initialize with a SQLite store and an optional earliest start
+        time."""
+        super().__init__(store)
+        self.earliest_timestamp = (
+            earliest_start_time.timestamp() if earliest_start_time else None
+        )
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if not self.is_timely(value):
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        cursor = self.store.execute(
+            "SELECT meetup_id FROM known_events WHERE start_timestamp >= ?",
+            (self.earliest_timestamp or float("-inf"),),
+        )
+        return (meetup_id for (meetup_id,) in cursor.fetchall())
+
+    def __len__(self):
+        return self.store.execute(
+            "SELECT COUNT(*) FROM known_events WHERE start_timestamp >= ?",
+            (self.earliest_timestamp or float("-inf"),),
+        ).fetchone()[0]
+
+    def is_timely(self, value):
+        """Return true if event details have a start time no earlier than
+        the earliest start time; false otherwise."""
+        return (
+            self.earliest_timestamp is None
+            or value["start_time"].timestamp() >= self.earliest_timestamp
+        )
+
+    @staticmethod
+    def value_to_row(value):
+        """Return the row values for Wild Apricot event details."""
+        start_time = value["start_time"]
+        return (
+            value.get("wild_apricot_event"),
+            start_time.isoformat(),
+            start_time.timestamp(),
+        )
+
+    @staticmethod
+    def value_from_row(row):
+        """Return Wild Apricot event details from row values."""
+        apricot_event_id, start_time, _ = row
+        value = {"start_time": datetime.fromisoformat(start_time)}
+        if apricot_event_id is not None:
+            value["wild_apricot_event"] = apricot_event_id
+        return value
+
+    def prune(self):
+        """Delete events starting before the earliest start time."""
+        if self.earliest_timestamp is None:
+            return
+        self.store.execute(
+            "DELETE FROM known_events WHERE start_timestamp < ?",
+            (self.earliest_timestamp,),
+        )
+
+    def persist(self):
+        """Prune outdated events and commit any changes."""
+        self.prune()
+        self.store.commit()
+
+
+class SqlitePhotoMapping(SqliteMapping):
+
+    """A mapping of Meetup photo URLs to Wild Apricot photo paths, kept in
+    the photo paths table of a SQLite store. Events without photos map the
+    URL None to the path None."""
+
+    table = "photo_paths"
+    key_column = "photo_url"
+    value_columns = ("apricot_path",)
+
+    def __getitem__(self, key):
+        if key is None:
+            return None
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        return key is None or super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        if key is not None:
+            super().__setitem__(key, value)
+
+    @staticmethod
+    def value_to_row(value):
+        """Return the row values for a photo path."""
+        return (None if value is None else str(value),)
+
+    @staticmethod
+    def value_from_row(row):
+        """Return a photo path from row values."""
+        apricot_path = row[0]
+        return None if apricot_path is None else PurePosixPath(apricot_path)
+
+
+class SqlitePhotoUsageMapping(SqliteMapping):
+
+    """A mapping of Meetup photo URLs to the times the photos were last used
+    (seconds since the epoch), kept beside the photo paths in the photo paths
+    table of a SQLite store. Only cached photos have last used times."""
+
+    table = "photo_paths"
+    key_column = "photo_url"
+
+    def __getitem__(self, key):
+        row = self.store.execute(
+            "SELECT last_used FROM photo_paths "
+            "WHERE photo_url = ? AND last_used IS NOT NULL",
+            (key,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        cursor = self.store.execute(
+            "SELECT photo_url FROM photo_paths WHERE last_used IS NOT NULL"
+        )
+        return (photo_url for (photo_url,) in cursor.fetchall())
+
+    def __len__(self):
+        return self.store.execute(
+            "SELECT COUNT(*) FROM photo_paths WHERE last_used IS NOT NULL"
+        ).fetchone()[0]
+
+    def __setitem__(self, key, value):
+        self.store.execute(
+            "UPDATE photo_paths SET last_used = ? WHERE photo_url = ?", (value, key)
+        )
+        self.store.commit()
+
+    def __delitem__(self, key):
+        cursor = self.store.execute(
+            "UPDATE photo_paths SET last_used = NULL "
+            "WHERE photo_url = ? AND last_used IS NOT NULL",
+            (key,),
+        )
+        if not cursor.rowcount:
+            raise KeyError(key)
+        self.store.commit()
+
+
+def load_sqlite_store(path, event_mapping_provider, photo_paths_provider, dryrun=False):
+    """Return an open SQLite store at a path. Fill a new store with the known
+    events and photo paths provided by providers, such as from pickle cache
+    files."""
+    store = SqliteStore(path, dryrun=dryrun)
+    store.open()
+    if store.is_new:
+        store.migrate(event_mapping_provider(), photo_paths_provider())
+    return store
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -1,9 +1,13 @@
 """Activity throttles typically used to keep API call rates below allowed
 limits."""
 
-import logging
-import time
+from . import dryrun
+from .clock import SYSTEM_CLOCK
 from collections import deque
+import asyncio
+import logging
+import pickle
+import threading
 
 MIN_UTILIZATION = 0.05
 MAX_UTILIZATION = 0.95
@@ -13,42 +17,237 @@ class Throttle:
 
     """Throttles activity at some rate per some time span."""
 
-    def __init__(self, rate, time_span):
-        """Initialize with a rate (integer number of events) and a time span
-        (seconds)."""
+    def __init__(self, rate, time_span, clock=SYSTEM_CLOCK):
+        """Initialize with a rate (integer number of events), a time span
+        (seconds), and an optional clock."""
+        self.clock = clock
         self.time_span = time_span
         self.rate = rate
         self.ready_times = deque([0] * rate, rate)
 
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready for another
+        event."""
+        return self.ready_times[0]
+
     def is_ready(self, current_time=None):
         """Check whether the throttle is ready for another event at the current
         time."""
-        now = current_time or time.time()
-        return now >= self.ready_times[0]
+        now = current_time or self.clock.time()
+        return now >= self.next_ready_time()
 
     def event(self, current_time=None):
         """Record an event at the current time."""
-        now = current_time or time.time()
+        now = current_time or self.clock.time()
         self.ready_times.append(now + self.time_span)
 
     def wait(self, current_time=None):
         """Wait until the next ready time."""
-        now = current_time or time.time()
+        now = current_time or self.clock.time()
+        while not self.is_ready(now):
+            sleep_time = self.next_ready_time() - now
+            self.clock.sleep(sleep_time)
+            now = self.clock.time()
+
+    def throttle(self, current_time=None):
+        """Throttle an event, waiting until the next ready time."""
+        self.wait(current_time)
+        self.event()
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Ignore a server's report of remaining events and seconds until its
+        rate limit resets."""
+        pass
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events for some seconds from the current time."""
+        now = current_time or self.clock.time()
+        resume_time = now + seconds
+        self.ready_times = deque(
+            (max(ready_time, resume_time) for ready_time in self.ready_times),
+            self.rate,
+        )
+
+    def snapshot(self):
+        """Return the throttle's state for persisting."""
+        return list(self.ready_times)
+
+    def restore(self, state):
+        """Restore a throttle's state, keeping the latest ready times."""
+        self.ready_times.extend(sorted(state))
+
+
+class TokenBucketThrottle:
+
+    """Throttles activity at some rate per some time span, allowing a burst of
+    events, with constant memory regardless of the rate. Implements the
+    generic cell rate algorithm (GCRA), a token bucket that tracks only the
+    theoretical arrival time of the next event. Any time span admits at most
+    rate + burst - 1 events."""
+
+    def __init__(self, rate, time_span, burst=1, clock=SYSTEM_CLOCK):
+        """Initialize with a rate (integer number of events), a time span
+        (seconds), a burst (integer number of events allowed at once), and an
+        optional clock."""
+        self.clock = clock
+        self.time_span = time_span
+        self.rate = rate
+        self.burst = burst
+        self.emission_interval = time_span / rate
+        self.tolerance = (burst - 1) * self.emission_interval
+        self.arrival_time = 0
+
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready for another
+        event."""
+        return self.arrival_time - self.tolerance
+
+    def is_ready(self, current_time=None):
+        """Check whether the throttle is ready for another event at the current
+        time."""
+        now = current_time or self.clock.time()
+        return now >= self.next_ready_time()
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        now = current_time or self.clock.time()
+        self.arrival_time = max(self.arrival_time, now) + self.emission_interval
+
+    def wait(self, current_time=None):
+        """Wait until the next ready time."""
+        now = current_time or self.clock.time()
         while not self.is_ready(now):
-            sleep_time = self.ready_times[0] - now
-            time.sleep(sleep_time)
-            now = time.time()
+            sleep_time = self.next_ready_time() - now
+            self.clock.sleep(sleep_time)
+            now = self.clock.time()
 
     def throttle(self, current_time=None):
         """Throttle an event, waiting until the next ready time."""
         self.wait(current_time)
         self.event()
 
+    def adapt(self, remaining, reset, current_time=None):
+        """Ignore a server's report of remaining events and seconds until its
+        rate limit resets."""
+        pass
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events for some seconds from the current time."""
+        now = current_time or self.clock.time()
+        resume_time = now + seconds
+        self.arrival_time = max(self.arrival_time, resume_time + self.tolerance)
+
+    def snapshot(self):
+        """Return the throttle's state for persisting."""
+        return self.arrival_time
+
+    def restore(self, state):
+        """Restore a throttle's state, keeping the later arrival time."""
+        self.arrival_time = max(self.arrival_time, state)
+
+
+class AdaptiveThrottle(TokenBucketThrottle):
 
-def make_throttle(rate, time_span, utilization_factor, purpose):
+    """Throttles activity by spreading the events a server reports remaining
+    evenly over the time until the server's rate limit resets. Holds a reserve
+    of events unused to allow for requests in flight."""
+
+    def __init__(self, rate, time_span, reserve=1, clock=SYSTEM_CLOCK):
+        """Initialize with an initial rate (integer number of events), a time
+        span (seconds), a reserve (integer number of events), and an optional
+        clock."""
+        super().__init__(rate, time_span, clock=clock)
+        self.reserve = reserve
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Adapt to a server's report of remaining events and seconds until its
+        rate limit resets. Never moves the next arrival time earlier, keeping
+        any pause and any events already recorded."""
+        now = current_time or self.clock.time()
+        usable = remaining - self.reserve
+        if usable > 0:
+            self.emission_interval = reset / usable
+            self.arrival_time = max(self.arrival_time, now + self.emission_interval)
+        else:
+            self.arrival_time = max(self.arrival_time, now + reset)
+
+
+class CompositeThrottle:
+
+    """Throttles activity to satisfy several throttles at once, typically
+    enforcing limits over several time spans."""
+
+    def __init__(self, throttles, clock=SYSTEM_CLOCK):
+        """Initialize with a list of throttles and an optional clock."""
+        self.throttles = throttles
+        self.clock = clock
+
+    def next_ready_time(self):
+        """Return the earliest time all throttles will be ready for another
+        event."""
+        return max(throttle.next_ready_time() for throttle in self.throttles)
+
+    def is_ready(self, current_time=None):
+        """Check whether all throttles are ready for another event at the
+        current time."""
+        now = current_time or self.clock.time()
+        return all(throttle.is_ready(now) for throttle in self.throttles)
+
+    def event(self, current_time=None):
+        """Record an event at the current time with all throttles."""
+        now = current_time or self.clock.time()
+        for throttle in self.throttles:
+            throttle.event(now)
+
+    def wait(self, current_time=None):
+        """Wait until the next time all throttles are ready."""
+        now = current_time or self.clock.time()
+        while not self.is_ready(now):
+            sleep_time = self.next_ready_time() - now
+            self.clock.sleep(sleep_time)
+            now = self.clock.time()
+
+    def throttle(self, current_time=None):
+        """Throttle an event, waiting until the next time all throttles are
+        ready."""
+        self.wait(current_time)
+        self.event()
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Pass a server's report of remaining events and seconds until its
+        rate limit resets to all throttles."""
+        for throttle in self.throttles:
+            throttle.adapt(remaining, reset, current_time)
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events with all throttles for some seconds from the
+        current time."""
+        now = current_time or self.clock.time()
+        for throttle in self.throttles:
+            throttle.pause(seconds, now)
+
+    def snapshot(self):
+        """Return the throttles' states for persisting."""
+        return [throttle.snapshot() for throttle in self.throttles]
+
+    def restore(self, state):
+        """Restore the throttles' states."""
+        for throttle, throttle_state in zip(self.throttles, state):
+            throttle.restore(throttle_state)
+
+
+def make_throttle(
+    rate,
+    time_span,
+    utilization_factor,
+    purpose,
+    throttle_class=Throttle,
+    clock=SYSTEM_CLOCK,
+):
     """Return a new throttle given a rate (integer number of events), a time
-    span (seconds), a utilization factor (number between 0.05 and 0.95), and a
-    purpose (for logging)."""
+    span (seconds), a utilization factor (number between 0.05 and 0.95), a
+    purpose (for logging), an optional throttle class, and an optional
+    clock."""
     logger = logging.getLogger("make_throttle")
     if not (MIN_UTILIZATION <= utilization_factor <= MAX_UTILIZATION):
         logger.warning(
@@ -66,16 +265,291 @@ def make_throttle(rate, time_span, utilization_factor, purpose):
         )
     allocated_rate = round(rate * utilization_factor)
     logger.debug("purpose=%r rate=%d time_span=%d", purpose, allocated_rate, time_span)
-    return Throttle(allocated_rate, time_span)
+    return throttle_class(allocated_rate, time_span, clock=clock)
+
+
+def make_composite_throttle(
+    limits,
+    utilization_factor,
+    purpose,
+    throttle_class=Throttle,
+    clock=SYSTEM_CLOCK,
+):
+    """Return a new composite throttle enforcing a list of (rate, time span)
+    limits, each made like make_throttle makes a throttle, given a utilization
+    factor, a purpose (for logging), an optional throttle class, and an
+    optional clock."""
+    return CompositeThrottle(
+        [
+            make_throttle(
+                rate, time_span, utilization_factor, purpose, throttle_class, clock
+            )
+            for rate, time_span in limits
+        ],
+        clock,
+    )
+
+
+class PersistentThrottle:
+
+    """Wraps a throttle whose state persists between runs, so a run started
+    soon after another counts the earlier run's events against its rate."""
+
+    logger = logging.getLogger("PersistentThrottle")
+
+    def __init__(self, throttle, cache_path, dryrun=False):
+        """Initialize with a throttle to wrap, a path to the cache file, and a
+        dry run flag."""
+        self.wrapped_throttle = throttle
+        self.cache_path = cache_path
+        self.dryrun = dryrun
+
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready for another
+        event."""
+        return self.wrapped_throttle.next_ready_time()
+
+    def is_ready(self, current_time=None):
+        """Check whether the throttle is ready for another event at the current
+        time."""
+        return self.wrapped_throttle.is_ready(current_time)
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        self.wrapped_throttle.event(current_time)
+
+    def throttle(self, current_time=None):
+        """Throttle an event, waiting until the next ready time."""
+        self.wrapped_throttle.throttle(current_time)
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Adapt to a server's report of remaining events and seconds until its
+        rate limit resets."""
+        self.wrapped_throttle.adapt(remaining, reset, current_time)
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events for some seconds from the current time."""
+        self.wrapped_throttle.pause(seconds, current_time)
+
+    def load(self):
+        """Restore the wrapped throttle's state from the cache file, if any."""
+        if not self.cache_path.exists():
+            return
+        try:
+            with self.cache_path.open("rb") as f:
+                self.wrapped_throttle.restore(pickle.load(f))
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError) as err:
+            self.logger.warning("Cannot load throttle state: %s", err)
+
+    @dryrun.method()
+    def persist(self):
+        """Persist the wrapped throttle's state to the cache file."""
+        with self.cache_path.open("wb") as f:
+            pickle.dump(self.wrapped_throttle.snapshot(), f)
+
+
+def make_persistent_throttle(throttle, cache_path, dryrun=False):
+    """Make a persistent throttle wrapping a throttle restored from a cache
+    file at a path, with a dry run flag."""
+    persistent_throttle = PersistentThrottle(throttle, cache_path, dryrun)
+    persistent_throttle.load()
+    return persistent_throttle
+
+
+class LazyThrottle:
+
+    """Wraps a throttle that is costly to make, such as one configured by an
+    API status request. Lets the first event through at once, as any new
+    throttle would, and makes the wrapped throttle only when a later event or
+    a pause needs it. Ignores adapting before then, as the wrapped throttle
+    starts from current limits."""
+
+    def __init__(self, throttle_provider):
+        """Initialize with a function that provides the throttle to wrap."""
+        self.throttle_provider = throttle_provider
+        self.wrapped_throttle = None
+        self.first_event_passed = False
+
+    def get_throttle(self):
+        """Return the wrapped throttle, making it if needed."""
+        if self.wrapped_throttle is None:
+            self.wrapped_throttle = self.throttle_provider()
+        return self.wrapped_throttle
+
+    def is_idle(self):
+        """Check whether no event has passed and no throttle is made yet."""
+        return self.wrapped_throttle is None and not self.first_event_passed
+
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready for another
+        event."""
+        if self.is_idle():
+            return 0
+        return self.get_throttle().next_ready_time()
+
+    def is_ready(self, current_time=None):
+        """Check whether the throttle is ready for another event at the current
+        time."""
+        if self.is_idle():
+            return True
+        return self.get_throttle().is_ready(current_time)
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        if self.is_idle():
+            self.first_event_passed = True
+            return
+        self.get_throttle().event(current_time)
+
+    def throttle(self, current_time=None):
+        """Throttle an event, waiting until the next ready time."""
+        if self.is_idle():
+            self.first_event_passed = True
+            return
+        self.get_throttle().throttle(current_time)
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Adapt to a server's report of remaining events and seconds until its
+        rate limit resets, if the wrapped throttle is made."""
+        if self.wrapped_throttle is not None:
+            self.wrapped_throttle.adapt(remaining, reset, current_time)
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events for some seconds from the current time."""
+        self.get_throttle().pause(seconds, current_time)
+
+
+class ThreadSafeThrottle:
+
+    """Wraps a throttle to be shared by many threads. Threads wait their turn
+    while another thread waits for the wrapped throttle."""
+
+    def __init__(self, throttle):
+        """Initialize with a throttle to wrap."""
+        self.wrapped_throttle = throttle
+        self.lock = threading.Lock()
+
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready for another
+        event."""
+        with self.lock:
+            return self.wrapped_throttle.next_ready_time()
+
+    def is_ready(self, current_time=None):
+        """Check whether the throttle is ready for another event at the current
+        time."""
+        with self.lock:
+            return self.wrapped_throttle.is_ready(current_time)
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        with self.lock:
+            self.wrapped_throttle.event(current_time)
+
+    def throttle(self, current_time=None):
+        """Throttle an event, waiting until the next ready time."""
+        with self.lock:
+            self.wrapped_throttle.throttle(current_time)
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Adapt to a server's report of remaining events and seconds until its
+        rate limit resets."""
+        with self.lock:
+            self.wrapped_throttle.adapt(remaining, reset, current_time)
+
+    def pause(self, seconds, current_time=None):
+        """Hold off all events for some seconds from the current time."""
+        with self.lock:
+            self.wrapped_throttle.pause(seconds, current_time)
+
+
+class AsyncThrottle:
+
+    """Wraps a throttle to be shared by many asyncio tasks. Tasks await the
+    next ready time instead of sleeping. A throttle that reserves event times,
+    such as a shared throttle, locks a file to do so, so it is called in a
+    worker thread."""
+
+    def __init__(self, throttle, clock=SYSTEM_CLOCK):
+        """Initialize with a throttle to wrap and an optional clock."""
+        self.wrapped_throttle = throttle
+        self.clock = clock
+        self.reserves = hasattr(throttle, "reserve")
+
+    def is_ready(self, current_time=None):
+        """Check whether the throttle is ready for another event at the current
+        time."""
+        return self.wrapped_throttle.is_ready(current_time)
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        self.wrapped_throttle.event(current_time)
+
+    async def wait(self):
+        """Wait until the next ready time."""
+        while not self.wrapped_throttle.is_ready():
+            sleep_time = self.wrapped_throttle.next_ready_time() - self.clock.time()
+            await asyncio.sleep(sleep_time)
+
+    async def throttle(self):
+        """Throttle an event, reserving the next event time and waiting until
+        then, or waiting until the next ready time and recording the event. No
+        other task runs between the final readiness check and recording the
+        event."""
+        if self.reserves:
+            event_time = await asyncio.to_thread(self.wrapped_throttle.reserve)
+            sleep_time = event_time - self.clock.time()
+            if sleep_time > 0:
+                await asyncio.sleep(sleep_time)
+            return
+        await self.wait()
+        self.wrapped_throttle.event()
+
+    def adapt(self, remaining, reset, current_time=None):
+        """Adapt to a server's report of remaining events and seconds until its
+        rate limit resets."""
+        self.wrapped_throttle.adapt(remaining, reset, current_time)
+
+    async def pause(self, seconds, current_time=None):
+        """Hold off all events for some seconds from the current time."""
+        if self.reserves:
+            await asyncio.to_thread(self.wrapped_throttle.pause, seconds, current_time)
+            return
+        self.wrapped_throttle.pause(seconds, current_time)
 
 
 class OpenThrottle:
 
     """Allows work to proceed at full speed: an open throttle."""
 
+    def next_ready_time(self):
+        """Return the earliest time the throttle will be ready: always."""
+        return 0
+
+    def is_ready(self, current_time=None):
+        """Report that the throttle is always ready."""
+        return True
+
+    def event(self, current_time=None):
+        """Ignore an event."""
+        pass
+
     def throttle(self, current_time=None):
         """Pretend to throttle an event. Proceed without slowing."""
         pass
 
+    def adapt(self, remaining, reset, current_time=None):
+        """Ignore a server's report of remaining events and seconds until its
+        rate limit resets."""
+        pass
+
+    def pause(self, seconds, current_time=None):
+        """Ignore a request to hold off events."""
+        pass
+
+    def persist(self):
+        """Ignore a request to persist the throttle's state."""
+        pass
+
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
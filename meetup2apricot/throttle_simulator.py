@@ -0,0 +1,308 @@
+"""Simulate throttled API calls on a virtual clock to estimate how long a
+sync will take without waiting for it."""
+
+from .clock import VirtualClock
+from .shared_throttle import SharedThrottle
+from .throttle import (
+    AdaptiveThrottle,
+    OpenThrottle,
+    Throttle,
+    TokenBucketThrottle,
+    make_composite_throttle,
+    make_throttle,
+)
+from collections import namedtuple
+from functools import partial
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import tempfile
+
+SimulatedCall = namedtuple("SimulatedCall", "name throttle_name")
+
+APRICOT = "apricot"
+PHOTO = "photo"
+
+APRICOT_PURPOSE = "simulated Wild Apricot API"
+STATE_FILE_NAME = "apricot.throttle"
+UTILIZATION_FACTOR = 0.91
+
+THROTTLE_KINDS = ["sliding-window", "token-bucket", "composite", "adaptive", "shared"]
+
+
+class SimulationReport:
+
+    """Summarizes a simulation: total time, waits, and throttle
+    utilization."""
+
+    def __init__(self, total_time, waits, calls_by_throttle, throttles):
+        """Initialize with the total time (seconds), a list of waits (seconds),
+        a dictionary counting calls by throttle name, and a dictionary of
+        throttles by name."""
+        self.total_time = total_time
+        self.waits = waits
+        self.calls_by_throttle = calls_by_throttle
+        self.throttles = throttles
+
+    @property
+    def call_count(self):
+        """Return the number of calls simulated."""
+        return len(self.waits)
+
+    def wait_percentile(self, percent):
+        """Return the wait (seconds) at or below which some percent of waits
+        fall."""
+        sorted_waits = sorted(self.waits)
+        index = min(len(sorted_waits) - 1, int(len(sorted_waits) * percent / 100))
+        return sorted_waits[index]
+
+    def utilization(self, throttle_name):
+        """Return the fraction of a throttle's allowed rate used during the
+        simulation or None if the throttle has no rate."""
+        allowed_rate = throttle_rate(self.throttles[throttle_name])
+        if not allowed_rate or not self.total_time:
+            return None
+        achieved_rate = self.calls_by_throttle[throttle_name] / self.total_time
+        return achieved_rate / allowed_rate
+
+    def report(self, output):
+        """Report the simulation summary to an output stream. Report waits only
+        if any calls were simulated."""
+        output.write(f"calls: {self.call_count:d}\n")
+        output.write(f"total time: {self.total_time:,.1f} seconds\n")
+        if self.waits:
+            self.report_waits(output)
+        for throttle_name in sorted(self.throttles):
+            utilization = self.utilization(throttle_name)
+            if utilization is not None:
+                output.write(f"{throttle_name} utilization: {utilization:.1%}\n")
+
+    def report_waits(self, output):
+        """Report statistics of the waits to an output stream."""
+        output.write(
+            f"total wait: {sum(self.waits):,.1f} seconds"
+            f"   mean {statistics.mean(self.waits):.3f}"
+            f"   median {statistics.median(self.waits):.3f}"
+            f"   p90 {self.wait_percentile(90):.3f}"
+            f"   p99 {self.wait_percentile(99):.3f}"
+            f"   max {max(self.waits):.3f}\n"
+        )
+
+
+class ServerRateLimit:
+
+    """Counts calls in fixed windows like a server enforcing a rate limit,
+    reporting the calls remaining and the seconds until the window resets."""
+
+    def __init__(self, rate, time_span, clock):
+        """Initialize with a rate (integer number of calls), a time span
+        (seconds), and a clock."""
+        self.rate = rate
+        self.time_span = time_span
+        self.clock = clock
+        self.window_start = clock.time()
+        self.calls = 0
+
+    def call(self):
+        """Count a call. Return the calls remaining in the window and the
+        seconds until it resets."""
+        now = self.clock.time()
+        if now >= self.window_start + self.time_span:
+            self.window_start = now
+            self.calls = 0
+        self.calls += 1
+        return self.rate - self.calls, self.window_start + self.time_span - now
+
+
+class ThrottleSimulator:
+
+    """Drives throttles with a stream of calls on a virtual clock."""
+
+    def __init__(self, clock, throttles, latencies, server_rate_limits=None):
+        """Initialize with a virtual clock, a dictionary of throttles by name,
+        a dictionary of call latencies (seconds) by throttle name, and an
+        optional dictionary of server rate limits by throttle name, which
+        report to their throttles after each call."""
+        self.clock = clock
+        self.throttles = throttles
+        self.latencies = latencies
+        self.server_rate_limits = server_rate_limits or {}
+
+    def run(self, calls):
+        """Simulate a sequence of calls. Return a simulation report."""
+        start_time = self.clock.time()
+        waits = []
+        calls_by_throttle = {name: 0 for name in self.throttles}
+        for call in calls:
+            throttle = self.throttles[call.throttle_name]
+            before_throttle = self.clock.time()
+            throttle.throttle()
+            waits.append(self.clock.time() - before_throttle)
+            calls_by_throttle[call.throttle_name] += 1
+            server_rate_limit = self.server_rate_limits.get(call.throttle_name)
+            self.clock.sleep(self.latencies.get(call.throttle_name, 0))
+            if server_rate_limit:
+                throttle.adapt(*server_rate_limit.call())
+        total_time = self.clock.time() - start_time
+        return SimulationReport(total_time, waits, calls_by_throttle, self.throttles)
+
+
+def event_processor_calls(event_count):
+    """Yield the calls an event processor makes for a number of new events:
+    a photo upload, an event, and two registration types per event."""
+    for _ in range(event_count):
+        yield SimulatedCall("upload_photo", PHOTO)
+        yield SimulatedCall("add_event", APRICOT)
+        yield SimulatedCall("add_registration_type", APRICOT)
+        yield SimulatedCall("add_registration_type", APRICOT)
+
+
+def throttle_rate(throttle):
+    """Return a throttle's allowed rate (events per second) or None if it has
+    no limit. A composite throttle allows its slowest rate."""
+    if hasattr(throttle, "throttles"):
+        return min(throttle_rate(member) for member in throttle.throttles)
+    if hasattr(throttle, "rate"):
+        return throttle.rate / throttle.time_span
+    return None
+
+
+def make_apricot_throttle(
+    kind, rate, time_span, burst, utilization_factor, clock, state_path=None
+):
+    """Make a Wild Apricot throttle of a kind (sliding-window, token-bucket,
+    composite, adaptive, or shared) as the application makes throttles, using
+    a utilization factor of a limit of events per time span, with a burst for
+    token buckets and shared throttles, on a clock. A composite throttle adds
+    a limit of burst events per second to a sliding window. A shared throttle
+    keeps its state in a state file at a path."""
+    if kind == "composite":
+        return make_composite_throttle(
+            [(rate, time_span), (burst, 1)],
+            utilization_factor,
+            APRICOT_PURPOSE,
+            clock=clock,
+        )
+    return make_throttle(
+        rate,
+        time_span,
+        utilization_factor,
+        APRICOT_PURPOSE,
+        throttle_class=apricot_throttle_class(kind, burst, state_path),
+        clock=clock,
+    )
+
+
+def apricot_throttle_class(kind, burst, state_path):
+    """Return the class, with any burst or state file path, of a Wild Apricot
+    throttle of a kind that limits a single time span."""
+    if kind == "token-bucket":
+        return partial(TokenBucketThrottle, burst=burst)
+    if kind == "adaptive":
+        return AdaptiveThrottle
+    if kind == "shared":
+        return partial(SharedThrottle, state_path, burst=burst)
+    return Throttle
+
+
+def simulate(
+    event_count,
+    kind,
+    rate,
+    time_span,
+    burst,
+    apricot_latency,
+    photo_latency,
+    utilization_factor=UTILIZATION_FACTOR,
+):
+    """Simulate processing some events with a Wild Apricot throttle of a kind,
+    rate, time span, burst, and utilization factor, given Wild Apricot and
+    photo upload latencies (seconds). An adaptive throttle adapts to a
+    simulated server enforcing the full rate. Return a simulation report."""
+    clock = VirtualClock()
+    with tempfile.TemporaryDirectory() as state_directory:
+        apricot_throttle = make_apricot_throttle(
+            kind,
+            rate,
+            time_span,
+            burst,
+            utilization_factor,
+            clock,
+            state_path=Path(state_directory) / STATE_FILE_NAME,
+        )
+        throttles = {APRICOT: apricot_throttle, PHOTO: OpenThrottle()}
+        latencies = {APRICOT: apricot_latency, PHOTO: photo_latency}
+        server_rate_limits = {}
+        if kind == "adaptive":
+            server_rate_limits[APRICOT] = ServerRateLimit(rate, time_span, clock)
+        simulator = ThrottleSimulator(clock, throttles, latencies, server_rate_limits)
+        return simulator.run(event_processor_calls(event_count))
+
+
+parser = argparse.ArgumentParser(
+    description="Estimate sync time for Meetup events under throttling"
+)
+parser.add_argument("-e", "--events", type=int, default=50, help="Number of new events")
+parser.add_argument(
+    "-k",
+    "--kind",
+    choices=THROTTLE_KINDS,
+    default="token-bucket",
+    help="Kind of Wild Apricot throttle (default: %(default)s)",
+)
+parser.add_argument(
+    "-r",
+    "--rate",
+    type=int,
+    default=100,
+    help="Wild Apricot requests allowed per time span (default: %(default)s)",
+)
+parser.add_argument(
+    "-u",
+    "--utilization",
+    type=float,
+    default=UTILIZATION_FACTOR,
+    help="Fraction of the allowed rate to use (default: %(default)s)",
+)
+parser.add_argument(
+    "-s", "--time-span", type=float, default=60, help="Time span (seconds)"
+)
+parser.add_argument(
+    "-b", "--burst", type=int, default=10, help="Token bucket burst size"
+)
+parser.add_argument(
+    "--apricot-latency",
+    type=float,
+    default=0.3,
+    help="Wild Apricot request latency (seconds)",
+)
+parser.add_argument(
+    "--photo-latency",
+    type=float,
+    default=1.0,
+    help="Photo upload latency (seconds)",
+)
+
+
+def main(args=None, output=None):
+    """Simulate a sync described by command line arguments and report to an
+    output stream."""
+    options = parser.parse_args(args)
+    report = simulate(
+        options.events,
+        options.kind,
+        options.rate,
+        options.time_span,
+        options.burst,
+        options.apricot_latency,
+        options.photo_latency,
+        options.utilization,
+    )
+    report.report(output or sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
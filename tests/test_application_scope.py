@@ -0,0 +1,44 @@
+"""Test the application scope."""
+
+from meetup2apricot.application_scope import ApplicationScope
+from meetup2apricot.command_line import parse_args
+from pathlib import Path
+
+ENV_VARS = {
+    "EVENT_CACHE_FILE": "/var/cache/m2a/events.pickle",
+    "PHOTO_CACHE_FILE": "/var/cache/m2a/photos.pickle",
+    "PHOTO_DIRECTORY": "/var/cache/m2a/photos",
+}
+
+
+def test_meetup_events_wanted():
+    """Test reading the number of Meetup events wanted as a number."""
+    scope = ApplicationScope(args=None, env_vars={"MEETUP_EVENTS_WANTED": "500"})
+    assert scope.meetup_events_wanted == 500
+
+
+def test_state_paths():
+    """Test that a run keeps its files at the configured paths."""
+    scope = ApplicationScope(parse_args(["--database", "/var/m2a.db"]), ENV_VARS)
+    assert scope.event_cache_file == Path("/var/cache/m2a/events.pickle")
+    assert scope.photo_directory == Path("/var/cache/m2a/photos")
+    assert scope.database == Path("/var/m2a.db")
+
+
+def test_state_paths_replay(tmp_path):
+    """Test that a replayed run keeps its files beside the cassette."""
+    cassette = tmp_path / "run.jsonl.gz"
+    args = parse_args(
+        ["--replay-cassette", str(cassette), "--apricot-throttle-file", "/var/t"]
+    )
+    scope = ApplicationScope(args, ENV_VARS)
+    replay_directory = tmp_path / "run.jsonl.gz.replay"
+    assert scope.event_cache_file == replay_directory / "events.pickle"
+    assert scope.dead_event_cache_file == replay_directory / "dead_events.pickle"
+    assert scope.photo_cache_file == replay_directory / "photos.pickle"
+    assert scope.photo_directory == replay_directory / "photos"
+    assert scope.apricot_throttle_file == replay_directory / "t"
+    assert replay_directory.is_dir()
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
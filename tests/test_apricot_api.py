@@ -1,8 +1,10 @@
 """Test generating the Wild Apricot API."""
 
 from meetup2apricot.apricot_api import ApricotApi
+from meetup2apricot.clock import VirtualClock
 from meetup2apricot.http_response_error import ApricotApiError
-from meetup2apricot.throttle import Throttle
+from meetup2apricot.retrier import Retrier
+from meetup2apricot.throttle import OpenThrottle, Throttle
 from .sample_apricot_json import EXPECTED_FREE_EVENT_JSON
 from requests_toolbelt.utils import dump
 import json
@@ -39,6 +41,13 @@ def save_response(response, path):
         print(data.decode("utf-8"), file=f)
 
 
+def test_api_url():
+    """Test replacing the Wild Apricot API base URL."""
+    apricot_api = ApricotApi("1234", None, None, api_url="http://localhost/a")
+    assert apricot_api.api_base_url == "http://localhost/a/v2.2"
+    assert ApricotApi.api_base_url == "https://api.wildapricot.org/v2.2"
+
+
 def test_bad_status(apricot_api):
     """Test raising a Wild Apricot API error for a bad HTTP response status."""
     bad_about_url = ApricotApi.api_url + "/x"
@@ -140,6 +149,26 @@ def test_get_membership_levels(mocker):
     apricot_api.get_json.assert_called_once_with(expected_url)
 
 
+def test_post_retry(mocker):
+    """Test retrying a rate limited post."""
+    limited_response = mocker.Mock()
+    limited_response.status_code = 429
+    limited_response.headers = {"Retry-After": "3"}
+    ok_response = mocker.Mock()
+    ok_response.status_code = 200
+    ok_response.content = "4567"
+    mock_session = mocker.Mock()
+    mock_session.post = mocker.Mock(side_effect=[limited_response, ok_response])
+    apricot_api = ApricotApi(
+        "123",
+        mock_session,
+        OpenThrottle(),
+        retrier=Retrier(retry_budget=5, clock=VirtualClock()),
+    )
+    assert apricot_api.add_event({}) == 4567
+    assert mock_session.post.call_count == 2
+
+
 # These tests check that dry runs return values.
 
 
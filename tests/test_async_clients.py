@@ -0,0 +1,225 @@
+"""Test the asyncio web clients."""
+
+from meetup2apricot.async_clients import (
+    AsyncApricotApi,
+    AsyncMeetupApi,
+    AsyncPhotoRetriever,
+    AsyncPhotoUploader,
+    AsyncRetrier,
+    run_with_workers,
+)
+from meetup2apricot.http_response_error import ApricotApiError
+from meetup2apricot.retrier import Retrier
+from meetup2apricot.throttle import AsyncThrottle, OpenThrottle
+import asyncio
+import threading
+import pytest
+import requests
+
+SAMPLE_EVENT_JSON = {"id": "1234", "name": "Test"}
+
+
+@pytest.fixture()
+def make_response(mocker):
+    """Return a function that makes mock responses with a status code, some
+    headers, and content."""
+
+    def make(status_code, headers={}, content=b""):
+        response = mocker.Mock()
+        response.status_code = status_code
+        response.headers = headers
+        response.content = content
+        response.request.method = "GET"
+        return response
+
+    return make
+
+
+@pytest.fixture()
+def async_throttle(mocker):
+    """Return an asyncio throttle wrapping a spied open throttle."""
+    throttle = OpenThrottle()
+    mocker.spy(throttle, "event")
+    mocker.spy(throttle, "pause")
+    return AsyncThrottle(throttle)
+
+
+@pytest.fixture()
+def async_retrier():
+    """Return an asyncio retrier with a small retry budget."""
+    return AsyncRetrier(Retrier(retry_budget=2))
+
+
+def test_async_retrier_ok(async_retrier, async_throttle, make_response, mocker):
+    """Test an asyncio request that succeeds on the first attempt."""
+    ok_response = make_response(200)
+    send = mocker.Mock(return_value=ok_response)
+    response = asyncio.run(async_retrier.request(async_throttle, send, "url", a=1))
+    assert response is ok_response
+    send.assert_called_once_with("url", a=1)
+    assert async_throttle.wrapped_throttle.event.call_count == 1
+
+
+def test_async_retrier_retry(async_retrier, async_throttle, make_response, mocker):
+    """Test an asyncio request retried after a rate limited response, spending
+    the shared retry budget."""
+    limited_response = make_response(429, {"Retry-After": "0"})
+    ok_response = make_response(200)
+    send = mocker.Mock(side_effect=[limited_response, ok_response])
+    response = asyncio.run(async_retrier.request(async_throttle, send))
+    assert response is ok_response
+    assert send.call_count == 2
+    assert async_throttle.wrapped_throttle.event.call_count == 2
+    assert async_throttle.wrapped_throttle.pause.call_count == 1
+    assert async_retrier.retrier.retries_left == 1
+
+
+def test_async_retrier_connection_error(
+    async_retrier, async_throttle, make_response, mocker
+):
+    """Test an asyncio request retried after a connection error and a rate
+    limited response, which is closed."""
+    connection_error = requests.ConnectionError(request=requests.Request("GET", "url"))
+    limited_response = make_response(429, {"Retry-After": "0"})
+    ok_response = make_response(200)
+    send = mocker.Mock(side_effect=[connection_error, limited_response, ok_response])
+    async_retrier.retrier.base_delay = 0
+    response = asyncio.run(async_retrier.request(async_throttle, send))
+    assert response is ok_response
+    assert send.call_count == 3
+    limited_response.close.assert_called_once_with()
+    assert async_retrier.retrier.retries_left == 0
+
+
+def test_async_retrier_sends_in_worker_thread(
+    async_retrier, async_throttle, make_response
+):
+    """Test that an asyncio request sends from a worker thread."""
+    threads = []
+
+    def send():
+        threads.append(threading.current_thread())
+        return make_response(200)
+
+    asyncio.run(async_retrier.request(async_throttle, send))
+    assert threads[0] is not threading.main_thread()
+
+
+def test_async_meetup_api(async_retrier, async_throttle, make_response, mocker):
+    """Test retrieving a Meetup event with an asyncio Meetup API."""
+    meetup_api = mocker.Mock()
+    meetup_api.group_url_name = "NOVA-Makers"
+    meetup_api.build_url = mocker.Mock(return_value="event_url")
+    meetup_api.event_params = mocker.Mock(return_value={"fields": "x"})
+    response = make_response(200)
+    meetup_api.session.get = mocker.Mock(return_value=response)
+    meetup_api.event_json_from_response = mocker.Mock(return_value=SAMPLE_EVENT_JSON)
+    async_meetup_api = AsyncMeetupApi(meetup_api, async_throttle, async_retrier)
+    event_json = asyncio.run(async_meetup_api.retrieve_event_json("1234"))
+    assert event_json == SAMPLE_EVENT_JSON
+    meetup_api.build_url.assert_called_once_with("NOVA-Makers", "events", "1234")
+    meetup_api.session.get.assert_called_once_with("event_url", params={"fields": "x"})
+    meetup_api.event_json_from_response.assert_called_once_with(response)
+
+
+@pytest.fixture()
+def mock_apricot_api(mocker):
+    """Return a mock Wild Apricot API."""
+    apricot_api = mocker.Mock()
+    apricot_api.account_url = lambda *segments: "/".join(("account",) + segments)
+    return apricot_api
+
+
+def test_async_apricot_api_add_event(
+    mock_apricot_api, async_retrier, async_throttle, make_response, mocker
+):
+    """Test adding an event with an asyncio Wild Apricot API."""
+    mock_apricot_api.session.post = mocker.Mock(
+        return_value=make_response(200, content=b"4321")
+    )
+    async_apricot_api = AsyncApricotApi(mock_apricot_api, async_throttle, async_retrier)
+    assert asyncio.run(async_apricot_api.add_event({"Name": "Test"})) == 4321
+    mock_apricot_api.session.post.assert_called_once_with(
+        "account/events", json={"Name": "Test"}, data={}
+    )
+
+
+def test_async_apricot_api_add_registration_type(
+    mock_apricot_api, async_retrier, async_throttle, make_response, mocker
+):
+    """Test adding a registration type with an asyncio Wild Apricot API."""
+    mock_apricot_api.session.post = mocker.Mock(
+        return_value=make_response(200, content=b"8765")
+    )
+    async_apricot_api = AsyncApricotApi(mock_apricot_api, async_throttle, async_retrier)
+    reg_type = {"Name": "RSVP"}
+    assert asyncio.run(async_apricot_api.add_registration_type(reg_type)) == 8765
+    mock_apricot_api.session.post.assert_called_once_with(
+        "account/EventRegistrationTypes", json=reg_type, data={}
+    )
+
+
+def test_async_apricot_api_error(
+    mock_apricot_api, async_retrier, async_throttle, make_response, mocker
+):
+    """Test a failed post with an asyncio Wild Apricot API."""
+    mock_apricot_api.session.post = mocker.Mock(return_value=make_response(400))
+    mocker.patch.object(
+        ApricotApiError,
+        "check_response_status",
+        side_effect=ApricotApiError("HTTP status is 400, not ok"),
+    )
+    async_apricot_api = AsyncApricotApi(mock_apricot_api, async_throttle, async_retrier)
+    with pytest.raises(ApricotApiError):
+        asyncio.run(async_apricot_api.add_event({"Name": "Test"}))
+
+
+def test_async_apricot_api_dryrun(
+    mock_apricot_api, async_retrier, async_throttle, mocker
+):
+    """Test adding an event and a registration type in dry run mode."""
+    async_apricot_api = AsyncApricotApi(
+        mock_apricot_api, async_throttle, async_retrier, dryrun=True
+    )
+    assert asyncio.run(async_apricot_api.add_event({"Name": "Test"})) == 12345
+    assert asyncio.run(async_apricot_api.add_registration_type({})) == 98765
+    mock_apricot_api.session.post.assert_not_called()
+
+
+def test_async_photo_retriever(mocker):
+    """Test getting a photo with an asyncio photo retriever."""
+    photo_retriever = mocker.Mock()
+    photo_retriever.get = mocker.Mock(return_value="photo_1.jpg")
+    async_photo_retriever = AsyncPhotoRetriever(photo_retriever)
+    assert asyncio.run(async_photo_retriever.get("url", "photo.jpg")) == "photo_1.jpg"
+    photo_retriever.get.assert_called_once_with("url", "photo.jpg")
+
+
+def test_async_photo_uploader(mocker):
+    """Test uploading a photo with an asyncio photo uploader."""
+    photo_uploader = mocker.Mock()
+    photo_uploader.upload_photo = mocker.Mock(return_value="/photos/photo.jpg")
+    async_photo_uploader = AsyncPhotoUploader(photo_uploader)
+    assert (
+        asyncio.run(async_photo_uploader.upload_photo("photo.jpg"))
+        == "/photos/photo.jpg"
+    )
+    photo_uploader.upload_photo.assert_called_once_with("photo.jpg")
+
+
+def test_run_with_workers():
+    """Test running a coroutine with a limited number of worker threads."""
+    thread_names = set()
+
+    def work():
+        thread_names.add(threading.current_thread().name)
+
+    async def run_all():
+        await asyncio.gather(*(asyncio.to_thread(work) for _ in range(20)))
+        return "done"
+
+    assert run_with_workers(run_all(), max_workers=2) == "done"
+    assert 1 <= len(thread_names) <= 2
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,409 @@
+"""Test processing Meetup events concurrently under asyncio."""
+
+from meetup2apricot.async_processing import (
+    AsyncEventProcessor,
+    AsyncMeetup2Apricot,
+    AsyncMeetupEventRetriever,
+    AsyncPhotoCache,
+)
+from meetup2apricot.event_processor import EventProcessor
+from meetup2apricot.event_registration_type import EventRegistrationTypeMaker
+from meetup2apricot.exceptions import RegistrationTypesError
+from meetup2apricot.http_response_error import ApricotApiError, PhotoUploadError
+from meetup2apricot.journal import JournaledMapping
+from meetup2apricot.reporter import EventReport, NullReporter, Reporter
+from meetup2apricot.meetup_event import MeetupEvent
+from .test_event_processor import (
+    DEFAULT_RESTRICTION,
+    EARLIEST_START_TIME,
+    KNOWN_EVENTS,
+    LATEST_START_TIME,
+    SAMPLE_RESTRICTION,
+)
+from pathlib import PurePosixPath
+import asyncio
+import io
+import logging
+import pytest
+
+FIRST_APRICOT_EVENT_ID = 1000
+CACHED_EVENT_ID = "pfsbvrybcpbmb"
+
+
+def make_events(meetup_event_json, count):
+    """Return a number of Meetup events made from JSON, each with its own ID
+    and start time a day apart."""
+    events = []
+    for i in range(count):
+        event_json = dict(meetup_event_json)
+        event_json["id"] = f"event{i}"
+        event_json["time"] += i * 24 * 60 * 60 * 1000
+        event_json["name"] = f"{event_json['name']} {i}"
+        events.append(MeetupEvent(event_json))
+    return events
+
+
+@pytest.fixture()
+def later_meetup_events(later_free_meetup_event_json):
+    """Return several Meetup events within the start time range."""
+    return make_events(later_free_meetup_event_json, 5)
+
+
+class SlowApricotApi:
+
+    """A fake asyncio Wild Apricot API that finishes requests out of order
+    and counts the most requests in flight at once."""
+
+    def __init__(self):
+        self.next_id = FIRST_APRICOT_EVENT_ID
+        self.events = []
+        self.registration_types = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def add_event(self, event):
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        event_id = self.next_id
+        self.next_id += 1
+        await asyncio.sleep(0.001 * (event_id % 3))
+        self.events.append(event)
+        self.in_flight -= 1
+        return event_id
+
+    async def add_registration_type(self, registration_type):
+        await asyncio.sleep(0)
+        self.registration_types.append(registration_type)
+        return 1
+
+
+class SyncApricotApi:
+
+    """A fake Wild Apricot API numbering events in order."""
+
+    def __init__(self):
+        self.next_id = FIRST_APRICOT_EVENT_ID
+
+    def add_event(self, event):
+        event_id = self.next_id
+        self.next_id += 1
+        return event_id
+
+    def add_registration_type(self, registration_type):
+        return 1
+
+
+class FakePhotoCache:
+
+    """A fake photo cache with the same photo path for every event."""
+
+    def cache_photo(self, meetup_event):
+        return "/photos/photo.jpg"
+
+
+class AsyncFakePhotoCache:
+
+    """A fake asyncio photo cache that fails for some events."""
+
+    def __init__(self, failing_ids=()):
+        self.failing_ids = failing_ids
+
+    async def cache_photo(self, meetup_event):
+        await asyncio.sleep(0)
+        if meetup_event.meetup_id in self.failing_ids:
+            raise PhotoUploadError("oops")
+        return "/photos/photo.jpg"
+
+
+def make_processor(
+    processor_class,
+    photo_cache,
+    apricot_api,
+    event_tagger,
+    tmp_path,
+    reporter=None,
+    **kwargs,
+):
+    """Return an event processor of a class with a photo cache, a Wild
+    Apricot API, an event tagger, a temporary path, and a reporter."""
+    return processor_class(
+        earliest_start_time=EARLIEST_START_TIME,
+        latest_start_time=LATEST_START_TIME,
+        known_events=JournaledMapping(
+            tmp_path / f"{processor_class.__name__}.pickle", KNOWN_EVENTS
+        ),
+        photo_cache=photo_cache,
+        event_registration_type_maker=EventRegistrationTypeMaker(
+            [SAMPLE_RESTRICTION, DEFAULT_RESTRICTION]
+        ),
+        apricot_api=apricot_api,
+        event_tagger=event_tagger,
+        reporter=reporter or NullReporter(),
+        **kwargs,
+    )
+
+
+def make_reporter(output):
+    """Return a reporter writing to an output stream."""
+    return Reporter(output, lambda: EventReport(show_meetup_id=True))
+
+
+def test_process_all_matches_sequential(later_meetup_events, event_tagger, tmp_path):
+    """Test that processing events concurrently reports and records the same
+    results as processing them sequentially."""
+    sync_output = io.StringIO()
+    sync_processor = make_processor(
+        EventProcessor,
+        FakePhotoCache(),
+        SyncApricotApi(),
+        event_tagger,
+        tmp_path,
+        make_reporter(sync_output),
+    )
+    for meetup_event in later_meetup_events:
+        sync_processor.process(meetup_event)
+    async_output = io.StringIO()
+    async_processor = make_processor(
+        AsyncEventProcessor,
+        AsyncFakePhotoCache(),
+        SlowApricotApi(),
+        event_tagger,
+        tmp_path,
+        make_reporter(async_output),
+    )
+    asyncio.run(async_processor.process_all(later_meetup_events))
+    assert async_output.getvalue() == sync_output.getvalue()
+    assert async_processor.known_events == sync_processor.known_events
+
+
+def test_process_all_limits_in_flight(later_meetup_events, event_tagger, tmp_path):
+    """Test that no more than the most events in flight are processed at
+    once."""
+    apricot_api = SlowApricotApi()
+    processor = make_processor(
+        AsyncEventProcessor,
+        AsyncFakePhotoCache(),
+        apricot_api,
+        event_tagger,
+        tmp_path,
+        max_in_flight=2,
+    )
+    asyncio.run(processor.process_all(later_meetup_events))
+    assert apricot_api.most_in_flight == 2
+    assert len(apricot_api.events) == len(later_meetup_events)
+    assert len(apricot_api.registration_types) == 2 * len(later_meetup_events)
+
+
+def test_process_all_ignores_events(
+    later_meetup_events, free_meetup_event, paid_meetup_event, event_tagger, tmp_path
+):
+    """Test that processing skips past, known, and repeated events."""
+    apricot_api = SlowApricotApi()
+    processor = make_processor(
+        AsyncEventProcessor, AsyncFakePhotoCache(), apricot_api, event_tagger, tmp_path
+    )
+    meetup_events = [free_meetup_event, paid_meetup_event] + later_meetup_events
+    asyncio.run(processor.process_all(meetup_events + later_meetup_events[:1]))
+    assert len(apricot_api.events) == len(later_meetup_events)
+    assert free_meetup_event.meetup_id not in processor.known_events
+
+
+def test_process_all_photo_error(later_meetup_events, event_tagger, tmp_path, caplog):
+    """Test that events with photo errors are skipped while other events are
+    processed."""
+    caplog.set_level(logging.WARNING)
+    failing_id = later_meetup_events[1].meetup_id
+    processor = make_processor(
+        AsyncEventProcessor,
+        AsyncFakePhotoCache(failing_ids=[failing_id]),
+        SlowApricotApi(),
+        event_tagger,
+        tmp_path,
+    )
+    asyncio.run(processor.process_all(later_meetup_events))
+    assert processor.skipped_count == 1
+    assert failing_id not in processor.known_events
+    assert len(processor.known_events) == len(KNOWN_EVENTS) + 4
+    assert "skipping" in caplog.text
+
+
+def test_process_all_failure_records_earlier_events(
+    later_meetup_events, event_tagger, tmp_path, mocker
+):
+    """Test that a failure records every event added to Wild Apricot,
+    including those added after the failure by transfers already started."""
+    apricot_api = SlowApricotApi()
+    add_event = apricot_api.add_event
+
+    async def failing_add_event(event):
+        if event["Name"].endswith(" 2"):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("oops")
+        return await add_event(event)
+
+    apricot_api.add_event = failing_add_event
+    processor = make_processor(
+        AsyncEventProcessor, AsyncFakePhotoCache(), apricot_api, event_tagger, tmp_path
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(processor.process_all(later_meetup_events))
+    recorded_ids = set(processor.known_events) - set(KNOWN_EVENTS)
+    assert recorded_ids == {"event0", "event1", "event3", "event4"}
+    assert len(apricot_api.events) == len(recorded_ids)
+
+
+def test_process_all_failure_starts_no_more_transfers(
+    later_meetup_events, event_tagger, tmp_path
+):
+    """Test that a failure stops transfers not yet started and still raises
+    the first error."""
+    apricot_api = SlowApricotApi()
+    add_event = apricot_api.add_event
+
+    async def failing_add_event(event):
+        if event["Name"].endswith(" 1"):
+            raise RuntimeError("oops")
+        return await add_event(event)
+
+    apricot_api.add_event = failing_add_event
+    processor = make_processor(
+        AsyncEventProcessor,
+        AsyncFakePhotoCache(),
+        apricot_api,
+        event_tagger,
+        tmp_path,
+        max_in_flight=1,
+    )
+    with pytest.raises(RuntimeError, match="oops"):
+        asyncio.run(processor.process_all(later_meetup_events))
+    recorded_ids = set(processor.known_events) - set(KNOWN_EVENTS)
+    assert recorded_ids == {"event0"}
+    assert len(apricot_api.events) == 1
+
+
+def test_process_all_registration_types_concurrently(
+    later_meetup_events, event_tagger, tmp_path
+):
+    """Test that registration types for an event are added concurrently."""
+    apricot_api = SlowApricotApi()
+    started = []
+    started_before_finishing = []
+
+    async def add_registration_type(registration_type):
+        started.append(registration_type["Name"])
+        await asyncio.sleep(0.01)
+        started_before_finishing.append(len(started))
+        return 1
+
+    apricot_api.add_registration_type = add_registration_type
+    processor = make_processor(
+        AsyncEventProcessor, AsyncFakePhotoCache(), apricot_api, event_tagger, tmp_path
+    )
+    asyncio.run(processor.process_all(later_meetup_events[:1]))
+    assert started_before_finishing == [2, 2]
+    assert later_meetup_events[0].meetup_id in processor.known_events
+
+
+def test_process_all_registration_type_error(
+    later_meetup_events, event_tagger, tmp_path
+):
+    """Test that a failed registration type raises an error for its event,
+    recording the event and the events before it."""
+    apricot_api = SlowApricotApi()
+    add_registration_type = apricot_api.add_registration_type
+
+    async def failing_add_registration_type(registration_type):
+        if registration_type["EventId"] == FIRST_APRICOT_EVENT_ID + 1:
+            raise ApricotApiError("HTTP status is 500, not ok")
+        return await add_registration_type(registration_type)
+
+    apricot_api.add_registration_type = failing_add_registration_type
+    processor = make_processor(
+        AsyncEventProcessor,
+        AsyncFakePhotoCache(),
+        apricot_api,
+        event_tagger,
+        tmp_path,
+        max_in_flight=1,
+    )
+    with pytest.raises(RegistrationTypesError) as exc_info:
+        asyncio.run(processor.process_all(later_meetup_events))
+    assert exc_info.value.meetup_id == "event1"
+    assert len(exc_info.value.failures) == 2
+    recorded_ids = set(processor.known_events) - set(KNOWN_EVENTS)
+    assert recorded_ids == {"event0", "event1"}
+
+
+@pytest.fixture()
+def async_photo_cache(mocker, tmp_path):
+    """Return an asyncio photo cache with mock asyncio photo retriever and
+    uploader."""
+    photo_retriever = mocker.Mock()
+    photo_retriever.get = mocker.AsyncMock(return_value="photo.jpg")
+    photo_uploader = mocker.Mock()
+    photo_uploader.upload_photo = mocker.AsyncMock(return_value="/photos/photo.jpg")
+    return AsyncPhotoCache(
+        apricot_directory=PurePosixPath("/photos"),
+        urls_to_paths=JournaledMapping(tmp_path / "photo_cache.pickle", {None: None}),
+        photo_retriever=photo_retriever,
+        photo_uploader=photo_uploader,
+        reporter=NullReporter(),
+    )
+
+
+def test_cache_photo_shared(async_photo_cache, later_meetup_events):
+    """Test that concurrent events sharing a photo copy it once."""
+
+    async def cache_photos():
+        return await asyncio.gather(
+            *(async_photo_cache.cache_photo(event) for event in later_meetup_events)
+        )
+
+    photo_paths = asyncio.run(cache_photos())
+    assert photo_paths == ["/photos/photo.jpg"] * len(later_meetup_events)
+    async_photo_cache.photo_retriever.get.assert_awaited_once()
+    async_photo_cache.photo_uploader.upload_photo.assert_awaited_once_with("photo.jpg")
+    assert async_photo_cache.copies == {}
+
+
+def test_cache_photo_none(async_photo_cache, later_meetup_events, mocker):
+    """Test caching an event without a photo."""
+    meetup_event = mocker.Mock()
+    meetup_event.photo_url = None
+    assert asyncio.run(async_photo_cache.cache_photo(meetup_event)) is None
+    async_photo_cache.photo_retriever.get.assert_not_awaited()
+
+
+def test_prefetch_events(
+    free_meetup_event, paid_meetup_event_json, paid_meetup_event, mocker
+):
+    """Test prefetching events concurrently, skipping cached events."""
+    async_meetup_api = mocker.Mock()
+    async_meetup_api.retrieve_event_json = mocker.AsyncMock(
+        side_effect=lambda meetup_id: (
+            paid_meetup_event_json if meetup_id == "4567" else None
+        )
+    )
+    retriever = AsyncMeetupEventRetriever(
+        mocker.Mock(), async_meetup_api, [free_meetup_event]
+    )
+    retriever.prefetch_events([CACHED_EVENT_ID, "4567", "7890", "4567"])
+    assert async_meetup_api.retrieve_event_json.await_count == 2
+    assert retriever.get_event("4567").meetup_id == paid_meetup_event.meetup_id
+    assert retriever.get_event("7890") is None
+    assert retriever.get_event(CACHED_EVENT_ID) == free_meetup_event
+
+
+def test_add_apricot_events(mocker):
+    """Test adding events with an asyncio event processor."""
+    meetup_events = [mocker.Mock(), mocker.Mock()]
+    event_processor = mocker.Mock()
+    event_processor.process_all = mocker.AsyncMock()
+    meetup2apricot = AsyncMeetup2Apricot(
+        *([meetup_events] + [mocker.Mock()] * 9), max_workers=2
+    )
+    meetup2apricot.add_apricot_events(event_processor)
+    event_processor.process_all.assert_awaited_once_with(meetup_events)
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -37,6 +37,16 @@ def test_getitem_missing(careful_env):
         careful_env["EXAMPLE"]
 
 
+def test_get_present(careful_env):
+    """Test getting a present value with a default."""
+    assert careful_env.get("SAMPLE", "default") == "sample"
+
+
+def test_get_missing(careful_env):
+    """Test getting a default for a missing environment variable."""
+    assert careful_env.get("EXAMPLE", "default") == "default"
+
+
 def test_json_valid(careful_env):
     """Test loading valid JSON."""
     expected_value = ["CAD Lab", "Classroom A"]
@@ -0,0 +1,33 @@
+"""Test clocks."""
+
+from meetup2apricot.clock import SystemClock, VirtualClock
+
+
+def test_system_clock_time(mocker):
+    """Test that the system clock tells the system time."""
+    mocker.patch("time.time", return_value=1234.5)
+    assert SystemClock().time() == 1234.5
+
+
+def test_system_clock_sleep(mocker):
+    """Test that the system clock sleeps in real time."""
+    sleep = mocker.patch("time.sleep")
+    SystemClock().sleep(3)
+    sleep.assert_called_once_with(3)
+
+
+def test_virtual_clock_sleep():
+    """Test that sleeping advances a virtual clock."""
+    clock = VirtualClock(100)
+    clock.sleep(2.5)
+    assert clock.time() == 102.5
+
+
+def test_virtual_clock_sleep_negative():
+    """Test that a virtual clock never runs backward."""
+    clock = VirtualClock(100)
+    clock.sleep(-5)
+    assert clock.time() == 100
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
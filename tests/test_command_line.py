@@ -193,4 +193,97 @@ def test_transfer_multiple_multiple():
     assert args.transfer_meetup_ids == ["abcd123", "efg456", "xyz789", "qrs678"]
 
 
+def test_apricot_throttle_file_missing():
+    """Test the default Wild Apricot throttle file."""
+    args = parse_without_args()
+    assert args.apricot_throttle_file is None
+
+
+def test_apricot_throttle_file():
+    """Test setting the Wild Apricot throttle file."""
+    args = parse_command_line("--apricot-throttle-file /var/tmp/apricot.throttle")
+    assert args.apricot_throttle_file == "/var/tmp/apricot.throttle"
+
+
+def test_stream_json_missing():
+    """Test the default stream JSON flag."""
+    args = parse_without_args()
+    assert not args.stream_json
+
+
+def test_stream_json():
+    """Test setting the stream JSON flag."""
+    args = parse_command_line("--stream-json")
+    assert args.stream_json
+
+
+def test_async_missing():
+    """Test the default asyncio mode flag."""
+    args = parse_without_args()
+    assert not args.async_mode
+
+
+def test_async():
+    """Test setting the asyncio mode flag."""
+    args = parse_command_line("--async")
+    assert args.async_mode
+
+
+def test_database_missing():
+    """Test the default database path."""
+    args = parse_without_args()
+    assert args.database is None
+
+
+def test_database():
+    """Test setting the database path."""
+    args = parse_command_line("--database events.db")
+    assert args.database == "events.db"
+
+
+def test_photo_pruning_missing():
+    """Test the default photo pruning options."""
+    args = parse_without_args()
+    assert args.max_photos is None
+    assert args.photo_max_age is None
+    assert not args.clean_photos
+
+
+def test_photo_pruning():
+    """Test setting the photo pruning options."""
+    args = parse_command_line("--max-photos 50 --photo-max-age 30 --clean-photos")
+    assert args.max_photos == 50
+    assert args.photo_max_age == 30
+    assert args.clean_photos
+
+
+def test_cassettes_missing():
+    """Test the default cassette options."""
+    args = parse_without_args()
+    assert args.record_cassette is None
+    assert args.replay_cassette is None
+    assert args.replay_latency is None
+
+
+def test_record_cassette():
+    """Test setting a cassette to record."""
+    args = parse_command_line("--record-cassette /var/tmp/run.jsonl.gz")
+    assert args.record_cassette == "/var/tmp/run.jsonl.gz"
+
+
+def test_replay_cassette():
+    """Test setting a cassette to replay with recorded latency."""
+    args = parse_command_line(
+        "--replay-cassette /var/tmp/run.jsonl.gz --replay-latency recorded"
+    )
+    assert args.replay_cassette == "/var/tmp/run.jsonl.gz"
+    assert args.replay_latency == "recorded"
+
+
+def test_replay_latency_seconds():
+    """Test setting a replay latency in seconds."""
+    args = parse_command_line("--replay-latency 0.25")
+    assert args.replay_latency == 0.25
+
+
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
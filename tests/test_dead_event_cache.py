@@ -0,0 +1,91 @@
+"""Test the dead event cache."""
+
+from meetup2apricot.clock import VirtualClock
+from meetup2apricot.dead_event_cache import DeadEventCache, load_dead_event_cache
+import logging
+import pytest
+
+TIME_TO_LIVE = 100
+
+
+@pytest.fixture()
+def cache_path(tmp_path):
+    """Return a path to a dead event cache file."""
+    return tmp_path / "dead_events.pickle"
+
+
+@pytest.fixture()
+def clock():
+    """Return a virtual clock."""
+    return VirtualClock(1000)
+
+
+@pytest.fixture()
+def dead_event_cache(cache_path, clock):
+    """Return an empty dead event cache."""
+    return DeadEventCache(cache_path, TIME_TO_LIVE, clock=clock)
+
+
+def test_is_dead_miss(dead_event_cache):
+    """Test checking an event not known to be dead."""
+    assert not dead_event_cache.is_dead("1234")
+    assert (dead_event_cache.hits, dead_event_cache.misses) == (0, 1)
+
+
+def test_is_dead_hit(dead_event_cache):
+    """Test checking an event known to be dead."""
+    dead_event_cache.add("1234")
+    assert dead_event_cache.is_dead("1234")
+    assert (dead_event_cache.hits, dead_event_cache.misses) == (1, 0)
+
+
+def test_is_dead_expired(dead_event_cache, clock):
+    """Test forgetting an event found dead too long ago."""
+    dead_event_cache.add("1234")
+    clock.sleep(TIME_TO_LIVE + 1)
+    assert not dead_event_cache.is_dead("1234")
+
+
+def test_persist_and_load(dead_event_cache, cache_path, clock):
+    """Test remembering unexpired dead events between runs."""
+    dead_event_cache.add("1234")
+    clock.sleep(TIME_TO_LIVE / 2)
+    dead_event_cache.add("5678")
+    dead_event_cache.persist()
+    clock.sleep(TIME_TO_LIVE * 3 / 4)
+    loaded_cache = DeadEventCache(cache_path, TIME_TO_LIVE, clock=clock)
+    loaded_cache.load()
+    assert list(loaded_cache.dead_times) == ["5678"]
+
+
+def test_persist_dryrun(cache_path, clock):
+    """Test that a dry run remembers nothing."""
+    dead_event_cache = DeadEventCache(cache_path, TIME_TO_LIVE, True, clock)
+    dead_event_cache.add("1234")
+    dead_event_cache.persist()
+    assert not cache_path.exists()
+
+
+def test_load_missing(cache_path):
+    """Test loading a missing cache file."""
+    assert load_dead_event_cache(cache_path, TIME_TO_LIVE).dead_times == {}
+
+
+def test_load_corrupt(cache_path, caplog):
+    """Test ignoring a corrupt cache file."""
+    cache_path.write_bytes(b"not a pickle")
+    assert load_dead_event_cache(cache_path, TIME_TO_LIVE).dead_times == {}
+    assert "Cannot load dead event cache" in caplog.text
+
+
+def test_log_statistics(dead_event_cache, caplog):
+    """Test logging cache hits and misses."""
+    caplog.set_level(logging.INFO)
+    dead_event_cache.add("1234")
+    dead_event_cache.is_dead("1234")
+    dead_event_cache.is_dead("5678")
+    dead_event_cache.log_statistics()
+    assert "dead_events=1 hits=1 misses=1" in caplog.text
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
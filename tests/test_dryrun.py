@@ -1,8 +1,9 @@
 """Test the dry run decorator."""
 
 
-from meetup2apricot.dryrun import dryrunnable, method, log_method_call
+from meetup2apricot.dryrun import async_method, dryrunnable, method, log_method_call
 from .pytest_regex import PytestRegex
+import asyncio
 import logging
 import pytest
 
@@ -42,6 +43,23 @@ class Sample:
         return message
 
 
+class AsyncSample:
+
+    """A sample class for testing the asyncio dry run decorator."""
+
+    def __init__(self, dryrun=False):
+        """Initialize with a dryrun flag."""
+        self.dryrun = dryrun
+        self.calls = []
+
+    @async_method("foo")
+    async def some_args(self, x, y=2):
+        """A coroutine method with some args."""
+        message = f"some args x={x} y={y}"
+        self.calls.append(message)
+        return message
+
+
 @dryrunnable()
 class DecoratedSample:
 
@@ -149,6 +167,29 @@ def test_other_flag_other_flag_no_args(other_flag_sample, caplog):
     ]
 
 
+def test_production_async_some_args(caplog):
+    """Test a production run of an asyncio method."""
+    caplog.set_level(logging.INFO)
+    sample = AsyncSample()
+    assert asyncio.run(sample.some_args(1)) == "some args x=1 y=2"
+    assert sample.calls == ["some args x=1 y=2"]
+    assert caplog.messages == []
+
+
+def test_dryrun_async_some_args(caplog):
+    """Test a dryrun run of an asyncio method."""
+    caplog.set_level(logging.INFO)
+    sample = AsyncSample(dryrun=True)
+    assert asyncio.run(sample.some_args(1, y=3)) == "foo"
+    assert sample.calls == []
+    assert caplog.messages == [
+        PytestRegex(
+            r"Skipped <tests.test_dryrun.AsyncSample object at 0x[0-9a-f]+>"
+            r".some_args\(1, y=3\)"
+        )
+    ]
+
+
 def test_decorated_sample_implicit():
     """Test initializing the decorated sample class without setting the dry run
     flag."""
@@ -0,0 +1,113 @@
+"""Test generating a synthetic corpus of Meetup events."""
+
+from meetup2apricot.event_corpus import (
+    EventCorpusGenerator,
+    main,
+    write_json_array,
+)
+from meetup2apricot.meetup_event import MEMBER_ONLY_PATTERN, MeetupEvent
+from datetime import datetime
+import io
+import json
+import pytest
+
+START_TIME = datetime.fromisoformat("2021-06-01T00:00-04:00")
+
+
+@pytest.fixture()
+def sample_events():
+    """Return a list of events generated from a seed."""
+    return list(EventCorpusGenerator(START_TIME, seed=3).events(500))
+
+
+def test_reproducible(sample_events):
+    """Test generating the same events from the same seed."""
+    events = list(EventCorpusGenerator(START_TIME, seed=3).events(500))
+    assert events == sample_events
+
+
+def test_different_seeds(sample_events):
+    """Test generating different events from different seeds."""
+    events = list(EventCorpusGenerator(START_TIME, seed=4).events(500))
+    assert events != sample_events
+
+
+def test_start_times(sample_events):
+    """Test generating events in start time order after the start time."""
+    start_times = [event["time"] for event in sample_events]
+    assert start_times == sorted(start_times)
+    assert start_times[0] >= START_TIME.timestamp() * 1000
+
+
+def test_unique_ids(sample_events):
+    """Test generating unique Meetup IDs."""
+    assert len({event["id"] for event in sample_events}) == len(sample_events)
+
+
+def test_variety(sample_events):
+    """Test varying the event properties that affect conversion."""
+    meetup_events = [MeetupEvent(event) for event in sample_events]
+    assert {len(event.accounting_codes) for event in meetup_events} == {0, 1, 2}
+    assert any(MEMBER_ONLY_PATTERN.search(event.name) for event in meetup_events)
+    assert {bool(event.fee_amount) for event in meetup_events} == {True, False}
+    assert None in {event.rsvp_limit for event in meetup_events}
+    assert len({event.venue.name for event in meetup_events}) > 1
+    photo_urls = [event.photo_url for event in meetup_events if event.photo_url]
+    assert len(set(photo_urls)) < len(photo_urls) < len(meetup_events)
+    assert {event.status for event in meetup_events} == {"upcoming", "cancelled"}
+
+
+def test_description_sizes():
+    """Test limiting description sizes."""
+    generator = EventCorpusGenerator(START_TIME, seed=5, max_description_size=300)
+    sizes = [len(event["description"]) for event in generator.events(200)]
+    assert max(sizes) == 300
+    assert min(sizes) < 300
+
+
+def test_accounting_codes():
+    """Test prefixing event names with chosen accounting codes."""
+    generator = EventCorpusGenerator(START_TIME, seed=6, accounting_codes=["BIO"])
+    codes = set()
+    for event in generator.events(100):
+        codes.update(MeetupEvent(event).accounting_codes)
+    assert codes == {"BIO"}
+
+
+def test_write_json_array(sample_events):
+    """Test writing events as a JSON array."""
+    output = io.StringIO()
+    assert write_json_array(iter(sample_events), output) == len(sample_events)
+    assert json.loads(output.getvalue()) == sample_events
+
+
+def test_write_json_array_empty():
+    """Test writing no events as an empty JSON array."""
+    output = io.StringIO()
+    assert write_json_array(iter([]), output) == 0
+    assert json.loads(output.getvalue()) == []
+
+
+def test_main(tmp_path):
+    """Test generating a corpus file from the command line."""
+    corpus_path = tmp_path / "events.json"
+    main(
+        [
+            "--count",
+            "20",
+            "--seed",
+            "7",
+            "--start",
+            "2021-06-01T00:00-04:00",
+            "--codes-to-tags",
+            '{"AC": "arts-and-crafts"}',
+            "--output",
+            str(corpus_path),
+        ]
+    )
+    events = json.loads(corpus_path.read_text())
+    assert len(events) == 20
+    assert all(set(MeetupEvent(event).accounting_codes) <= {"AC"} for event in events)
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
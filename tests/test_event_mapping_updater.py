@@ -59,6 +59,11 @@ class MeetupEventRetrieverFake:
             PREV_FREE_MEETUP_ID: free_meetup_event,
             paid_meetup_event.meetup_id: paid_meetup_event,
         }
+        self.prefetched_ids = []
+
+    def prefetch_events(self, meetup_event_ids):
+        """Record the IDs of events to prefetch."""
+        self.prefetched_ids.extend(meetup_event_ids)
 
     def get_event(self, meetup_event_id):
         """Fake getting and returning a Meetup event by its ID."""
@@ -104,6 +109,17 @@ def test_update_meetup_id_none(event_mapping_updater):
     assert event_mapping_updater.update_meetup_id(MEETUP_ID_2) == None
 
 
+def test_prefetch_events(event_mapping_updater, fake_meetup_event_retriever):
+    """Test prefetching timely mapped events and skipped events."""
+    event_mapping_updater.prefetch_events(SAMPLE_EVENT_MAPPING)
+    assert fake_meetup_event_retriever.prefetched_ids == [
+        MEETUP_ID_2,
+        FREE_MEETUP_ID,
+        MEETUP_ID_3,
+        PAID_MEETUP_ID,
+    ]
+
+
 def test_update_event_mapping(event_mapping_updater):
     expected_mapping = {
         FREE_MEETUP_ID: FREE_EVENT_APRICOT_DATA,
@@ -4,7 +4,9 @@ from meetup2apricot.member_level_manager import MemberLevel
 from meetup2apricot.event_processor import EventProcessor, load_cached_event_mapping
 from meetup2apricot.event_restriction_loader import EventRestriction
 from meetup2apricot.event_registration_type import EventRegistrationTypeMaker
-from meetup2apricot.http_response_error import PhotoUploadError
+from meetup2apricot.exceptions import RegistrationTypesError
+from meetup2apricot.http_response_error import ApricotApiError, PhotoUploadError
+from meetup2apricot.journal import JournaledMapping
 from meetup2apricot.reporter import Reporter, NullReporter, EventReport
 from datetime import datetime
 from .sample_apricot_json import (
@@ -16,8 +18,8 @@ from .sample_apricot_json import (
 import io
 import logging
 import re
-import pickle
 import pytest
+import threading
 
 
 EARLIEST_START_TIME = datetime.fromisoformat("2020-11-10 00:00 -05:00")
@@ -173,11 +175,10 @@ def event_processor(
     return EventProcessor(
         earliest_start_time=EARLIEST_START_TIME,
         latest_start_time=LATEST_START_TIME,
-        known_events=KNOWN_EVENTS.copy(),
+        known_events=JournaledMapping(tmp_path / CACHE_FILE_NAME, KNOWN_EVENTS),
         photo_cache=mock_photo_cache,
         event_registration_type_maker=event_registration_type_maker,
         apricot_api=mock_apricot_api,
-        cache_path=tmp_path / CACHE_FILE_NAME,
         event_tagger=event_tagger,
         reporter=NullReporter(),
     )
@@ -233,7 +234,9 @@ def test_add_event_registration_types_unlimited(
     event_processor.add_event_registration_types(
         free_meetup_event, EXPECTED_APRICOT_EVENT_ID
     )
-    mock_apricot_api.add_registration_type.assert_has_calls(expected_calls)
+    mock_apricot_api.add_registration_type.assert_has_calls(
+        expected_calls, any_order=True
+    )
 
 
 def test_add_event_registration_types_limited(
@@ -246,7 +249,52 @@ def test_add_event_registration_types_limited(
         mocker.call(EXPECTED_MEMBERS_ONLY_TYPE_FOR_PAID),
     ]
     event_processor.add_event_registration_types(paid_meetup_event, 7890)
-    mock_apricot_api.add_registration_type.assert_has_calls(expected_calls)
+    mock_apricot_api.add_registration_type.assert_has_calls(
+        expected_calls, any_order=True
+    )
+
+
+def test_add_event_registration_types_concurrently(
+    event_processor, free_meetup_event, mock_apricot_api
+):
+    """Test that registration types for an event are added concurrently."""
+    both_started = threading.Barrier(2, timeout=5)
+
+    def add_registration_type(registration_type):
+        both_started.wait()
+        return EXPECTED_REGISTRATION_TYPE_ID
+
+    mock_apricot_api.add_registration_type.side_effect = add_registration_type
+    event_processor.add_event_registration_types(
+        free_meetup_event, EXPECTED_APRICOT_EVENT_ID
+    )
+    assert mock_apricot_api.add_registration_type.call_count == 2
+
+
+def test_add_event_registration_types_error(
+    event_processor, free_meetup_event, mock_apricot_api, caplog
+):
+    """Test that a failed registration type raises an error for its event
+    after the other registration type is added and logged."""
+    caplog.set_level(logging.INFO)
+
+    def add_registration_type(registration_type):
+        if registration_type["Name"] == "RSVP":
+            raise ApricotApiError("HTTP status is 500, not ok")
+        return EXPECTED_REGISTRATION_TYPE_ID
+
+    mock_apricot_api.add_registration_type.side_effect = add_registration_type
+    with pytest.raises(RegistrationTypesError) as exc_info:
+        event_processor.add_event_registration_types(
+            free_meetup_event, EXPECTED_APRICOT_EVENT_ID
+        )
+    assert str(exc_info.value) == (
+        f"1 of 2 registration types failed for Wild Apricot event "
+        f"{EXPECTED_APRICOT_EVENT_ID} (Meetup event {free_meetup_event.meetup_id}): "
+        "RSVP: HTTP status is 500, not ok"
+    )
+    assert [reg_type.name for reg_type, _ in exc_info.value.failures] == ["RSVP"]
+    assert "Instructor/Host" in caplog.text
 
 
 def test_record_event(event_processor, free_meetup_event):
@@ -273,6 +321,7 @@ def test_process_skip_photo_error(
     event_processor.copy_photo = mocker.Mock(side_effect=PhotoUploadError("oops"))
     event_processor.process(later_free_meetup_event)
     assert "skipping" in caplog.text
+    assert event_processor.skipped_count == 1
 
 
 def test_process(event_processor, later_free_meetup_event, mock_apricot_api, mocker):
@@ -293,21 +342,43 @@ def test_process(event_processor, later_free_meetup_event, mock_apricot_api, moc
     assert output.getvalue() == EXPECTED_REPORT
 
 
-def test_persist(event_processor, tmp_path):
-    """Test persisting the event processor."""
-    event_processor.persist()
+def test_process_registration_type_error(
+    event_processor, later_free_meetup_event, mock_apricot_api
+):
+    """Test that processing an event records it before raising an error for
+    a failed registration type."""
+
+    def add_registration_type(registration_type):
+        if registration_type["Name"] == "RSVP":
+            raise ApricotApiError("HTTP status is 500, not ok")
+        return EXPECTED_REGISTRATION_TYPE_ID
+
+    mock_apricot_api.add_registration_type.side_effect = add_registration_type
+    with pytest.raises(RegistrationTypesError):
+        event_processor.process(later_free_meetup_event)
+    assert event_processor.known_events[later_free_meetup_event.meetup_id] == {
+        "wild_apricot_event": EXPECTED_APRICOT_EVENT_ID,
+        "start_time": later_free_meetup_event.start_time,
+    }
+
+
+def test_load_cached_event_mapping(event_processor, free_meetup_event, tmp_path):
+    """Test loading cached data journaled as events are recorded."""
+    event_processor.known_events.compact()
+    event_processor.record_event(free_meetup_event, EXPECTED_APRICOT_EVENT_ID)
     data_path = tmp_path / CACHE_FILE_NAME
-    with data_path.open("rb") as data_file:
-        cached_data = pickle.load(data_file)
-    assert cached_data == KNOWN_EVENTS
+    known_events = load_cached_event_mapping(data_path)
+    assert known_events == event_processor.known_events
+    assert free_meetup_event.meetup_id in known_events
 
 
-def test_load_cached_event_mapping(event_processor, tmp_path):
-    """Test loading cached data."""
+def test_persist(event_processor, free_meetup_event, tmp_path):
+    """Test persisting the event processor."""
+    event_processor.known_events.compact()
+    event_processor.record_event(free_meetup_event, EXPECTED_APRICOT_EVENT_ID)
     event_processor.persist()
     data_path = tmp_path / CACHE_FILE_NAME
-    known_events = load_cached_event_mapping(data_path)
-    assert known_events == KNOWN_EVENTS
+    assert load_cached_event_mapping(data_path) == event_processor.known_events
 
 
 def test_make_load_cached_event_mapping_no_prior(tmp_path):
@@ -0,0 +1,273 @@
+"""Test the fake Meetup, Wild Apricot, and WebDAV services."""
+
+from meetup2apricot.application_scope import ApplicationScope
+from meetup2apricot.apricot_api import ApricotApi
+from meetup2apricot.careful_environment import CarefulEnvironment
+from meetup2apricot.command_line import parse_args
+from meetup2apricot.fake_server import (
+    FakeServiceSettings,
+    RateLimitWindow,
+    generate_meetup_events,
+    make_fake_server,
+    tiny_png,
+)
+from meetup2apricot.clock import VirtualClock
+from meetup2apricot.injector import inject_initial_data_loader
+from meetup2apricot.meetup_api import MeetupApi
+from meetup2apricot.oauth2_session_starter import Oauth2SessionStarter
+from meetup2apricot.photo_uploader import PhotoUploader, make_photo_uploader_session
+from meetup2apricot.throttle import OpenThrottle
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
+import imghdr
+import requests
+import threading
+import pytest
+
+SAMPLE_EVENT_COUNT = 25
+
+
+def start_fake_server(settings):
+    """Start a fake server on a free port with some settings. Return the
+    server."""
+    meetup_events = generate_meetup_events(SAMPLE_EVENT_COUNT, seed=1)
+    server = make_fake_server("127.0.0.1", 0, settings, meetup_events)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    return server
+
+
+@pytest.fixture()
+def fake_server(monkeypatch):
+    """Return a fake server running during a test."""
+    monkeypatch.setenv("OAUTHLIB_INSECURE_TRANSPORT", "1")
+    server = start_fake_server(FakeServiceSettings(meetup_rate=100))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def meetup_api(fake_server):
+    """Return a Meetup API for the fake server."""
+    return MeetupApi(
+        requests.Session(),
+        OpenThrottle(),
+        "sample-group",
+        SAMPLE_EVENT_COUNT,
+        api_url=fake_server.environment()["MEETUP_API_URL"],
+    )
+
+
+@pytest.fixture()
+def apricot_api(fake_server):
+    """Return a Wild Apricot API for the fake server with an OAuth session."""
+    environment = fake_server.environment()
+    session = Oauth2SessionStarter(
+        "APIKEY", "secret", environment["APRICOT_TOKEN_URL"], scope="auto"
+    ).start_session()
+    return ApricotApi(
+        "1234", session, OpenThrottle(), api_url=environment["APRICOT_API_URL"]
+    )
+
+
+def counts(fake_server):
+    """Return the request counts reported by a fake server."""
+    return requests.get(fake_server.base_url + "/counts").json()
+
+
+def test_tiny_png():
+    """Test making a PNG image."""
+    assert imghdr.what(None, tiny_png()) == "png"
+
+
+def test_meetup_status(meetup_api):
+    """Test reporting the Meetup rate limits with the status."""
+    headers = meetup_api.retrieve_status().headers
+    assert headers["X-RateLimit-Limit"] == "100"
+    assert headers["X-RateLimit-Remaining"] == "99"
+    assert meetup_api.make_meetup_api_throttle()
+
+
+def test_meetup_events_pages(meetup_api, fake_server):
+    """Test following links to later pages of Meetup events."""
+    meetup_api.events_wanted = 10
+    meetup_api.request_params = lambda: {"page": 4}
+    meetup_ids = [event["id"] for event in meetup_api.iterate_events_json()]
+    served_events = fake_server.services.meetup_events
+    assert meetup_ids == [event["id"] for event in served_events[:10]]
+    assert counts(fake_server)["meetup events"] == 3
+
+
+def test_meetup_events_window(meetup_api, fake_server):
+    """Test selecting Meetup events within a start time window, including the
+    margin of a day on each side."""
+    served_events = fake_server.services.meetup_events
+    earliest = datetime.fromtimestamp(served_events[5]["time"] / 1000).astimezone()
+    meetup_api.earliest_start_time = earliest + timedelta(days=1)
+    meetup_api.latest_start_time = earliest + timedelta(days=1)
+    latest_ms = served_events[5]["time"] + 2 * 24 * 60 * 60 * 1000
+    expected_ids = [
+        event["id"] for event in served_events[5:] if event["time"] <= latest_ms
+    ]
+    meetup_ids = [event["id"] for event in meetup_api.iterate_events_json()]
+    assert meetup_ids == expected_ids
+
+
+def test_meetup_event(meetup_api, fake_server):
+    """Test retrieving a Meetup event and a missing event."""
+    meetup_id = fake_server.services.meetup_events[3]["id"]
+    assert meetup_api.retrieve_event_json(meetup_id)["id"] == meetup_id
+    assert meetup_api.retrieve_event_json("missing") is None
+
+
+def test_meetup_event_photo(meetup_api, fake_server):
+    """Test retrieving a Meetup event photo from the fake server."""
+    photo_url = next(
+        event["featured_photo"]["highres_link"]
+        for event in meetup_api.iterate_events_json()
+        if "featured_photo" in event
+    )
+    assert photo_url.startswith(fake_server.base_url + "/photos/")
+    assert imghdr.what(None, requests.get(photo_url).content) == "png"
+
+
+def test_apricot_events(apricot_api, fake_server):
+    """Test adding, cloning, and getting Wild Apricot events."""
+    event_id = apricot_api.add_event({"Name": "Sample"})
+    clone_id = apricot_api.clone_event(event_id, "Copy of ")
+    assert apricot_api.get_event(clone_id)["Name"] == "Copy of Sample"
+    assert apricot_api.add_registration_type({"EventId": event_id}) > clone_id
+    assert counts(fake_server)["apricot token"] == 1
+
+
+def test_apricot_membership_levels(apricot_api):
+    """Test getting Wild Apricot membership levels."""
+    levels = apricot_api.get_membership_levels()
+    assert "Key" in [level["Name"] for level in levels]
+
+
+def test_apricot_unauthorized(fake_server):
+    """Test rejecting a Wild Apricot request without a bearer token."""
+    api = ApricotApi(
+        "1234",
+        requests.Session(),
+        OpenThrottle(),
+        api_url=fake_server.environment()["APRICOT_API_URL"],
+    )
+    with pytest.raises(Exception, match="401"):
+        api.get_membership_levels()
+
+
+def test_webdav_upload(fake_server, tmp_path):
+    """Test uploading a photo with digest authentication."""
+    environment = fake_server.environment()
+    (tmp_path / "dot.png").write_bytes(tiny_png())
+    session = make_photo_uploader_session(
+        environment["APRICOT_PHOTO_USERNAME"],
+        environment["APRICOT_PHOTO_PASSWORD"],
+        None,
+    )
+    uploader = PhotoUploader(
+        tmp_path,
+        environment["APRICOT_PHOTO_BASE_URL"],
+        PurePosixPath("/resources/Pictures"),
+        session,
+    )
+    uploader.upload_photo("dot.png")
+    assert fake_server.services.uploaded_photos == {
+        "/resources/Pictures/dot.png": len(tiny_png())
+    }
+    assert counts(fake_server)["webdav challenges"] == 1
+
+
+def test_webdav_wrong_password(fake_server):
+    """Test rejecting a photo upload with the wrong password."""
+    session = make_photo_uploader_session("photos", "wrong", None)
+    url = fake_server.base_url + "/resources/x.png"
+    assert session.put(url, data=b"x").status_code == 401
+
+
+def application_env_vars(fake_server, tmp_path):
+    """Return environment variables directing meetup2apricot to transfer the
+    few events starting within hours from a fake server, keeping its state in a
+    temporary directory."""
+    now = datetime.now().astimezone()
+    return dict(
+        fake_server.environment(),
+        ALL_EVENT_TAGS="[]",
+        APRICOT_ACCOUNT_NUMBER="1234",
+        APRICOT_API_KEY="secret",
+        APRICOT_PHOTO_DIRECTORY="/resources/Pictures",
+        CODES_TO_TAGS="{}",
+        EARLIEST_EVENT_START_TIME=(now - timedelta(days=1)).isoformat(),
+        LATEST_EVENT_START_TIME=(now + timedelta(hours=8)).isoformat(),
+        EVENT_CACHE_FILE=str(tmp_path / "events.pickle"),
+        EVENT_RESTRICTIONS="[]",
+        MEETUP_EVENTS_WANTED="200",
+        MEETUP_GROUP_URL_NAME="sample-group",
+        PHOTO_CACHE_FILE=str(tmp_path / "photos.pickle"),
+        PHOTO_DIRECTORY=str(tmp_path),
+    )
+
+
+def run_application(env_vars):
+    """Run meetup2apricot with some environment variables and no options."""
+    scope = ApplicationScope(parse_args([]), CarefulEnvironment(env_vars))
+    inject_initial_data_loader(scope).run()
+
+
+def test_unchanged_run_requests(fake_server, tmp_path, capsys):
+    """Test that a run finding the Meetup events unchanged since the last run
+    sends only the conditional request for the event list."""
+    env_vars = application_env_vars(fake_server, tmp_path)
+    run_application(env_vars)
+    before = counts(fake_server)
+    run_application(env_vars)
+    after = counts(fake_server)
+    new_counts = {
+        name: count - before.get(name, 0)
+        for name, count in after.items()
+        if count != before.get(name, 0) and name != "counts"
+    }
+    assert new_counts == {"meetup events": 1, "meetup events not modified": 1}
+
+
+def test_injected_errors(monkeypatch):
+    """Test answering every request with an error at an error rate of 1."""
+    server = start_fake_server(FakeServiceSettings(error_rate=1.0, seed=1))
+    try:
+        response = requests.get(server.base_url + "/meetup/status")
+        assert response.status_code == 503
+        assert server.services.counts_json()["injected errors"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_rate_limited(meetup_api, fake_server):
+    """Test answering requests beyond the rate limit with 429."""
+    url = fake_server.base_url + "/meetup/status"
+    statuses = [requests.get(url).status_code for _ in range(101)]
+    assert statuses.count(429) == 1
+    assert counts(fake_server)["rate limited"] == 1
+
+
+def test_rate_limit_window():
+    """Test counting requests in fixed windows of time."""
+    clock = VirtualClock(100)
+    window = RateLimitWindow(2, 10, clock)
+    assert [window.admit() for _ in range(3)] == [True, True, False]
+    assert window.headers() == {
+        "X-RateLimit-Limit": "2",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "10",
+    }
+    clock.sleep(10)
+    assert window.admit()
+    assert window.headers()["X-RateLimit-Remaining"] == "1"
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
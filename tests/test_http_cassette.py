@@ -0,0 +1,222 @@
+"""Test recording and replaying web requests."""
+
+from meetup2apricot.clock import VirtualClock
+from meetup2apricot.http_cassette import (
+    NULL_CASSETTE,
+    REDACTED,
+    CassetteError,
+    HttpCassette,
+    make_http_cassette,
+    open_cassette_file,
+    redact_url,
+)
+from meetup2apricot.http_transport import HttpTransport
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.auth import HTTPDigestAuth
+import json
+import requests
+import threading
+import pytest
+
+
+class SampleHandler(BaseHTTPRequestHandler):
+
+    """Answers requests with their path and a counter."""
+
+    count = 0
+
+    def do_GET(self):
+        """Answer a GET request."""
+        SampleHandler.count += 1
+        body = f'{{"path": "{self.path}", "count": {SampleHandler.count}}}'
+        if self.path == "/token":
+            body = (
+                '{"access_token": "secret-a", "expires_in": 1800, '
+                '"Permissions": [{"refresh_token": "secret-r"}]}'
+            )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", f'"{SampleHandler.count}"')
+        self.send_header("Set-Cookie", "session=secret-c")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def do_PUT(self):
+        """Answer a PUT request with a digest authentication challenge, unless
+        it is authorized."""
+        self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Authorization"]:
+            self.send_response(201)
+        else:
+            self.send_response(401)
+            self.send_header(
+                "WWW-Authenticate", 'Digest realm="webdav", nonce="abc", qop="auth"'
+            )
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        """Log nothing."""
+
+
+@pytest.fixture()
+def server_url():
+    """Return the URL of a local web server running during a test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SampleHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["cassette.jsonl", "cassette.jsonl.gz"])
+def cassette_path(tmp_path, request):
+    """Return a path to a plain or compressed cassette file."""
+    return tmp_path / request.param
+
+
+def record_requests(cassette_path, urls):
+    """Record GET requests for some URLs. Return the response JSON."""
+    cassette = make_http_cassette(record_path=cassette_path)
+    session = cassette.mount(requests.Session())
+    return [session.get(url).json() for url in urls]
+
+
+def test_record_and_replay(server_url, cassette_path):
+    """Test replaying recorded responses in order."""
+    urls = [f"{server_url}/a", f"{server_url}/b", f"{server_url}/a?x=1"] * 2
+    recorded = record_requests(cassette_path, urls)
+    cassette = make_http_cassette(replay_path=cassette_path)
+    session = cassette.mount(requests.Session())
+    responses = [session.get(url) for url in urls]
+    assert [response.json() for response in responses] == recorded
+    assert responses[0].headers["etag"] == f'"{recorded[0]["count"]}"'
+    assert responses[0].status_code == 200
+    assert cassette.replay_count == len(urls)
+
+
+def test_record_through_pooled_adapter(server_url, cassette_path, mocker):
+    """Test recording requests sent through a transport's pooled adapter,
+    which reuses kept-alive connections."""
+    transport = HttpTransport()
+    send = mocker.spy(transport.adapter, "send")
+    cassette = make_http_cassette(record_path=cassette_path)
+    session = cassette.mount(transport.mount(requests.Session()))
+    for _ in range(3):
+        session.get(f"{server_url}/a")
+    assert send.call_count == 3
+    assert transport.adapter.connection_counts() == (1, 3)
+    replayed = make_http_cassette(replay_path=cassette_path)
+    replayed.mount(requests.Session()).get(f"{server_url}/a")
+    assert replayed.replay_count == 1
+
+
+def test_record_redacts_secrets(server_url, cassette_path):
+    """Test that tokens, cookies, and secret URL parameters are redacted from
+    the cassette file, and that replays match the redacted URLs."""
+    urls = [f"{server_url}/token", f"{server_url}/a?key=secret-k&x=1"]
+    recorded = record_requests(cassette_path, urls)
+    assert recorded[0]["access_token"] == "secret-a"
+    with open_cassette_file(cassette_path, "r") as f:
+        cassette_text = f.read()
+    assert "secret" not in cassette_text
+    session = make_http_cassette(replay_path=cassette_path).mount(requests.Session())
+    token = session.get(urls[0])
+    assert token.json() == {
+        "access_token": REDACTED,
+        "Permissions": [{"refresh_token": REDACTED}],
+        "expires_in": 1800,
+    }
+    assert token.headers["Set-Cookie"] == REDACTED
+    assert session.get(urls[1]).json() == recorded[1]
+
+
+def test_redact_url_unchanged():
+    """Test leaving a URL without secret parameters unchanged."""
+    url = "https://api.meetup.com/NOVA-Makers/events?page=200&scroll=recent_past"
+    assert redact_url(url) == url
+
+
+def test_replay_missing(server_url, cassette_path):
+    """Test replaying a request never recorded."""
+    record_requests(cassette_path, [f"{server_url}/a"])
+    session = make_http_cassette(replay_path=cassette_path).mount(requests.Session())
+    session.get(f"{server_url}/a")
+    with pytest.raises(CassetteError):
+        session.get(f"{server_url}/a")
+
+
+def test_replay_streaming(server_url, cassette_path):
+    """Test streaming the content of a replayed response."""
+    recorded = record_requests(cassette_path, [f"{server_url}/a"])
+    session = make_http_cassette(replay_path=cassette_path).mount(requests.Session())
+    response = session.get(f"{server_url}/a", stream=True)
+    content = b"".join(response.iter_content(4))
+    assert content == f'{{"path": "/a", "count": {recorded[0]["count"]}}}'.encode()
+
+
+@pytest.mark.parametrize(
+    ("latency", "expected_time"), [(None, 0), (0.5, 1.0), ("recorded", 3.0)]
+)
+def test_replay_latency(tmp_path, latency, expected_time):
+    """Test delaying replayed responses."""
+    cassette_path = tmp_path / "cassette.jsonl"
+    cassette_path.write_text(
+        '{"method":"GET","url":"http://x/","status":200,"reason":"OK",'
+        '"headers":{},"body":"","elapsed":1.5}\n' * 2
+    )
+    clock = VirtualClock()
+    cassette = HttpCassette(cassette_path, False, latency, clock)
+    cassette.start()
+    session = cassette.mount(requests.Session())
+    session.get("http://x/")
+    session.get("http://x/")
+    assert clock.time() == expected_time
+
+
+def test_replay_digest_auth(tmp_path):
+    """Test replaying a digest authentication challenge and retry."""
+    cassette_path = tmp_path / "cassette.jsonl"
+    challenge = (
+        'Digest realm=\\"webdav\\", nonce=\\"abc\\", qop=\\"auth\\", '
+        'algorithm=\\"MD5\\"'
+    )
+    cassette_path.write_text(
+        '{"method":"PUT","url":"https://x/photo.jpg","status":401,'
+        '"reason":"Unauthorized","headers":{"WWW-Authenticate":"'
+        + challenge
+        + '"},"body":"","elapsed":0}\n'
+        '{"method":"PUT","url":"https://x/photo.jpg","status":201,'
+        '"reason":"Created","headers":{},"body":"","elapsed":0}\n'
+    )
+    session = make_http_cassette(replay_path=cassette_path).mount(requests.Session())
+    session.auth = HTTPDigestAuth("user", "password")
+    response = session.put("https://x/photo.jpg", data=b"photo")
+    assert response.status_code == 201
+    assert response.request.headers["Authorization"].startswith("Digest ")
+
+
+def test_record_digest_auth(server_url, cassette_path):
+    """Test recording a digest authentication challenge and retry."""
+    cassette = make_http_cassette(record_path=cassette_path)
+    session = cassette.mount(HttpTransport().mount(requests.Session()))
+    session.auth = HTTPDigestAuth("user", "password")
+    assert session.put(f"{server_url}/photo.jpg", data=b"photo").status_code == 201
+    with open_cassette_file(cassette_path, "r") as f:
+        statuses = [json.loads(line)["status"] for line in f]
+    assert statuses == [401, 201]
+
+
+def test_null_cassette():
+    """Test leaving a session to use the network."""
+    assert make_http_cassette() is NULL_CASSETTE
+    session = requests.Session()
+    adapter = session.get_adapter("https://x/")
+    assert NULL_CASSETTE.mount(session) is session
+    assert session.get_adapter("https://x/") is adapter
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,93 @@
+"""Test sharing pooled connections among web sessions."""
+
+from meetup2apricot.http_transport import NULL_TRANSPORT, HttpTransport
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import requests
+import threading
+import pytest
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+
+    """Answers requests over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """Answer a GET request."""
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Log nothing."""
+
+
+@pytest.fixture()
+def server_url():
+    """Return the URL of a local keep-alive web server running during a
+    test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_mount():
+    """Test mounting one adapter on several sessions."""
+    transport = HttpTransport()
+    sessions = [transport.mount(requests.Session()) for _ in range(2)]
+    adapters = {id(session.get_adapter("https://example.com")) for session in sessions}
+    assert adapters == {id(transport.adapter)}
+
+
+def test_shared_connections(server_url, caplog):
+    """Test sessions reusing each other's kept-alive connections."""
+    caplog.set_level(logging.INFO)
+    transport = HttpTransport()
+    sessions = [transport.mount(requests.Session()) for _ in range(3)]
+    for session in sessions * 2:
+        assert session.get(server_url).text == "ok"
+    assert transport.adapter.connection_counts() == (1, 6)
+    transport.log_statistics()
+    assert "connections=1 requests=6 reused=5" in caplog.text
+
+
+def test_separate_connections(server_url):
+    """Test sessions without a shared transport opening their own
+    connections."""
+    sessions = [NULL_TRANSPORT.mount(requests.Session()) for _ in range(3)]
+    for session in sessions:
+        session.get(server_url)
+    adapters = {id(session.get_adapter(server_url)) for session in sessions}
+    assert len(adapters) == 3
+
+
+def test_default_timeout(mocker):
+    """Test applying the default timeout to requests sent without one."""
+    transport = HttpTransport(timeout=(3, 7))
+    send = mocker.patch("requests.adapters.HTTPAdapter.send")
+    request = requests.Request("GET", "https://example.com").prepare()
+    transport.adapter.send(request)
+    assert send.call_args.kwargs["timeout"] == (3, 7)
+    transport.adapter.send(request, timeout=1)
+    assert send.call_args.kwargs["timeout"] == 1
+
+
+def test_null_transport_statistics(caplog):
+    """Test logging nothing for a null transport."""
+    caplog.set_level(logging.INFO)
+    NULL_TRANSPORT.log_statistics()
+    assert caplog.text == ""
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -22,7 +22,7 @@ def initial_data_loader(mock_apricot_api, mock_meetup_api):
     """Return an initial data loader with mock APIs and no support functions."""
     return InitialDataLoader(
         meetup_api=mock_meetup_api,
-        apricot_api=mock_apricot_api,
+        apricot_api_provider=lambda: mock_apricot_api,
         transfer_meetup_ids=[],
         event_mapping_provider=None,
         photo_urls_provider=None,
@@ -36,6 +36,45 @@ def upcoming_meetup_events(free_meetup_event, paid_meetup_event):
     return [free_meetup_event, paid_meetup_event]
 
 
+def test_retrieve_upcoming_meetup_events(
+    initial_data_loader, mock_meetup_api, free_meetup_event_json, paid_meetup_event_json
+):
+    """Test converting upcoming events from Meetup's JSON."""
+    mock_meetup_api.iterate_events_json.return_value = iter(
+        [free_meetup_event_json, paid_meetup_event_json]
+    )
+    events = initial_data_loader.retreive_upcoming_meetup_events()
+    assert [event.name for event in events] == [
+        free_meetup_event_json["name"],
+        paid_meetup_event_json["name"],
+    ]
+
+
+def test_run_unchanged(initial_data_loader, mock_meetup_api, mocker):
+    """Test skipping a run when Meetup events are unchanged."""
+    mock_meetup_api.iterate_events_json.return_value = iter([])
+    initial_data_loader.meetup_events_cache = mocker.Mock(unchanged=True)
+    initial_data_loader.retrieve_membership_levels = mocker.Mock()
+    initial_data_loader.photo_urls_provider = mocker.Mock()
+    initial_data_loader.run()
+    initial_data_loader.retrieve_membership_levels.assert_not_called()
+
+
+def test_run_unchanged_prunes_photos(initial_data_loader, mock_meetup_api, mocker):
+    """Test pruning unused photos when Meetup events are unchanged."""
+    mock_meetup_api.iterate_events_json.return_value = iter([])
+    initial_data_loader.meetup_events_cache = mocker.Mock(unchanged=True)
+    photo_urls_to_paths = mocker.Mock()
+    initial_data_loader.photo_urls_provider = mocker.Mock(
+        return_value=photo_urls_to_paths
+    )
+    initial_data_loader.photo_usage = mocker.Mock()
+    initial_data_loader.run()
+    initial_data_loader.photo_usage.prune.assert_called_once_with(photo_urls_to_paths)
+    photo_urls_to_paths.persist.assert_called_once_with()
+    initial_data_loader.photo_usage.persist.assert_called_once_with()
+
+
 def test_select_events_to_transfer_no_ids(initial_data_loader, upcoming_meetup_events):
     """Test selecting all upcoming events when no Meetup IDs are specified."""
     selected_events = initial_data_loader.select_events_to_transfer(
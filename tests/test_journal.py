@@ -0,0 +1,123 @@
+"""Test mappings journaled to append-only files."""
+
+from meetup2apricot.journal import JournaledMapping, load_journaled_mapping
+import logging
+import pickle
+import pytest
+
+SNAPSHOT_FILE_NAME = "events.pickle"
+JOURNAL_FILE_NAME = "events.pickle.journal"
+
+
+@pytest.fixture()
+def snapshot_path(tmp_path):
+    """Return a path to a snapshot file."""
+    return tmp_path / SNAPSHOT_FILE_NAME
+
+
+@pytest.fixture()
+def mapping(snapshot_path):
+    """Return an empty journaled mapping."""
+    return load_journaled_mapping(snapshot_path, {}, batch_size=2)
+
+
+def test_load_default(snapshot_path):
+    """Test loading a mapping with no snapshot or journal."""
+    default = {None: None}
+    mapping = load_journaled_mapping(snapshot_path, default)
+    assert mapping == default
+    mapping["a"] = 1
+    assert default == {None: None}
+
+
+def test_load_pickle(snapshot_path):
+    """Test loading a mapping from a pickle file written before journaling."""
+    with snapshot_path.open("wb") as f:
+        pickle.dump({"a": 1}, f)
+    assert load_journaled_mapping(snapshot_path, {}) == {"a": 1}
+
+
+def test_changes_journaled_at_once(mapping, snapshot_path):
+    """Test that changes are loaded from the journal before persisting."""
+    mapping["a"] = 1
+    mapping["b"] = 2
+    mapping["c"] = 3
+    del mapping["b"]
+    assert load_journaled_mapping(snapshot_path, {}) == {"a": 1, "c": 3}
+    assert not snapshot_path.exists()
+
+
+def test_sync_in_batches(mapping, mocker):
+    """Test that journal entries are synced to disk in batches."""
+    fsync = mocker.patch("meetup2apricot.journal.os.fsync")
+    mapping["a"] = 1
+    assert fsync.call_count == 0
+    mapping["b"] = 2
+    assert fsync.call_count == 1
+    mapping["c"] = 3
+    mapping.sync()
+    assert fsync.call_count == 2
+
+
+def test_persist_without_compaction(snapshot_path):
+    """Test that persisting keeps the journal while it is smaller than the
+    mapping."""
+    mapping = JournaledMapping(snapshot_path, {"a": 1, "b": 2})
+    mapping.compact()
+    mapping["c"] = 3
+    mapping.persist()
+    assert (snapshot_path.parent / JOURNAL_FILE_NAME).exists()
+    assert load_journaled_mapping(snapshot_path, {}) == {"a": 1, "b": 2, "c": 3}
+
+
+def test_persist_with_compaction(mapping, snapshot_path):
+    """Test that persisting folds a journal as large as the mapping into a
+    snapshot."""
+    mapping["a"] = 1
+    mapping["a"] = 2
+    mapping.persist()
+    assert not (snapshot_path.parent / JOURNAL_FILE_NAME).exists()
+    with snapshot_path.open("rb") as f:
+        assert pickle.load(f) == {"a": 2}
+    mapping["b"] = 3
+    assert load_journaled_mapping(snapshot_path, {}) == {"a": 2, "b": 3}
+
+
+def test_replace(snapshot_path, mocker):
+    """Test replacing the contents, journaling only the differences."""
+    mapping = JournaledMapping(snapshot_path, {"a": 1, "b": 2, "c": 3})
+    mapping.compact()
+    mapping.replace({"a": 1, "b": 4, "d": 5})
+    assert mapping == {"a": 1, "b": 4, "d": 5}
+    assert mapping.entry_count == 3
+    assert load_journaled_mapping(snapshot_path, {}) == mapping
+
+
+def test_load_partial_entry(mapping, snapshot_path, caplog):
+    """Test dropping a partial journal entry left by a crash."""
+    caplog.set_level(logging.WARNING)
+    mapping["a"] = 1
+    mapping["b"] = 2
+    mapping.close()
+    journal_path = snapshot_path.parent / JOURNAL_FILE_NAME
+    good_size = journal_path.stat().st_size
+    with journal_path.open("ab") as f:
+        f.write(pickle.dumps(("set", "c", 3))[:-3])
+    loaded = load_journaled_mapping(snapshot_path, {})
+    assert loaded == {"a": 1, "b": 2}
+    assert journal_path.stat().st_size == good_size
+    assert "partial journal entry" in caplog.text
+    loaded["d"] = 4
+    assert load_journaled_mapping(snapshot_path, {}) == {"a": 1, "b": 2, "d": 4}
+
+
+def test_dryrun(snapshot_path):
+    """Test that a dry run changes the mapping but writes nothing."""
+    mapping = load_journaled_mapping(snapshot_path, {}, dryrun=True)
+    mapping["a"] = 1
+    mapping.persist()
+    assert mapping == {"a": 1}
+    assert list(snapshot_path.parent.iterdir()) == []
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,81 @@
+"""Test parsing JSON arrays incrementally."""
+
+from meetup2apricot.json_stream import JsonStreamError, iter_json_array
+import json
+import pytest
+
+SAMPLE_ARRAY = [
+    {"id": "abc", "name": "Laser [cutter] {class}", "description": "<p>Café</p>"},
+    {"id": "def", "time": 1604966400000, "featured": False, "venue": None},
+    12345,
+    'text, with "quotes"',
+    [1, [2, 3]],
+]
+SAMPLE_BYTES = json.dumps(SAMPLE_ARRAY, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def chunks_of(data, size):
+    """Return a list of chunks of some size split from data."""
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100000])
+def test_iter_json_array(chunk_size):
+    """Test parsing an array split into chunks of many sizes."""
+    chunks = chunks_of(SAMPLE_BYTES, chunk_size)
+    assert list(iter_json_array(chunks)) == SAMPLE_ARRAY
+
+
+def test_iter_json_array_lazily():
+    """Test yielding each element before reading the rest of the stream."""
+    chunks_read = []
+
+    def chunks():
+        for chunk in [b'[{"id": "a"},', b' {"id": "b"}]']:
+            chunks_read.append(chunk)
+            yield chunk
+
+    elements = iter_json_array(chunks())
+    assert next(elements) == {"id": "a"}
+    assert len(chunks_read) == 1
+
+
+def test_iter_json_array_decodes_once(mocker):
+    """Test decoding a large element split into many chunks only once."""
+    element = {"description": "x" * 10000, "tags": [["[", "{"], '"\\']}
+    data = json.dumps([element, 1]).encode("utf-8")
+    raw_decode = mocker.spy(json.JSONDecoder, "raw_decode")
+    assert list(iter_json_array(chunks_of(data, 10))) == [element, 1]
+    assert raw_decode.call_count == 2
+
+
+@pytest.mark.parametrize("data", [b"[]", b"  [ \n ] ", b"[\n]"])
+def test_iter_json_array_empty(data):
+    """Test parsing empty arrays."""
+    assert list(iter_json_array([data])) == []
+
+
+def test_iter_json_array_trailing_number():
+    """Test parsing a number split across chunks at the end of an array."""
+    assert list(iter_json_array([b"[1, 23", b"4]"])) == [1, 234]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"{}",
+        b'[{"id": 1}',
+        b'[{"id": 1} {"id": 2}]',
+        b"[1,",
+        b'[{"id"',
+        b'["a\\"]',
+    ],
+)
+def test_iter_json_array_invalid(data):
+    """Test rejecting streams without a complete JSON array."""
+    with pytest.raises(JsonStreamError):
+        list(iter_json_array(chunks_of(data, 3)))
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
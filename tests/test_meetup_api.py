@@ -1,11 +1,13 @@
 """Tests for Meetup API"""
 
 from meetup2apricot.meetup_api import MeetupApi
-from meetup2apricot.throttle import Throttle, OpenThrottle
+from meetup2apricot.throttle import AdaptiveThrottle, OpenThrottle
+from datetime import datetime
 import os
 import json
 import logging
 import requests
+import time
 from requests_toolbelt.utils import dump
 import pytest
 
@@ -31,7 +33,10 @@ def meetup_api():
 @pytest.fixture()
 def mock_session(mocker):
     """Return a mock session."""
+    mock_response = mocker.Mock()
+    mock_response.headers = {}
     mock_session = mocker.Mock()
+    mock_session.get = mocker.Mock(return_value=mock_response)
     return mock_session
 
 
@@ -93,17 +98,71 @@ def test_build_url_two():
     assert retriever.build_url("events", "1234") == "https://api.meetup.com/events/1234"
 
 
+def test_build_url_api_url():
+    """Test building a URL with a replacement base URL."""
+    retriever = MeetupApi(
+        None, None, "foo_name", MEETUP_EVENTS_WANTED, api_url="http://localhost/m"
+    )
+    assert retriever.build_url("events") == "http://localhost/m/events"
+
+
+def test_request_params_page_size_limit():
+    """Test limiting the page size to Meetup's maximum."""
+    retriever = MeetupApi(None, None, "foo_name", 500)
+    assert retriever.request_params()["page"] == 200
+
+
 def test_request_params():
     """Test building a request parameter dictionary."""
     retriever = MeetupApi(None, None, "foo_name", MEETUP_EVENTS_WANTED)
     expected_params = {
         "page": MEETUP_EVENTS_WANTED,
         "fields": "featured,featured_photo",
+        "only": (
+            "description,duration,featured,featured_photo,fee,how_to_find_us,"
+            "link,id,name,rsvp_limit,time,status,venue"
+        ),
         "scroll": "recent_past",
     }
     assert retriever.request_params() == expected_params
 
 
+def test_request_params_start_time_window():
+    """Test asking for events within a start time window."""
+    retriever = MeetupApi(
+        None,
+        None,
+        "foo_name",
+        MEETUP_EVENTS_WANTED,
+        earliest_start_time=datetime.fromisoformat("2020-11-10 00:00 -05:00"),
+        latest_start_time=datetime.fromisoformat("2020-12-31 23:59 -05:00"),
+    )
+    params = retriever.request_params()
+    assert params["no_earlier_than"] == "2020-11-09T00:00:00.000"
+    assert params["no_later_than"] == "2021-01-01T23:59:00.000"
+
+
+@pytest.mark.parametrize("timezone", ["UTC", "America/New_York", "Asia/Tokyo"])
+def test_request_params_start_time_window_keeps_offset(timezone, monkeypatch):
+    """Test that the start time window keeps the configured offset whatever
+    the host's timezone."""
+    monkeypatch.setenv("TZ", timezone)
+    time.tzset()
+    try:
+        retriever = MeetupApi(
+            None,
+            None,
+            "foo_name",
+            MEETUP_EVENTS_WANTED,
+            earliest_start_time=datetime.fromisoformat("2020-11-10 23:00 +09:00"),
+        )
+        params = retriever.request_params()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert params["no_earlier_than"] == "2020-11-09T23:00:00.000"
+
+
 def test_retrieve_status_request_interaction(
     meetup_api_for_status, mock_session_for_status
 ):
@@ -138,15 +197,30 @@ def test_make_throttle(meetup_api, mocker):
     sample_response = mocker.Mock()
     sample_response.headers = SAMPLE_STATUS_RESPONSE_HEADERS
     throttle = meetup_api.make_throttle(sample_response)
-    assert type(throttle) == Throttle
+    assert type(throttle) == AdaptiveThrottle
     assert throttle.rate == 20
     assert throttle.time_span == 10
 
 
+def test_make_throttle_reserve(mocker):
+    """Test making a throttle that holds a reserve for requests in flight."""
+    sample_response = mocker.Mock()
+    sample_response.headers = SAMPLE_STATUS_RESPONSE_HEADERS
+    meetup_api = MeetupApi(
+        mocker.Mock(),
+        OpenThrottle(),
+        SAMPLE_GROUP_NAME,
+        MEETUP_EVENTS_WANTED,
+        requests_in_flight=4,
+    )
+    throttle = meetup_api.make_throttle(sample_response)
+    assert throttle.reserve == 4
+
+
 def test_make_meetup_api_throttle(meetup_api_for_status):
     """Test the making a throttle."""
     throttle = meetup_api_for_status.make_meetup_api_throttle()
-    assert type(throttle) == Throttle
+    assert type(throttle) == AdaptiveThrottle
     assert throttle.rate == 20
     assert throttle.time_span == 10
 
@@ -155,7 +229,8 @@ def test_retrieve_event_interaction(mock_session, meetup_api_mock_session):
     """Test interaction with Requests when requesting an event."""
     meetup_api_mock_session.retrieve_event_json("12345")
     mock_session.get.assert_called_once_with(
-        "https://api.meetup.com/Nova-Labs/events/12345"
+        "https://api.meetup.com/Nova-Labs/events/12345",
+        params=meetup_api_mock_session.event_params(),
     )
 
 
@@ -163,6 +238,7 @@ def test_retrieve_event_success(mock_session, meetup_api_mock_session, mocker):
     """Test retrieving an existing event from Meetup."""
     mock_response = mocker.Mock()
     mock_response.status_code = 200
+    mock_response.headers = {}
     mock_response.json = mocker.Mock(return_value="foo")
     mock_session.get = mocker.Mock(return_value=mock_response)
     assert meetup_api_mock_session.retrieve_event_json("12345") == "foo"
@@ -172,10 +248,184 @@ def test_retrieve_event_not_found(mock_session, meetup_api_mock_session, mocker)
     """Test retrieving a missing event from Meetup."""
     mock_response = mocker.Mock()
     mock_response.status_code = 404
+    mock_response.headers = {}
     mock_session.get = mocker.Mock(return_value=mock_response)
     assert meetup_api_mock_session.retrieve_event_json("12345") == None
 
 
+def mock_events_response(mocker, events, next_url=None):
+    """Return a mock response containing a page of events and an optional
+    link to the next page."""
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.json = mocker.Mock(return_value=events)
+    mock_response.links = {"next": {"url": next_url}} if next_url else {}
+    return mock_response
+
+
+def test_iterate_events_one_page(mock_session, mocker):
+    """Test iterating over events on a single page."""
+    mock_session.get = mocker.Mock(
+        return_value=mock_events_response(mocker, ["a", "b"])
+    )
+    meetup_api = MeetupApi(mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 10)
+    assert list(meetup_api.iterate_events_json()) == ["a", "b"]
+    mock_session.get.assert_called_once_with(
+        "https://api.meetup.com/Nova-Labs/events",
+        params=meetup_api.request_params(),
+        headers={},
+    )
+
+
+def test_iterate_events_following_links(mock_session, mocker):
+    """Test following links to later pages of events."""
+    mock_session.get = mocker.Mock(
+        side_effect=[
+            mock_events_response(mocker, ["a", "b"], "https://next/2"),
+            mock_events_response(mocker, ["c", "d"], "https://next/3"),
+            mock_events_response(mocker, ["e"]),
+        ]
+    )
+    meetup_api = MeetupApi(mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 10)
+    assert list(meetup_api.iterate_events_json()) == ["a", "b", "c", "d", "e"]
+    assert mock_session.get.call_args_list[1] == mocker.call("https://next/2")
+    assert mock_session.get.call_args_list[2] == mocker.call("https://next/3")
+
+
+def test_iterate_events_wanted(mock_session, mocker):
+    """Test stopping after the number of events wanted."""
+    mock_session.get = mocker.Mock(
+        side_effect=[
+            mock_events_response(mocker, ["a", "b"], "https://next/2"),
+            mock_events_response(mocker, ["c", "d"], "https://next/3"),
+        ]
+    )
+    meetup_api = MeetupApi(mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 3)
+    assert list(meetup_api.iterate_events_json()) == ["a", "b", "c"]
+    assert mock_session.get.call_count == 2
+
+
+def test_iterate_events_lazily(mock_session, mocker):
+    """Test requesting later pages only as events are consumed."""
+    mock_session.get = mocker.Mock(
+        side_effect=[
+            mock_events_response(mocker, ["a"], "https://next/2"),
+            mock_events_response(mocker, ["b"]),
+        ]
+    )
+    meetup_api = MeetupApi(mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 10)
+    events = meetup_api.iterate_events_json()
+    assert next(events) == "a"
+    assert mock_session.get.call_count == 1
+
+
+def test_iterate_events_streaming(mock_session, mocker):
+    """Test parsing events as they stream in."""
+    mock_response = mock_events_response(mocker, None)
+    mock_response.iter_content = mocker.Mock(
+        return_value=iter([b'[{"id": "a"}, {"id"', b': "b"}, {"id": "c"}]'])
+    )
+    mock_session.get = mocker.Mock(return_value=mock_response)
+    meetup_api = MeetupApi(
+        mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 2, stream_json=True
+    )
+    assert list(meetup_api.iterate_events_json()) == [{"id": "a"}, {"id": "b"}]
+    assert mock_session.get.call_args.kwargs["stream"]
+    mock_response.json.assert_not_called()
+    mock_response.close.assert_called_once_with()
+
+
+def test_iterate_events_conditional(mock_session, mocker):
+    """Test asking for events only if they changed since they were cached."""
+    mock_session.get = mocker.Mock(return_value=mock_events_response(mocker, ["a"]))
+    events_cache = mocker.Mock()
+    events_cache.conditional_headers.return_value = {"If-None-Match": '"abc"'}
+    events_cache.is_not_modified.return_value = False
+    meetup_api = MeetupApi(
+        mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 10, events_cache=events_cache
+    )
+    assert list(meetup_api.iterate_events_json()) == ["a"]
+    assert mock_session.get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+    events_cache.update.assert_called_once_with(
+        mock_session.get.return_value, complete=True
+    )
+
+
+def test_iterate_events_not_modified(mock_session, mocker):
+    """Test yielding no events and noting they are unchanged when Meetup
+    reports so."""
+    mock_response = mocker.Mock()
+    mock_response.status_code = 304
+    mock_response.headers = {}
+    mock_session.get = mocker.Mock(return_value=mock_response)
+    events_cache = mocker.Mock()
+    events_cache.conditional_headers.return_value = {}
+    events_cache.is_not_modified.return_value = True
+    meetup_api = MeetupApi(
+        mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 10, events_cache=events_cache
+    )
+    assert list(meetup_api.iterate_events_json()) == []
+    events_cache.note_unchanged.assert_called_once_with()
+    mock_response.json.assert_not_called()
+    mock_response.close.assert_called_once_with()
+    events_cache.update.assert_not_called()
+
+
+def test_iterate_events_several_pages_not_cached(mock_session, mocker):
+    """Test that an event list spanning several pages is not cached."""
+    mock_session.get = mocker.Mock(
+        side_effect=[
+            mock_events_response(mocker, ["a"], "https://next/2"),
+            mock_events_response(mocker, ["b"]),
+        ]
+    )
+    events_cache = mocker.Mock()
+    events_cache.conditional_headers.return_value = {}
+    events_cache.is_not_modified.return_value = False
+    meetup_api = MeetupApi(
+        mock_session, OpenThrottle(), SAMPLE_GROUP_NAME, 10, events_cache=events_cache
+    )
+    assert list(meetup_api.iterate_events_json()) == ["a", "b"]
+    assert not events_cache.update.call_args.kwargs["complete"]
+
+
+def test_adapt_throttle(mocker):
+    """Test adapting a throttle to Meetup API response rate limits."""
+    mock_throttle = mocker.Mock()
+    meetup_api = MeetupApi(None, mock_throttle, "foo_name", MEETUP_EVENTS_WANTED)
+    sample_response = mocker.Mock()
+    sample_response.headers = SAMPLE_STATUS_RESPONSE_HEADERS
+    meetup_api.adapt_throttle(sample_response)
+    mock_throttle.adapt.assert_called_once_with(29, 10)
+
+
+def test_adapt_throttle_no_headers(mocker):
+    """Test ignoring a Meetup API response without rate limits."""
+    mock_throttle = mocker.Mock()
+    meetup_api = MeetupApi(None, mock_throttle, "foo_name", MEETUP_EVENTS_WANTED)
+    sample_response = mocker.Mock()
+    sample_response.headers = {}
+    meetup_api.adapt_throttle(sample_response)
+    mock_throttle.adapt.assert_not_called()
+
+
+def test_retrieve_event_adapts_throttle(mocker):
+    """Test adapting the throttle after retrieving an event."""
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.headers = SAMPLE_STATUS_RESPONSE_HEADERS
+    mock_session = mocker.Mock()
+    mock_session.get = mocker.Mock(return_value=mock_response)
+    mock_throttle = mocker.Mock()
+    meetup_api = MeetupApi(
+        mock_session, mock_throttle, SAMPLE_GROUP_NAME, MEETUP_EVENTS_WANTED
+    )
+    meetup_api.retrieve_event_json("12345")
+    mock_throttle.throttle.assert_called_once_with()
+    mock_throttle.adapt.assert_called_once_with(29, 10)
+
+
 def test_retrieve_event(module_file_path, meetup_api):
     """Save response from an individual event request to Meetup."""
     event_id = os.getenv("MEETUP_EVENT_ID")
@@ -1,7 +1,7 @@
 """Test Meetup event retrievers."""
 
 from meetup2apricot.meetup_event_retriever import MeetupEventRetriever
-
+import threading
 import pytest
 
 CACHED_EVENT_ID = "pfsbvrybcpbmb"
@@ -65,4 +65,72 @@ def test_get_event_uncached(
     mock_meetup_api.retrieve_event_json.assert_called_once_with(UNCACHED_EVENT_ID)
 
 
+def test_prefetch_events(
+    meetup_event_retriever, mock_meetup_api, paid_meetup_event_json, mocker
+):
+    """Test prefetching missing events once each."""
+    mock_meetup_api.retrieve_event_json = mocker.Mock(
+        side_effect=lambda meetup_id: (
+            paid_meetup_event_json if meetup_id == UNCACHED_EVENT_ID else None
+        )
+    )
+    meetup_event_retriever.prefetch_events(
+        [CACHED_EVENT_ID, UNCACHED_EVENT_ID, MISSING_EVENT_ID, UNCACHED_EVENT_ID]
+    )
+    assert mock_meetup_api.retrieve_event_json.call_count == 2
+    mock_meetup_api.retrieve_event_json.reset_mock()
+    assert meetup_event_retriever.get_event(UNCACHED_EVENT_ID).name == (
+        paid_meetup_event_json["name"]
+    )
+    assert meetup_event_retriever.get_event(MISSING_EVENT_ID) is None
+    mock_meetup_api.retrieve_event_json.assert_not_called()
+
+
+def test_prefetch_events_concurrently(mock_meetup_api, mocker):
+    """Test prefetching events with concurrent workers."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def retrieve_event_json(meetup_id):
+        barrier.wait()
+        return {"id": meetup_id, "status": "upcoming"}
+
+    mock_meetup_api.retrieve_event_json = mocker.Mock(side_effect=retrieve_event_json)
+    retriever = MeetupEventRetriever(mock_meetup_api, [], max_workers=3)
+    retriever.prefetch_events(["a", "b", "c"])
+    assert [retriever.get_event(meetup_id).meetup_id for meetup_id in "abc"] == [
+        "a",
+        "b",
+        "c",
+    ]
+
+
+def test_prefetch_events_none_missing(meetup_event_retriever, mock_meetup_api):
+    """Test prefetching only available events."""
+    meetup_event_retriever.prefetch_events([CACHED_EVENT_ID])
+    mock_meetup_api.retrieve_event_json.assert_not_called()
+
+
+def test_get_event_dead(mock_meetup_api, mocker):
+    """Test skipping an event recently found dead."""
+    dead_event_cache = mocker.Mock()
+    dead_event_cache.is_dead.return_value = True
+    retriever = MeetupEventRetriever(
+        mock_meetup_api, [], dead_event_cache=dead_event_cache
+    )
+    assert retriever.get_event(MISSING_EVENT_ID) is None
+    mock_meetup_api.retrieve_event_json.assert_not_called()
+
+
+def test_get_event_newly_dead(mock_meetup_api, mocker):
+    """Test remembering an event newly found dead."""
+    dead_event_cache = mocker.Mock()
+    dead_event_cache.is_dead.return_value = False
+    mock_meetup_api.retrieve_event_json = mocker.Mock(return_value=None)
+    retriever = MeetupEventRetriever(
+        mock_meetup_api, [], dead_event_cache=dead_event_cache
+    )
+    assert retriever.get_event(MISSING_EVENT_ID) is None
+    dead_event_cache.add.assert_called_once_with(MISSING_EVENT_ID)
+
+
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
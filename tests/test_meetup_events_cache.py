@@ -0,0 +1,111 @@
+"""Test the Meetup events cache."""
+
+from meetup2apricot.meetup_events_cache import (
+    MeetupEventsCache,
+    load_meetup_events_cache,
+)
+import pickle
+import pytest
+
+SAMPLE_SETTINGS = ("2021-01-01", "2021-12-31")
+
+
+@pytest.fixture()
+def cache_path(tmp_path):
+    """Return a path to a Meetup events cache file."""
+    return tmp_path / "meetup_events.pickle"
+
+
+def mock_response(mocker, status_code=200, headers=None):
+    """Return a mock response with a status code and headers."""
+    response = mocker.Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+def test_empty_cache_headers(cache_path):
+    """Test that an empty cache makes requests unconditional."""
+    events_cache = load_meetup_events_cache(cache_path, SAMPLE_SETTINGS)
+    assert events_cache.conditional_headers() == {}
+
+
+def test_empty_cache_not_modified(cache_path, mocker):
+    """Test that an empty cache ignores a 304 response."""
+    events_cache = load_meetup_events_cache(cache_path, SAMPLE_SETTINGS)
+    assert not events_cache.is_not_modified(mock_response(mocker, 304))
+
+
+def test_persist_and_load(cache_path, mocker):
+    """Test caching validators between runs."""
+    events_cache = MeetupEventsCache(cache_path, SAMPLE_SETTINGS)
+    headers = {"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    events_cache.update(mock_response(mocker, headers=headers), complete=True)
+    events_cache.persist()
+    loaded_cache = load_meetup_events_cache(cache_path, SAMPLE_SETTINGS)
+    assert loaded_cache.conditional_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert loaded_cache.is_not_modified(mock_response(mocker, 304))
+    assert not loaded_cache.is_not_modified(mock_response(mocker, 200))
+    assert not loaded_cache.unchanged
+    loaded_cache.note_unchanged()
+    assert loaded_cache.unchanged
+
+
+def test_persist_validators_only(cache_path, mocker):
+    """Test that the cache file holds only the settings and validators."""
+    events_cache = MeetupEventsCache(cache_path, SAMPLE_SETTINGS)
+    events_cache.update(mock_response(mocker, headers={"ETag": "x"}), complete=True)
+    events_cache.persist()
+    with cache_path.open("rb") as f:
+        assert pickle.load(f) == {
+            "settings": SAMPLE_SETTINGS,
+            "etag": "x",
+            "last_modified": None,
+        }
+
+
+def test_load_changed_settings(cache_path, mocker):
+    """Test ignoring validators cached with different settings."""
+    events_cache = MeetupEventsCache(cache_path, SAMPLE_SETTINGS)
+    events_cache.update(mock_response(mocker, headers={"ETag": "x"}), complete=True)
+    events_cache.persist()
+    loaded_cache = load_meetup_events_cache(cache_path, ("2022-01-01", "2022-12-31"))
+    assert loaded_cache.conditional_headers() == {}
+
+
+def test_update_without_validators(cache_path, mocker):
+    """Test that a response without validators caches nothing."""
+    events_cache = MeetupEventsCache(cache_path, SAMPLE_SETTINGS)
+    events_cache.update(mock_response(mocker), complete=True)
+    assert events_cache.conditional_headers() == {}
+
+
+def test_persist_nothing_removes_file(cache_path, mocker):
+    """Test removing the cache file when nothing is cached."""
+    cache_path.write_bytes(b"old")
+    events_cache = MeetupEventsCache(cache_path, SAMPLE_SETTINGS)
+    events_cache.update(mock_response(mocker, headers={"ETag": "x"}), complete=False)
+    events_cache.persist()
+    assert not cache_path.exists()
+
+
+def test_persist_dryrun(cache_path, mocker):
+    """Test that a dry run caches nothing."""
+    events_cache = MeetupEventsCache(cache_path, SAMPLE_SETTINGS, dryrun=True)
+    events_cache.update(mock_response(mocker, headers={"ETag": "x"}), complete=True)
+    events_cache.persist()
+    assert not cache_path.exists()
+
+
+def test_load_corrupt(cache_path, caplog):
+    """Test ignoring a corrupt cache file."""
+    cache_path.write_bytes(b"not a pickle")
+    events_cache = load_meetup_events_cache(cache_path, SAMPLE_SETTINGS)
+    assert events_cache.conditional_headers() == {}
+    assert "Cannot load Meetup events cache" in caplog.text
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -1,6 +1,6 @@
 """Test the Meetup to Wild Apricot event adaptor."""
 
-from meetup2apricot.meetup_event import MeetupEvent
+from meetup2apricot.meetup_event import EVENT_FIELDS, MeetupEvent
 from meetup2apricot.meetup_to_apricot_event_adaptor import MeetupToApricotEventAdaptor
 from .sample_apricot_json import (
     EXPECTED_FREE_EVENT_JSON,
@@ -129,4 +129,59 @@ def test_for_json_paid(paid_event_adaptor):
     assert paid_event_adaptor.for_json() == EXPECTED_PAID_EVENT_JSON
 
 
+class KeyRecordingDict(dict):
+
+    """Records the keys read from a dictionary."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize like a dictionary with no keys read."""
+        super().__init__(*args, **kwargs)
+        self.keys_read = set()
+
+    def __getitem__(self, key):
+        """Record a key and return its value."""
+        self.keys_read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        """Record a key and return its value or a default."""
+        self.keys_read.add(key)
+        return super().get(key, default)
+
+
+def read_all_event_fields(event_json):
+    """Read all of the fields of Meetup event JSON used to make a Wild Apricot
+    event."""
+    meetup_event = MeetupEvent(event_json)
+    for name, value in vars(MeetupEvent).items():
+        if isinstance(value, property):
+            getattr(meetup_event, name)
+    return MeetupToApricotEventAdaptor(
+        meetup_event, EXPECTED_FREE_PHOTO_PATH, EXPECTED_TAGS
+    ).for_json()
+
+
+@pytest.mark.parametrize(
+    "event_json_fixture", ["free_meetup_event_json", "paid_meetup_event_json"]
+)
+def test_event_fields_cover_keys_read(event_json_fixture, request):
+    """Test that the fields requested from Meetup include every field read."""
+    event_json = KeyRecordingDict(request.getfixturevalue(event_json_fixture))
+    read_all_event_fields(event_json)
+    assert event_json.keys_read <= set(EVENT_FIELDS)
+
+
+@pytest.mark.parametrize(
+    "event_json_fixture", ["free_meetup_event_json", "paid_meetup_event_json"]
+)
+def test_event_fields_projection(event_json_fixture, request):
+    """Test that events with only the requested fields convert the same."""
+    event_json = request.getfixturevalue(event_json_fixture)
+    projected_json = {
+        key: value for (key, value) in event_json.items() if key in EVENT_FIELDS
+    }
+    assert len(projected_json) < len(event_json)
+    assert read_all_event_fields(projected_json) == read_all_event_fields(event_json)
+
+
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
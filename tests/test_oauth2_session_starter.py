@@ -1,5 +1,6 @@
 """Test starting an OAuth2 web session."""
 
+from meetup2apricot.http_transport import HttpTransport
 from meetup2apricot.oauth2_session_starter import (
     Oauth2SessionStarter,
     Oauth2SessionStarterError,
@@ -20,6 +21,16 @@ def test_create_session():
     assert isinstance(session, OAuth2Session)
 
 
+def test_create_session_transport():
+    """Test mounting a shared transport on a new OAuth2 session."""
+    transport = HttpTransport()
+    starter = Oauth2SessionStarter(
+        "a_client_id", "a_client_secret", "a_token_url", transport=transport
+    )
+    session = starter.create_session()
+    assert session.get_adapter("https://example.com") is transport.adapter
+
+
 def test_set_user_agent():
     """Test that the user agent header is set."""
     starter = Oauth2SessionStarter(
@@ -1,10 +1,10 @@
 """Test the photo cache."""
 
+from meetup2apricot.journal import JournaledMapping
 from meetup2apricot.photo_cache import PhotoCache, load_cached_photo_urls
 from meetup2apricot.reporter import NullReporter
 from datetime import datetime
 from pathlib import Path, PurePosixPath, PosixPath
-import pickle
 import pytest
 
 SAMPLE_DATE = datetime.fromisoformat("2020-11-09 18:30 -05:00")
@@ -37,10 +37,9 @@ def photo_cache(mock_photo_retriever, mock_photo_uploader, tmp_path):
     """Return a photo cache."""
     return PhotoCache(
         apricot_directory=SAMPLE_APRICOT_DIRECTORY,
-        urls_to_paths=INITIAL_CACHE.copy(),
+        urls_to_paths=JournaledMapping(tmp_path / CACHE_FILE_NAME, INITIAL_CACHE),
         photo_retriever=mock_photo_retriever,
         photo_uploader=mock_photo_uploader,
-        cache_path=tmp_path / CACHE_FILE_NAME,
         reporter=NullReporter(),
     )
 
@@ -129,21 +128,46 @@ def test_cache_photo_share(
     )
 
 
+def test_load_cached_photo_urls(
+    photo_cache, free_meetup_event, mock_photo_uploader, tmp_path, mocker
+):
+    """Test loading cached photo data journaled as photos are cached."""
+    mock_photo_uploader.upload_photo = mocker.Mock(return_value="/photos/new.jpeg")
+    photo_cache.urls_to_paths.compact()
+    photo_cache.cache_photo(free_meetup_event)
+    data_path = tmp_path / CACHE_FILE_NAME
+    urls_to_paths = load_cached_photo_urls(data_path)
+    assert urls_to_paths == {
+        **INITIAL_CACHE,
+        free_meetup_event.photo_url: "/photos/new.jpeg",
+    }
+
+
 def test_persist(photo_cache, tmp_path):
     """Test persisting the photo cache."""
+    photo_cache.urls_to_paths.replace({None: None})
     photo_cache.persist()
     data_path = tmp_path / CACHE_FILE_NAME
-    with data_path.open("rb") as data_file:
-        cached_data = pickle.load(data_file)
-    assert cached_data == INITIAL_CACHE
+    assert data_path.exists()
+    assert load_cached_photo_urls(data_path) == {None: None}
 
 
-def test_load_cached_photo_urls(photo_cache, tmp_path):
-    """Test loading cached photo data."""
+def test_cache_photo_touches_usage(
+    photo_cache, free_meetup_event, mock_photo_uploader, mocker
+):
+    """Test that caching a photo records its use."""
+    mock_photo_uploader.upload_photo = mocker.Mock(return_value="/photos/new.jpeg")
+    photo_cache.photo_usage = mocker.Mock()
+    photo_cache.cache_photo(free_meetup_event)
+    photo_cache.photo_usage.touch.assert_called_once_with(free_meetup_event.photo_url)
+
+
+def test_persist_prunes_usage(photo_cache, mocker):
+    """Test that persisting the photo cache prunes unused photos first."""
+    photo_cache.photo_usage = mocker.Mock()
     photo_cache.persist()
-    data_path = tmp_path / CACHE_FILE_NAME
-    urls_to_paths = load_cached_photo_urls(data_path)
-    assert urls_to_paths == INITIAL_CACHE
+    photo_cache.photo_usage.prune.assert_called_once_with(photo_cache.urls_to_paths)
+    photo_cache.photo_usage.persist.assert_called_once_with()
 
 
 def test_load_cached_photo_urls_no_prior(tmp_path):
@@ -0,0 +1,216 @@
+"""Test recording photo use and pruning unused photos."""
+
+from meetup2apricot.clock import VirtualClock
+from meetup2apricot.journal import JournaledMapping
+from meetup2apricot.photo_usage import (
+    TOUCH_INTERVAL,
+    PhotoUsage,
+    load_cached_photo_last_used,
+)
+from meetup2apricot.sqlite_store import (
+    SqlitePhotoMapping,
+    SqlitePhotoUsageMapping,
+    SqliteStore,
+)
+from pathlib import PurePosixPath
+import pytest
+
+TIME_TO_LIVE = 10 * TOUCH_INTERVAL
+MAX_PHOTOS = 2
+
+URL_1 = "http://example.com/photo/1.jpeg"
+URL_2 = "http://example.com/photo/2.jpeg"
+URL_3 = "http://example.com/photo/3.jpeg"
+PATH_1 = PurePosixPath("/resources/photos/one.jpeg")
+PATH_2 = PurePosixPath("/resources/photos/two.jpeg")
+PATH_3 = PurePosixPath("/resources/photos/three.jpeg")
+
+
+@pytest.fixture()
+def cache_path(tmp_path):
+    """Return a path to a photo usage cache file."""
+    return tmp_path / "photo_usage.pickle"
+
+
+@pytest.fixture()
+def clock():
+    """Return a virtual clock."""
+    return VirtualClock(1000000)
+
+
+@pytest.fixture()
+def photo_usage(cache_path, clock):
+    """Return photo usage with nothing recorded."""
+    return PhotoUsage(
+        JournaledMapping(cache_path), TIME_TO_LIVE, MAX_PHOTOS, clock=clock
+    )
+
+
+@pytest.fixture()
+def urls_to_paths():
+    """Return a mapping of Meetup photo URLs to Wild Apricot photo paths."""
+    return {None: None, URL_1: PATH_1, URL_2: PATH_2, URL_3: PATH_3}
+
+
+@pytest.fixture()
+def photo_directory(tmp_path):
+    """Return a local photo directory holding the cached photos, a photo
+    kept for manual upload, and cache files."""
+    photo_directory = tmp_path / "photos"
+    photo_directory.mkdir()
+    for name in ("one.jpeg", "two.jpeg", "three.jpeg", "manual.png", "photos.pickle"):
+        (photo_directory / name).write_bytes(b"photo")
+    return photo_directory
+
+
+def local_names(photo_directory):
+    """Return the sorted names of the files in a local photo directory."""
+    return sorted(path.name for path in photo_directory.iterdir())
+
+
+def test_touch_none(photo_usage):
+    """Test that the photo URL None is not recorded."""
+    photo_usage.touch(None)
+    assert dict(photo_usage.last_used) == {}
+
+
+def test_touch_within_interval(photo_usage, clock):
+    """Test that using a photo again within the touch interval records
+    nothing."""
+    photo_usage.touch(URL_1)
+    first_use = clock.time()
+    clock.sleep(TOUCH_INTERVAL - 1)
+    photo_usage.touch(URL_1)
+    assert photo_usage.last_used[URL_1] == first_use
+    assert photo_usage.last_used.entry_count == 1
+    clock.sleep(1)
+    photo_usage.touch(URL_1)
+    assert photo_usage.last_used[URL_1] == clock.time()
+
+
+def test_evict_expired(photo_usage, urls_to_paths, clock):
+    """Test evicting photos unused for longer than the time to live."""
+    photo_usage.touch(URL_1)
+    clock.sleep(TIME_TO_LIVE + 1)
+    photo_usage.touch(URL_2)
+    del urls_to_paths[URL_3]
+    assert photo_usage.evict(urls_to_paths) == [PATH_1]
+    assert urls_to_paths == {None: None, URL_2: PATH_2}
+    assert dict(photo_usage.last_used) == {URL_2: clock.time()}
+
+
+def test_evict_least_recently_used(photo_usage, urls_to_paths, clock):
+    """Test evicting the least recently used photos beyond the maximum
+    count."""
+    for photo_url in (URL_2, URL_1, URL_3):
+        photo_usage.touch(photo_url)
+        clock.sleep(TOUCH_INTERVAL)
+    assert photo_usage.evict(urls_to_paths) == [PATH_2]
+    assert urls_to_paths == {None: None, URL_1: PATH_1, URL_3: PATH_3}
+
+
+def test_evict_unrecorded_counts_as_used_now(photo_usage, urls_to_paths, clock):
+    """Test that photos cached before their use was recorded count as used
+    now, and that uses of photos no longer cached are forgotten."""
+    photo_usage.last_used[URL_1] = clock.time() - TIME_TO_LIVE - 1
+    photo_usage.last_used["http://example.com/gone.jpeg"] = clock.time()
+    photo_usage.max_photos = 10
+    photo_usage.evict(urls_to_paths)
+    assert urls_to_paths == {None: None, URL_2: PATH_2, URL_3: PATH_3}
+    assert dict(photo_usage.last_used) == {URL_2: clock.time(), URL_3: clock.time()}
+
+
+def test_evict_no_limits(photo_usage, urls_to_paths, clock):
+    """Test evicting no photos when neither limit is set."""
+    photo_usage.time_to_live = None
+    photo_usage.max_photos = None
+    for photo_url in (URL_2, URL_1, URL_3):
+        photo_usage.touch(photo_url)
+        clock.sleep(TIME_TO_LIVE + 1)
+    assert photo_usage.evict(urls_to_paths) == []
+    assert len(urls_to_paths) == 4
+
+
+def test_evict_sqlite(tmp_path, clock):
+    """Test evicting photos whose paths and last used times share a SQLite
+    table."""
+    store = SqliteStore(tmp_path / "meetup2apricot.db")
+    store.open()
+    urls_to_paths = SqlitePhotoMapping(store)
+    urls_to_paths.insert_all({URL_1: PATH_1, URL_2: PATH_2, URL_3: PATH_3})
+    photo_usage = PhotoUsage(
+        SqlitePhotoUsageMapping(store), TIME_TO_LIVE, MAX_PHOTOS, clock=clock
+    )
+    photo_usage.touch(URL_2)
+    clock.sleep(TOUCH_INTERVAL)
+    photo_usage.touch(URL_1)
+    photo_usage.touch(URL_3)
+    assert photo_usage.evict(urls_to_paths) == [PATH_2]
+    assert dict(urls_to_paths) == {URL_1: PATH_1, URL_3: PATH_3}
+    assert dict(photo_usage.last_used) == {URL_1: clock.time(), URL_3: clock.time()}
+    store.close()
+
+
+def test_prune_deletes_evicted_photos(
+    photo_usage, urls_to_paths, photo_directory, clock
+):
+    """Test deleting the local files of evicted photos only."""
+    photo_usage.photo_directory = photo_directory
+    photo_usage.last_used[URL_3] = clock.time() - TIME_TO_LIVE - 1
+    photo_usage.prune(urls_to_paths)
+    assert local_names(photo_directory) == [
+        "manual.png",
+        "one.jpeg",
+        "photos.pickle",
+        "two.jpeg",
+    ]
+
+
+def test_prune_empty_cache_deletes_nothing(photo_usage, photo_directory):
+    """Test that pruning an empty photo cache deletes no local files."""
+    photo_usage.photo_directory = photo_directory
+    photo_usage.prune({None: None})
+    assert len(local_names(photo_directory)) == 5
+
+
+def test_prune_keeps_file_still_cached(photo_usage, photo_directory, clock):
+    """Test keeping a local file still named by another cached photo."""
+    photo_usage.photo_directory = photo_directory
+    photo_usage.last_used[URL_1] = clock.time() - TIME_TO_LIVE - 1
+    photo_usage.prune({URL_1: PATH_1, URL_2: PATH_1})
+    assert "one.jpeg" in local_names(photo_directory)
+
+
+def test_prune_leaves_directory(photo_usage, urls_to_paths, photo_directory, clock):
+    """Test leaving the local photo directory alone by default."""
+    photo_usage.last_used[URL_3] = clock.time() - TIME_TO_LIVE - 1
+    photo_usage.prune(urls_to_paths)
+    assert len(local_names(photo_directory)) == 5
+
+
+def test_delete_local_photos_dryrun(cache_path, urls_to_paths, photo_directory):
+    """Test that a dry run deletes no local photo files."""
+    photo_usage = PhotoUsage(
+        JournaledMapping(cache_path),
+        TIME_TO_LIVE,
+        MAX_PHOTOS,
+        photo_directory=photo_directory,
+        dryrun=True,
+    )
+    photo_usage.delete_local_photos([PATH_1], {})
+    assert len(local_names(photo_directory)) == 5
+
+
+def test_persist_and_load(photo_usage, cache_path, clock):
+    """Test remembering photo use between runs."""
+    photo_usage.touch(URL_1)
+    photo_usage.persist()
+    assert load_cached_photo_last_used(cache_path) == {URL_1: clock.time()}
+
+
+def test_load_no_prior(cache_path):
+    """Test loading photo usage with no cache file."""
+    assert load_cached_photo_last_used(cache_path) == {}
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
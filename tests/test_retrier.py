@@ -0,0 +1,256 @@
+"""Test retrying failed HTTP requests."""
+
+from meetup2apricot.retrier import NullRetrier, Retrier, parse_retry_after
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+import requests
+
+
+@pytest.fixture()
+def mock_clock(mocker):
+    """Return a mock clock that does not sleep."""
+    return mocker.Mock()
+
+
+@pytest.fixture()
+def mock_throttle(mocker):
+    """Return a mock throttle."""
+    return mocker.Mock()
+
+
+@pytest.fixture()
+def make_response(mocker):
+    """Return a function that makes mock responses with a status code, some
+    headers, and a request method."""
+
+    def make(status_code, headers={}, method="GET"):
+        response = mocker.Mock()
+        response.status_code = status_code
+        response.headers = headers
+        response.request.method = method
+        return response
+
+    return make
+
+
+@pytest.fixture()
+def make_error():
+    """Return a function that makes connection errors or timeouts for a
+    request method."""
+
+    def make(error_class=requests.ConnectionError, method="GET"):
+        return error_class(request=requests.Request(method, "url"))
+
+    return make
+
+
+def test_request_ok(mock_throttle, mock_clock, make_response, mocker):
+    """Test a request that succeeds on the first attempt."""
+    ok_response = make_response(200)
+    send = mocker.Mock(return_value=ok_response)
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    assert retrier.request(mock_throttle, send, "url", params={"a": 1}) == ok_response
+    send.assert_called_once_with("url", params={"a": 1})
+    mock_throttle.throttle.assert_called_once_with()
+    mock_clock.sleep.assert_not_called()
+    assert retrier.retries_left == 5
+
+
+def test_request_retry_after(mock_throttle, mock_clock, make_response, mocker):
+    """Test retrying a rate limited request after the Retry-After delay."""
+    ok_response = make_response(200)
+    send = mocker.Mock(
+        side_effect=[make_response(429, {"Retry-After": "7"}), ok_response]
+    )
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    assert retrier.request(mock_throttle, send, "url") == ok_response
+    assert send.call_count == 2
+    assert mock_throttle.throttle.call_count == 2
+    mock_throttle.pause.assert_called_once_with(7.0)
+    mock_clock.sleep.assert_called_once_with(7.0)
+    assert retrier.retries_left == 4
+
+
+def test_request_backoff(mock_throttle, mock_clock, make_response, mocker):
+    """Test retrying unavailable service with jittered exponential backoff."""
+    ok_response = make_response(200)
+    send = mocker.Mock(
+        side_effect=[make_response(503), make_response(503), ok_response]
+    )
+    retrier = Retrier(clock=mock_clock, retry_budget=5, base_delay=2)
+    assert retrier.request(mock_throttle, send, "url") == ok_response
+    (first_delay,), _ = mock_clock.sleep.call_args_list[0]
+    (second_delay,), _ = mock_clock.sleep.call_args_list[1]
+    assert 1 <= first_delay <= 2
+    assert 2 <= second_delay <= 4
+
+
+def test_request_server_error_post(mock_throttle, mock_clock, make_response, mocker):
+    """Test not retrying a server error for a non-idempotent request."""
+    error_response = make_response(500, method="POST")
+    send = mocker.Mock(return_value=error_response)
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    assert retrier.request(mock_throttle, send, "url") == error_response
+    send.assert_called_once()
+
+
+def test_request_server_error_get(mock_throttle, mock_clock, make_response, mocker):
+    """Test retrying a server error for an idempotent request."""
+    ok_response = make_response(200)
+    send = mocker.Mock(side_effect=[make_response(502), ok_response])
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    assert retrier.request(mock_throttle, send, "url") == ok_response
+
+
+def test_request_not_found(mock_throttle, mock_clock, make_response, mocker):
+    """Test not retrying a request for a missing resource."""
+    missing_response = make_response(404)
+    send = mocker.Mock(return_value=missing_response)
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    assert retrier.request(mock_throttle, send, "url") == missing_response
+    send.assert_called_once()
+
+
+def test_request_max_attempts(mock_throttle, mock_clock, make_response, mocker):
+    """Test giving up after the maximum attempts for one request."""
+    send = mocker.Mock(return_value=make_response(503))
+    retrier = Retrier(clock=mock_clock, retry_budget=10, max_attempts=3)
+    assert retrier.request(mock_throttle, send, "url").status_code == 503
+    assert send.call_count == 3
+    assert retrier.retries_left == 8
+
+
+def test_request_budget(mock_throttle, mock_clock, make_response, mocker):
+    """Test giving up when the budget of retries for a run is spent."""
+    send = mocker.Mock(return_value=make_response(429))
+    retrier = Retrier(clock=mock_clock, retry_budget=3, max_attempts=3)
+    retrier.request(mock_throttle, send, "url")
+    retrier.request(mock_throttle, send, "url")
+    assert send.call_count == 5
+    assert retrier.retries_left == 0
+
+
+def test_request_long_retry_after(mock_throttle, mock_clock, make_response, mocker):
+    """Test not retrying when the Retry-After delay is too long."""
+    send = mocker.Mock(return_value=make_response(429, {"Retry-After": "3600"}))
+    retrier = Retrier(clock=mock_clock, retry_budget=5, max_retry_after=300)
+    assert retrier.request(mock_throttle, send, "url").status_code == 429
+    send.assert_called_once()
+
+
+def test_request_logs(mock_throttle, mock_clock, make_response, mocker, caplog):
+    """Test logging retries."""
+    send = mocker.Mock(
+        side_effect=[make_response(429, {"Retry-After": "2"}), make_response(200)]
+    )
+    Retrier(retry_budget=5, clock=mock_clock).request(mock_throttle, send, "url")
+    assert caplog.messages == [
+        "Retrying in 2.0 seconds: HTTP status 429 attempt=1 retries_left=4"
+    ]
+
+
+def test_request_closes_retried_responses(
+    mock_throttle, mock_clock, make_response, mocker
+):
+    """Test closing retried responses to release their connections, but not
+    the final response."""
+    limited_response = make_response(429, {"Retry-After": "1"})
+    ok_response = make_response(200)
+    send = mocker.Mock(side_effect=[limited_response, ok_response])
+    Retrier(clock=mock_clock, retry_budget=5).request(mock_throttle, send, "url")
+    limited_response.close.assert_called_once_with()
+    ok_response.close.assert_not_called()
+
+
+def test_request_connection_error_get(
+    mock_throttle, mock_clock, make_response, make_error, mocker
+):
+    """Test retrying an idempotent request after a connection error."""
+    ok_response = make_response(200)
+    send = mocker.Mock(side_effect=[make_error(), ok_response])
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    assert retrier.request(mock_throttle, send, "url") == ok_response
+    assert send.call_count == 2
+    mock_throttle.pause.assert_called_once()
+    assert retrier.retries_left == 4
+
+
+def test_request_connection_error_post(mock_throttle, mock_clock, make_error, mocker):
+    """Test not retrying a non-idempotent request after a connection
+    error."""
+    send = mocker.Mock(side_effect=make_error(method="POST"))
+    retrier = Retrier(clock=mock_clock, retry_budget=5)
+    with pytest.raises(requests.ConnectionError):
+        retrier.request(mock_throttle, send, "url")
+    send.assert_called_once()
+    assert retrier.retries_left == 5
+
+
+def test_request_timeout_max_attempts(mock_throttle, mock_clock, make_error, mocker):
+    """Test raising the last timeout after the maximum attempts."""
+    send = mocker.Mock(side_effect=make_error(requests.ReadTimeout))
+    retrier = Retrier(clock=mock_clock, retry_budget=10, max_attempts=3)
+    with pytest.raises(requests.ReadTimeout):
+        retrier.request(mock_throttle, send, "url")
+    assert send.call_count == 3
+    assert retrier.retries_left == 8
+
+
+def test_request_connection_error_budget(
+    mock_throttle, mock_clock, make_response, make_error, mocker
+):
+    """Test that connection errors and failed responses share the budget of
+    retries."""
+    send = mocker.Mock(side_effect=[make_response(503), make_error(), make_error()])
+    retrier = Retrier(clock=mock_clock, retry_budget=2)
+    with pytest.raises(requests.ConnectionError):
+        retrier.request(mock_throttle, send, "url")
+    assert send.call_count == 3
+    assert retrier.retries_left == 0
+
+
+def test_request_connection_error_logs(
+    mock_throttle, mock_clock, make_response, make_error, mocker, caplog
+):
+    """Test logging retries after connection errors."""
+    send = mocker.Mock(side_effect=[make_error(), make_response(200)])
+    mocker.patch("random.uniform", return_value=0)
+    Retrier(retry_budget=5, clock=mock_clock).request(mock_throttle, send, "url")
+    assert caplog.messages == [
+        "Retrying in 0.5 seconds: ConnectionError attempt=1 retries_left=4"
+    ]
+
+
+def test_parse_retry_after_missing(make_response):
+    """Test parsing a missing Retry-After header."""
+    assert parse_retry_after(make_response(429)) is None
+
+
+def test_parse_retry_after_seconds(make_response):
+    """Test parsing a Retry-After header in seconds."""
+    assert parse_retry_after(make_response(429, {"Retry-After": "120"})) == 120
+
+
+def test_parse_retry_after_date(make_response):
+    """Test parsing a Retry-After header with an HTTP date."""
+    retry_time = datetime.now(timezone.utc) + timedelta(seconds=90)
+    headers = {"Retry-After": format_datetime(retry_time, usegmt=True)}
+    assert parse_retry_after(make_response(429, headers)) == pytest.approx(90, abs=2)
+
+
+def test_parse_retry_after_invalid(make_response):
+    """Test parsing an invalid Retry-After header."""
+    assert parse_retry_after(make_response(429, {"Retry-After": "soon"})) is None
+
+
+def test_null_retrier(mock_throttle, make_response, mocker):
+    """Test sending a request once with a null retrier."""
+    error_response = make_response(503)
+    send = mocker.Mock(return_value=error_response)
+    assert NullRetrier().request(mock_throttle, send, "url") == error_response
+    send.assert_called_once_with("url")
+    mock_throttle.throttle.assert_called_once_with()
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,116 @@
+"""Test throttles shared by processes."""
+
+from .test_throttle import max_events_in_time_span
+from meetup2apricot.shared_throttle import SharedThrottle
+from meetup2apricot.throttle import AsyncThrottle
+import asyncio
+import multiprocessing
+import time
+
+STATE_FILE_NAME = "shared.throttle"
+ROUNDING_ALLOWANCE = 1e-6
+
+
+def test_shared_throttle_is_ready_init(tmp_path):
+    """Test that a shared throttle is ready without a state file."""
+    throttle = SharedThrottle(tmp_path / STATE_FILE_NAME, 1, 60)
+    assert throttle.is_ready()
+
+
+def test_shared_throttle_shares_state(tmp_path):
+    """Test that shared throttles with one state file share their rate."""
+    state_path = tmp_path / STATE_FILE_NAME
+    throttle_1 = SharedThrottle(state_path, 2, 60)
+    throttle_2 = SharedThrottle(state_path, 2, 60)
+    throttle_1.event(1000)
+    assert not throttle_2.is_ready(1029)
+    assert throttle_2.is_ready(1030)
+
+
+def test_shared_throttle_reserve(tmp_path):
+    """Test that shared throttles reserve successive event times."""
+    state_path = tmp_path / STATE_FILE_NAME
+    throttle_1 = SharedThrottle(state_path, 6, 60, burst=2)
+    throttle_2 = SharedThrottle(state_path, 6, 60, burst=2)
+    assert throttle_1.reserve(1000) == 1000
+    assert throttle_2.reserve(1000) == 1000
+    assert throttle_1.reserve(1000) == 1010
+    assert throttle_2.reserve(1000) == 1020
+
+
+def shared_throttle_worker(state_path, event_times):
+    """Throttle several events with a shared throttle, noting their reserved
+    times."""
+    throttle = SharedThrottle(state_path, 5, 0.2)
+    for _ in range(4):
+        event_time = throttle.reserve()
+        event_times.put(event_time)
+        time.sleep(max(0, event_time - time.time()))
+
+
+def test_shared_throttle_processes(tmp_path):
+    """Test that processes sharing a throttle never exceed its rate, allowing
+    for rounding of the reserved times, which are sums of the emission
+    interval."""
+    state_path = tmp_path / STATE_FILE_NAME
+    context = multiprocessing.get_context("fork")
+    event_times = context.Queue()
+    processes = [
+        context.Process(target=shared_throttle_worker, args=(state_path, event_times))
+        for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    times = [event_times.get() for _ in range(12)]
+    assert max_events_in_time_span(times, 0.2 - ROUNDING_ALLOWANCE) <= 5
+
+
+def test_shared_throttle_pause(tmp_path):
+    """Test pausing shared throttles."""
+    state_path = tmp_path / STATE_FILE_NAME
+    SharedThrottle(state_path, 2, 60).pause(30, current_time=1000)
+    throttle = SharedThrottle(state_path, 2, 60)
+    assert not throttle.is_ready(1029)
+    assert throttle.is_ready(1030)
+
+
+def test_async_shared_throttle_rate(tmp_path, mocker):
+    """Test that asyncio tasks sharing a shared throttle reserve event times
+    that never exceed its rate."""
+    shared_throttle = SharedThrottle(tmp_path / STATE_FILE_NAME, 5, 0.2)
+    shared_reserve = shared_throttle.reserve
+    times = []
+
+    def reserve():
+        event_time = shared_reserve()
+        times.append(event_time)
+        return event_time
+
+    shared_throttle.reserve = reserve
+    mocker.spy(shared_throttle, "event")
+    throttle = AsyncThrottle(shared_throttle)
+
+    async def work():
+        for _ in range(3):
+            await throttle.throttle()
+
+    async def run_tasks():
+        await asyncio.gather(*(work() for _ in range(4)))
+
+    asyncio.run(run_tasks())
+    assert len(times) == 12
+    assert max_events_in_time_span(times, 0.2 - ROUNDING_ALLOWANCE) <= 5
+    shared_throttle.event.assert_not_called()
+
+
+def test_async_shared_throttle_pause(tmp_path):
+    """Test pausing a shared throttle from an asyncio task."""
+    state_path = tmp_path / STATE_FILE_NAME
+    throttle = AsyncThrottle(SharedThrottle(state_path, 2, 60))
+    asyncio.run(throttle.pause(30, current_time=1000))
+    assert not SharedThrottle(state_path, 2, 60).is_ready(1029)
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
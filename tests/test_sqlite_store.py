@@ -0,0 +1,195 @@
+"""Test keeping known events and photo paths in a SQLite database."""
+
+from meetup2apricot.sqlite_store import (
+    SqliteEventMapping,
+    SqlitePhotoMapping,
+    SqlitePhotoUsageMapping,
+    SqliteStore,
+    load_sqlite_store,
+)
+from datetime import datetime
+from pathlib import PurePosixPath
+import pytest
+import sqlite3
+
+EARLIEST_START_TIME = datetime.fromisoformat("2020-11-10T00:00-05:00")
+EARLY_START_TIME = datetime.fromisoformat("2020-11-01T19:00-05:00")
+LATE_START_TIME = datetime.fromisoformat("2020-11-30T19:00-05:00")
+
+EARLY_EVENT = {"wild_apricot_event": 1001, "start_time": EARLY_START_TIME}
+LATE_EVENT = {"wild_apricot_event": 1002, "start_time": LATE_START_TIME}
+SKIPPED_EVENT = {"start_time": LATE_START_TIME}
+
+PHOTO_URL = "https://secure.meetupstatic.com/photos/event/highres_1.jpeg"
+PHOTO_PATH = PurePosixPath("/resources/Pictures/Meetup/laser_2020-11-30.jpeg")
+
+
+@pytest.fixture()
+def database_path(tmp_path):
+    """Return a path to a database file."""
+    return tmp_path / "meetup2apricot.db"
+
+
+@pytest.fixture()
+def store(database_path):
+    """Return an open, empty SQLite store."""
+    store = SqliteStore(database_path)
+    store.open()
+    yield store
+    store.close()
+
+
+def reopen(database_path):
+    """Return a new open SQLite store on a database file."""
+    store = SqliteStore(database_path)
+    store.open()
+    return store
+
+
+def test_open_new(store):
+    """Test opening a new database."""
+    assert store.is_new
+
+
+def test_open_existing(store, database_path):
+    """Test opening an existing database."""
+    assert not reopen(database_path).is_new
+
+
+def test_event_mapping(store, database_path):
+    """Test adding, finding, and deleting known events."""
+    mapping = SqliteEventMapping(store)
+    mapping["abc"] = LATE_EVENT
+    mapping["def"] = SKIPPED_EVENT
+    assert mapping["abc"] == LATE_EVENT
+    assert "def" in mapping
+    assert "xyz" not in mapping
+    assert dict(mapping) == {"abc": LATE_EVENT, "def": SKIPPED_EVENT}
+    del mapping["def"]
+    assert dict(SqliteEventMapping(reopen(database_path))) == {"abc": LATE_EVENT}
+
+
+def test_event_mapping_missing(store):
+    """Test looking up and deleting unknown events."""
+    mapping = SqliteEventMapping(store)
+    with pytest.raises(KeyError):
+        mapping["xyz"]
+    with pytest.raises(KeyError):
+        del mapping["xyz"]
+
+
+def test_event_mapping_timely(store):
+    """Test that events starting before the earliest start time are
+    hidden."""
+    mapping = SqliteEventMapping(store, earliest_start_time=EARLIEST_START_TIME)
+    mapping["early"] = EARLY_EVENT
+    mapping["late"] = LATE_EVENT
+    assert "early" not in mapping
+    assert dict(mapping) == {"late": LATE_EVENT}
+    assert len(SqliteEventMapping(store)) == 2
+
+
+def test_event_mapping_prune(store):
+    """Test that persisting prunes events starting before the earliest start
+    time."""
+    SqliteEventMapping(store).insert_all({"early": EARLY_EVENT, "late": LATE_EVENT})
+    SqliteEventMapping(store, earliest_start_time=EARLIEST_START_TIME).persist()
+    assert dict(SqliteEventMapping(store)) == {"late": LATE_EVENT}
+
+
+def test_event_mapping_replace(store):
+    """Test replacing known events with another mapping."""
+    mapping = SqliteEventMapping(store)
+    mapping["abc"] = EARLY_EVENT
+    mapping["def"] = SKIPPED_EVENT
+    assert mapping.replace({"abc": LATE_EVENT}) is mapping
+    assert dict(mapping) == {"abc": LATE_EVENT}
+
+
+def test_photo_mapping(store, database_path):
+    """Test adding and finding photo paths."""
+    mapping = SqlitePhotoMapping(store)
+    mapping[PHOTO_URL] = PHOTO_PATH
+    assert dict(SqlitePhotoMapping(reopen(database_path))) == {PHOTO_URL: PHOTO_PATH}
+
+
+def test_photo_mapping_none(store):
+    """Test that the photo URL None maps to None without being stored."""
+    mapping = SqlitePhotoMapping(store)
+    mapping[None] = None
+    assert None in mapping
+    assert mapping[None] is None
+    assert len(mapping) == 0
+
+
+def test_photo_usage_mapping(store, database_path):
+    """Test recording the last used times of cached photos."""
+    SqlitePhotoMapping(store)[PHOTO_URL] = PHOTO_PATH
+    usage = SqlitePhotoUsageMapping(store)
+    assert PHOTO_URL not in usage
+    usage[PHOTO_URL] = 1234.5
+    usage["http://example.com/uncached.jpeg"] = 1234.5
+    assert dict(SqlitePhotoUsageMapping(reopen(database_path))) == {PHOTO_URL: 1234.5}
+    del usage[PHOTO_URL]
+    assert len(usage) == 0
+    assert SqlitePhotoMapping(store)[PHOTO_URL] == PHOTO_PATH
+    with pytest.raises(KeyError):
+        del usage[PHOTO_URL]
+
+
+def test_open_adds_last_used_column(database_path):
+    """Test adding the photo last used column to an older database."""
+    connection = sqlite3.connect(database_path)
+    connection.execute(
+        "CREATE TABLE photo_paths (photo_url TEXT PRIMARY KEY, apricot_path TEXT)"
+    )
+    connection.execute(
+        "INSERT INTO photo_paths VALUES (?, ?)", (PHOTO_URL, str(PHOTO_PATH))
+    )
+    connection.commit()
+    connection.close()
+    store = reopen(database_path)
+    SqlitePhotoUsageMapping(store)[PHOTO_URL] = 1234.5
+    assert SqlitePhotoUsageMapping(store)[PHOTO_URL] == 1234.5
+    assert SqlitePhotoMapping(store)[PHOTO_URL] == PHOTO_PATH
+    store.close()
+
+
+def test_dryrun_not_committed(store, database_path):
+    """Test that a dry run leaves an existing database unchanged."""
+    dryrun_store = SqliteStore(database_path, dryrun=True)
+    dryrun_store.open()
+    SqliteEventMapping(dryrun_store)["abc"] = LATE_EVENT
+    assert "abc" in SqliteEventMapping(dryrun_store)
+    dryrun_store.close()
+    assert len(SqliteEventMapping(store)) == 0
+
+
+def test_dryrun_new_database(database_path):
+    """Test that a dry run does not create a database."""
+    store = SqliteStore(database_path, dryrun=True)
+    store.open()
+    SqlitePhotoMapping(store)[PHOTO_URL] = PHOTO_PATH
+    store.close()
+    assert not database_path.exists()
+
+
+def test_load_new_store_migrates(database_path, mocker):
+    """Test that loading a new store fills it from the providers."""
+    event_mapping_provider = mocker.Mock(return_value={"abc": LATE_EVENT})
+    photo_paths_provider = mocker.Mock(return_value={None: None, PHOTO_URL: PHOTO_PATH})
+    store = load_sqlite_store(
+        database_path, event_mapping_provider, photo_paths_provider
+    )
+    assert dict(SqliteEventMapping(store)) == {"abc": LATE_EVENT}
+    assert dict(SqlitePhotoMapping(store)) == {PHOTO_URL: PHOTO_PATH}
+    store.close()
+    store = load_sqlite_store(
+        database_path, event_mapping_provider, photo_paths_provider
+    )
+    event_mapping_provider.assert_called_once()
+    assert len(SqliteEventMapping(store)) == 1
+    store.close()
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -1,10 +1,75 @@
 """ Test throttles."""
 
-from meetup2apricot.throttle import Throttle, make_throttle
+from meetup2apricot.clock import VirtualClock
+from meetup2apricot.throttle import (
+    AdaptiveThrottle,
+    AsyncThrottle,
+    CompositeThrottle,
+    LazyThrottle,
+    OpenThrottle,
+    PersistentThrottle,
+    ThreadSafeThrottle,
+    Throttle,
+    TokenBucketThrottle,
+    make_composite_throttle,
+    make_persistent_throttle,
+    make_throttle,
+)
+import asyncio
+import threading
 import time
 import logging
+import pickle
 import pytest
 
+CACHE_FILE_NAME = "throttle.pickle"
+
+
+class RecordingThrottle(Throttle):
+
+    """A throttle that records the time of each event."""
+
+    def __init__(self, rate, time_span):
+        """Initialize with a rate and a time span and no recorded events."""
+        super().__init__(rate, time_span)
+        self.event_times = []
+
+    def event(self, current_time=None):
+        """Record an event at the current time."""
+        now = current_time or time.time()
+        super().event(now)
+        self.event_times.append(now)
+
+
+class SleepRecordingClock(VirtualClock):
+
+    """A virtual clock that records each sleep."""
+
+    def __init__(self, start_time):
+        """Initialize with a start time and no sleeps."""
+        super().__init__(start_time)
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        """Advance the virtual time, recording the sleep."""
+        self.sleeps.append(seconds)
+        super().sleep(seconds)
+
+
+@pytest.fixture()
+def virtual_clock():
+    """Return a virtual clock that records sleeps."""
+    return SleepRecordingClock(1000)
+
+
+def max_events_in_time_span(event_times, time_span):
+    """Return the largest number of events within any time span starting at
+    an event time."""
+    return max(
+        len([t for t in event_times if start_time <= t < start_time + time_span])
+        for start_time in event_times
+    )
+
 
 def test_is_ready_init():
     """Test that a throttle is ready after initialization."""
@@ -94,4 +159,404 @@ def test_make_throttle_high(caplog):
     assert throttle.time_span == 63
 
 
+def test_make_throttle_token_bucket(caplog):
+    """Test making a token bucket throttle."""
+    throttle = make_throttle(
+        rate=40,
+        time_span=63,
+        utilization_factor=0.75,
+        purpose="test 4",
+        throttle_class=TokenBucketThrottle,
+    )
+    assert isinstance(throttle, TokenBucketThrottle)
+    assert throttle.rate == 30
+    assert throttle.time_span == 63
+    assert throttle.burst == 1
+
+
+def test_token_bucket_is_ready_init():
+    """Test that a token bucket throttle is ready after initialization."""
+    throttle = TokenBucketThrottle(1, 60)
+    assert throttle.is_ready()
+
+
+def test_token_bucket_is_ready_ok():
+    """Test that a token bucket throttle is ready after its emission
+    interval."""
+    throttle = TokenBucketThrottle(2, 60)
+    throttle.event(1000)
+    assert throttle.is_ready(1030)
+
+
+def test_token_bucket_is_ready_not():
+    """Test that a token bucket throttle is not ready before its emission
+    interval."""
+    throttle = TokenBucketThrottle(2, 60)
+    throttle.event(1000)
+    assert not throttle.is_ready(1029)
+
+
+def test_token_bucket_burst():
+    """Test that a token bucket throttle allows a burst of events."""
+    throttle = TokenBucketThrottle(10, 60, burst=3)
+    for _ in range(3):
+        assert throttle.is_ready(1000)
+        throttle.event(1000)
+    assert not throttle.is_ready(1005.9)
+    assert throttle.is_ready(1006)
+
+
+def test_token_bucket_rate_limit():
+    """Test that a token bucket throttle admits no more than rate + burst - 1
+    events in any time span."""
+    throttle = TokenBucketThrottle(10, 60, burst=3)
+    event_times = []
+    now = 1000
+    while now < 1120:
+        if throttle.is_ready(now):
+            throttle.event(now)
+            event_times.append(now)
+        now += 0.5
+    for start_time in event_times:
+        window = [t for t in event_times if start_time <= t < start_time + 60]
+        assert len(window) <= 12
+
+
+def test_token_bucket_throttle_ready_soon():
+    """Test throttling a token bucket when some delay is needed."""
+    throttle = TokenBucketThrottle(1, 60)
+    throttle.event(1000)
+    start_time = time.time()
+    throttle.throttle(1059.9)
+    end_time = time.time()
+    assert start_time + 0.1 == pytest.approx(end_time, abs=1e-2)
+
+
+def test_adaptive_speeds_up():
+    """Test that an adaptive throttle speeds up when many events remain."""
+    throttle = AdaptiveThrottle(20, 10)
+    throttle.event(1000)
+    throttle.adapt(remaining=101, reset=10, current_time=1000)
+    assert not throttle.is_ready(1000.4)
+    assert throttle.is_ready(1000.5)
+    throttle.event(1000.5)
+    assert throttle.is_ready(1000.6)
+
+
+def test_adaptive_slows_down():
+    """Test that an adaptive throttle slows down when few events remain."""
+    throttle = AdaptiveThrottle(20, 10)
+    throttle.event(1000)
+    throttle.adapt(remaining=3, reset=10, current_time=1000)
+    assert not throttle.is_ready(1004.9)
+    assert throttle.is_ready(1005)
+
+
+def test_adaptive_holds_reserve():
+    """Test that an adaptive throttle waits for the reset when only its
+    reserve remains."""
+    throttle = AdaptiveThrottle(20, 10, reserve=2)
+    throttle.event(1000)
+    throttle.adapt(remaining=2, reset=7, current_time=1000)
+    assert not throttle.is_ready(1006.9)
+    assert throttle.is_ready(1007)
+
+
+def test_adaptive_keeps_pause():
+    """Test that adapting does not undo a pause."""
+    throttle = AdaptiveThrottle(20, 10)
+    throttle.pause(30, current_time=1000)
+    throttle.adapt(remaining=25, reset=8, current_time=1000.5)
+    assert not throttle.is_ready(1029.9)
+    assert throttle.is_ready(1030)
+
+
+def test_adapt_ignored():
+    """Test that non-adaptive throttles ignore rate limit reports."""
+    for throttle in [Throttle(1, 60), TokenBucketThrottle(1, 60)]:
+        throttle.adapt(remaining=0, reset=60, current_time=1000)
+        assert throttle.is_ready(1000)
+    OpenThrottle().adapt(remaining=0, reset=60)
+
+
+def test_thread_safe_throttle_rate():
+    """Test that threads sharing a throttle never exceed its rate."""
+    recording_throttle = RecordingThrottle(5, 0.2)
+    throttle = ThreadSafeThrottle(recording_throttle)
+
+    def work():
+        for _ in range(5):
+            throttle.throttle()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(recording_throttle.event_times) == 20
+    assert max_events_in_time_span(recording_throttle.event_times, 0.2) <= 5
+
+
+def test_thread_safe_open_throttle():
+    """Test that a thread safe open throttle proceeds without slowing."""
+    throttle = ThreadSafeThrottle(OpenThrottle())
+    start_time = time.time()
+    for _ in range(100):
+        throttle.throttle()
+    assert time.time() == pytest.approx(start_time, abs=1e-2)
+
+
+def test_async_throttle_rate():
+    """Test that asyncio tasks sharing a throttle never exceed its rate."""
+    recording_throttle = RecordingThrottle(5, 0.2)
+    throttle = AsyncThrottle(recording_throttle)
+
+    async def work():
+        for _ in range(5):
+            await throttle.throttle()
+
+    async def run_tasks():
+        await asyncio.gather(*(work() for _ in range(4)))
+
+    asyncio.run(run_tasks())
+    assert len(recording_throttle.event_times) == 20
+    assert max_events_in_time_span(recording_throttle.event_times, 0.2) <= 5
+
+
+def test_async_open_throttle():
+    """Test that an async open throttle proceeds without slowing."""
+    throttle = AsyncThrottle(OpenThrottle())
+
+    async def work():
+        for _ in range(100):
+            await throttle.throttle()
+
+    start_time = time.time()
+    asyncio.run(work())
+    assert time.time() == pytest.approx(start_time, abs=1e-2)
+
+
+def test_snapshot_restore():
+    """Test restoring a throttle's state into a new throttle."""
+    throttle = Throttle(2, 60)
+    throttle.event(1000)
+    throttle.event(1010)
+    new_throttle = Throttle(2, 60)
+    new_throttle.restore(throttle.snapshot())
+    assert not new_throttle.is_ready(1059)
+    assert new_throttle.is_ready(1060)
+
+
+def test_snapshot_restore_lower_rate():
+    """Test restoring a throttle's state into a throttle with a lower rate."""
+    throttle = Throttle(3, 60)
+    for event_time in [1000, 1010, 1020]:
+        throttle.event(event_time)
+    new_throttle = Throttle(2, 60)
+    new_throttle.restore(throttle.snapshot())
+    assert not new_throttle.is_ready(1069)
+    assert new_throttle.is_ready(1070)
+
+
+def test_token_bucket_snapshot_restore():
+    """Test restoring a token bucket throttle's state into a new throttle."""
+    throttle = TokenBucketThrottle(2, 60)
+    throttle.event(1000)
+    new_throttle = TokenBucketThrottle(2, 60)
+    new_throttle.restore(throttle.snapshot())
+    assert not new_throttle.is_ready(1029)
+    assert new_throttle.is_ready(1030)
+
+
+def test_persist(tmp_path):
+    """Test persisting a throttle's state to a cache file."""
+    cache_path = tmp_path / CACHE_FILE_NAME
+    throttle = TokenBucketThrottle(2, 60)
+    persistent_throttle = PersistentThrottle(throttle, cache_path)
+    persistent_throttle.event(1000)
+    persistent_throttle.persist()
+    with cache_path.open("rb") as f:
+        assert pickle.load(f) == 1030
+
+
+def test_persist_dryrun(tmp_path):
+    """Test not persisting a throttle's state during a dry run."""
+    cache_path = tmp_path / CACHE_FILE_NAME
+    persistent_throttle = PersistentThrottle(
+        TokenBucketThrottle(2, 60), cache_path, dryrun=True
+    )
+    persistent_throttle.persist()
+    assert not cache_path.exists()
+
+
+def test_make_persistent_throttle(tmp_path):
+    """Test making a persistent throttle restored from a cache file."""
+    cache_path = tmp_path / CACHE_FILE_NAME
+    with cache_path.open("wb") as f:
+        pickle.dump(1030, f)
+    persistent_throttle = make_persistent_throttle(
+        TokenBucketThrottle(2, 60), cache_path
+    )
+    assert not persistent_throttle.is_ready(1029)
+    assert persistent_throttle.is_ready(1030)
+
+
+def test_make_persistent_throttle_no_file(tmp_path):
+    """Test making a persistent throttle without a cache file."""
+    cache_path = tmp_path / CACHE_FILE_NAME
+    persistent_throttle = make_persistent_throttle(
+        TokenBucketThrottle(2, 60), cache_path
+    )
+    assert persistent_throttle.is_ready(1000)
+
+
+def test_make_persistent_throttle_bad_file(tmp_path, caplog):
+    """Test making a persistent throttle with an unreadable cache file."""
+    cache_path = tmp_path / CACHE_FILE_NAME
+    cache_path.write_bytes(b"not a pickle")
+    persistent_throttle = make_persistent_throttle(
+        TokenBucketThrottle(2, 60), cache_path
+    )
+    assert persistent_throttle.is_ready(1000)
+    assert caplog.messages[0].startswith("Cannot load throttle state")
+
+
+def test_composite_throttle_times(virtual_clock):
+    """Test the event times allowed by a composite throttle limiting events
+    per second and per minute."""
+    throttle = make_composite_throttle(
+        limits=[(2, 1), (5, 60)],
+        utilization_factor=0.95,
+        purpose="test 6",
+        clock=virtual_clock,
+    )
+    event_times = []
+    for _ in range(8):
+        throttle.throttle()
+        event_times.append(virtual_clock.now)
+    assert event_times == [1000, 1000, 1001, 1001, 1002, 1060, 1060, 1061]
+
+
+def test_composite_throttle_sleeps_once(virtual_clock):
+    """Test that a composite throttle sleeps once, until its most restrictive
+    throttle is ready."""
+    throttle = CompositeThrottle(
+        [Throttle(2, 1, virtual_clock), Throttle(3, 60, virtual_clock)],
+        virtual_clock,
+    )
+    for _ in range(3):
+        throttle.throttle()
+    virtual_clock.sleeps.clear()
+    throttle.throttle()
+    assert virtual_clock.sleeps == [59]
+
+
+def test_composite_throttle_rate_limits(virtual_clock):
+    """Test that a composite throttle never exceeds any of its limits."""
+    throttle = CompositeThrottle(
+        [
+            TokenBucketThrottle(3, 1, burst=2, clock=virtual_clock),
+            Throttle(20, 60, virtual_clock),
+            Throttle(50, 3600, virtual_clock),
+        ],
+        virtual_clock,
+    )
+    event_times = []
+    for _ in range(60):
+        throttle.throttle()
+        event_times.append(virtual_clock.now)
+    assert max_events_in_time_span(event_times, 1) <= 4
+    assert max_events_in_time_span(event_times, 60) <= 20
+    assert max_events_in_time_span(event_times, 3600) <= 50
+    assert event_times[50] >= 4600
+
+
+def test_composite_throttle_snapshot_restore():
+    """Test restoring a composite throttle's state."""
+    throttle = CompositeThrottle([Throttle(2, 1), TokenBucketThrottle(5, 60)])
+    throttle.event(1000)
+    new_throttle = CompositeThrottle([Throttle(2, 1), TokenBucketThrottle(5, 60)])
+    new_throttle.restore(throttle.snapshot())
+    assert not new_throttle.is_ready(1011)
+    assert new_throttle.is_ready(1012)
+
+
+def test_make_composite_throttle(caplog):
+    """Test making a composite throttle from a list of limits."""
+    throttle = make_composite_throttle(
+        limits=[(4, 1), (40, 63)],
+        utilization_factor=0.75,
+        purpose="test 5",
+    )
+    assert isinstance(throttle, CompositeThrottle)
+    assert [t.rate for t in throttle.throttles] == [3, 30]
+    assert [t.time_span for t in throttle.throttles] == [1, 63]
+
+
+def test_pause():
+    """Test pausing a throttle."""
+    throttle = Throttle(2, 60)
+    throttle.event(1000)
+    throttle.pause(30, current_time=1001)
+    assert not throttle.is_ready(1030)
+    assert throttle.is_ready(1031)
+
+
+def test_token_bucket_pause():
+    """Test pausing a token bucket throttle."""
+    throttle = TokenBucketThrottle(2, 60, burst=3)
+    throttle.pause(30, current_time=1000)
+    assert not throttle.is_ready(1029)
+    assert throttle.is_ready(1030)
+
+
+def test_composite_throttle_pause():
+    """Test pausing a composite throttle."""
+    throttle = CompositeThrottle([Throttle(2, 1), TokenBucketThrottle(5, 60)])
+    throttle.pause(30, current_time=1000)
+    assert not throttle.is_ready(1029)
+    assert throttle.is_ready(1030)
+
+
+def test_open_throttle_pause():
+    """Test ignoring a pause with an open throttle."""
+    throttle = OpenThrottle()
+    throttle.pause(30)
+    assert throttle.is_ready()
+
+
+def test_lazy_throttle_first_event():
+    """Test that a lazy throttle lets the first event through without making
+    its throttle and ignores adapting before then."""
+
+    def provider():
+        pytest.fail("throttle made")
+
+    throttle = LazyThrottle(provider)
+    assert throttle.is_ready(1000)
+    assert throttle.next_ready_time() == 0
+    throttle.adapt(remaining=0, reset=60, current_time=1000)
+    throttle.throttle(1000)
+    assert throttle.wrapped_throttle is None
+
+
+def test_lazy_throttle_later_events():
+    """Test that a lazy throttle makes its throttle for a later event."""
+    throttle = LazyThrottle(lambda: Throttle(1, 60))
+    throttle.event(1000)
+    assert throttle.is_ready(1001)
+    throttle.event(1001)
+    assert isinstance(throttle.wrapped_throttle, Throttle)
+    assert not throttle.is_ready(1060)
+    assert throttle.is_ready(1061)
+
+
+def test_lazy_throttle_pause():
+    """Test that pausing a lazy throttle makes and pauses its throttle."""
+    throttle = LazyThrottle(lambda: TokenBucketThrottle(2, 60))
+    throttle.pause(30, current_time=1000)
+    assert not throttle.is_ready(1029)
+    assert throttle.is_ready(1030)
+
+
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent
@@ -0,0 +1,151 @@
+"""Test the throttle simulator."""
+
+from meetup2apricot.clock import VirtualClock
+from meetup2apricot.shared_throttle import SharedThrottle
+from meetup2apricot.throttle import (
+    AdaptiveThrottle,
+    CompositeThrottle,
+    OpenThrottle,
+    Throttle,
+    TokenBucketThrottle,
+)
+from meetup2apricot.throttle_simulator import (
+    APRICOT,
+    PHOTO,
+    ServerRateLimit,
+    SimulatedCall,
+    ThrottleSimulator,
+    event_processor_calls,
+    main,
+    make_apricot_throttle,
+    simulate,
+    throttle_rate,
+)
+import io
+import pytest
+
+
+def test_event_processor_calls():
+    """Test the calls made to process new events."""
+    calls = list(event_processor_calls(2))
+    assert len(calls) == 8
+    assert calls[:4] == [
+        SimulatedCall("upload_photo", PHOTO),
+        SimulatedCall("add_event", APRICOT),
+        SimulatedCall("add_registration_type", APRICOT),
+        SimulatedCall("add_registration_type", APRICOT),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("kind", "expected_class"),
+    [
+        ("sliding-window", Throttle),
+        ("token-bucket", TokenBucketThrottle),
+        ("composite", CompositeThrottle),
+        ("adaptive", AdaptiveThrottle),
+        ("shared", SharedThrottle),
+    ],
+)
+def test_make_apricot_throttle(kind, expected_class, tmp_path):
+    """Test making each kind of Wild Apricot throttle, using a utilization
+    factor of its rate."""
+    throttle = make_apricot_throttle(
+        kind, 100, 60, 5, 0.9, VirtualClock(), tmp_path / "apricot.throttle"
+    )
+    assert isinstance(throttle, expected_class)
+    assert throttle_rate(throttle) == pytest.approx(1.5)
+
+
+def test_server_rate_limit():
+    """Test reporting the calls remaining in a fixed window and the seconds
+    until it resets."""
+    clock = VirtualClock()
+    server_rate_limit = ServerRateLimit(3, 60, clock)
+    assert server_rate_limit.call() == (2, 60)
+    clock.sleep(20)
+    assert server_rate_limit.call() == (1, 40)
+    clock.sleep(40)
+    assert server_rate_limit.call() == (2, 60)
+
+
+def test_throttle_rate_open():
+    """Test that an open throttle has no rate."""
+    assert throttle_rate(OpenThrottle()) is None
+
+
+def test_simulator_run_no_waits():
+    """Test a simulation slow enough to never wait."""
+    clock = VirtualClock()
+    simulator = ThrottleSimulator(
+        clock, {APRICOT: Throttle(10, 1, clock)}, {APRICOT: 1}
+    )
+    report = simulator.run([SimulatedCall("add_event", APRICOT)] * 5)
+    assert report.call_count == 5
+    assert report.total_time == 5
+    assert report.waits == [0] * 5
+    assert report.utilization(APRICOT) == pytest.approx(0.1)
+
+
+def test_simulator_run_waits():
+    """Test a simulation limited by its throttle."""
+    clock = VirtualClock()
+    simulator = ThrottleSimulator(
+        clock, {APRICOT: TokenBucketThrottle(1, 2, clock=clock)}, {}
+    )
+    report = simulator.run([SimulatedCall("add_event", APRICOT)] * 4)
+    assert report.waits == [0, 2, 2, 2]
+    assert report.total_time == 6
+    assert report.wait_percentile(50) == 2
+
+
+def test_simulate_sliding_window():
+    """Test that a sliding window stretches a large sync over its time span."""
+    report = simulate(50, "sliding-window", 100, 60, 1, 0, 0)
+    assert report.calls_by_throttle == {APRICOT: 150, PHOTO: 50}
+    assert report.total_time == pytest.approx(60)
+    assert max(report.waits) == pytest.approx(60)
+    assert report.utilization(PHOTO) is None
+
+
+def test_simulate_adaptive():
+    """Test that an adaptive throttle spreads the calls a simulated server
+    reports remaining over the rest of its window."""
+    report = simulate(50, "adaptive", 100, 60, 1, 0, 0)
+    assert report.calls_by_throttle[APRICOT] == 150
+    assert 60 < report.total_time < 120
+
+
+def test_simulate_shared():
+    """Test that a shared throttle paces calls like a token bucket."""
+    shared_report = simulate(50, "shared", 100, 60, 10, 0.3, 1.0)
+    token_bucket_report = simulate(50, "token-bucket", 100, 60, 10, 0.3, 1.0)
+    assert shared_report.waits == pytest.approx(token_bucket_report.waits)
+
+
+def test_simulate_uses_no_real_time(mocker):
+    """Test that simulating never sleeps in real time."""
+    sleep = mocker.patch("time.sleep")
+    simulate(200, "composite", 91, 60, 5, 0.3, 1.0)
+    sleep.assert_not_called()
+
+
+def test_main():
+    """Test reporting a simulation from command line arguments."""
+    output = io.StringIO()
+    main(["-e", "10", "--kind", "sliding-window", "--utilization", "0.95"], output)
+    lines = output.getvalue().splitlines()
+    assert lines[0] == "calls: 40"
+    assert lines[1] == "total time: 19.0 seconds"
+    assert lines[2].startswith("total wait: 0.0 seconds")
+    assert lines[3] == "apricot utilization: 99.7%"
+
+
+def test_main_no_events():
+    """Test reporting a simulation of no events without wait statistics."""
+    output = io.StringIO()
+    main(["--events", "0"], output)
+    assert output.getvalue().splitlines() == ["calls: 0", "total time: 0.0 seconds"]
+
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4 autoindent